@@ -0,0 +1,88 @@
+# benchmarks/bench_aggregate.py
+"""
+Comparaison des moteurs d'agrégation de FeatureEngineer.aggregate_numeric.
+
+- "pandas" : copie de la table + groupby(...).agg(['mean', 'min', 'max', 'sum'])
+- "numpy"  : tri unique par clé + réductions reduceat colonne par colonne
+
+Table synthétique au format installments_payments (8 colonnes numériques,
+clés non triées, quelques valeurs manquantes), en float64 comme après un
+read_csv puis en types réduits comme après le cache Parquet du data_loader.
+Mesure du temps et du pic mémoire Python (tracemalloc) de chaque moteur.
+
+Usage :
+    python -m benchmarks.bench_aggregate --rows 2000000 --groups 300000
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.data_loader import downcast_dtypes
+from src.preprocessing.feature_engineering import FeatureEngineer
+
+
+def make_table(rows: int, groups: int, seed: int = 0) -> pd.DataFrame:
+    """Table factice au format installments_payments"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "SK_ID_PREV": rng.integers(1000000, 3000000, rows),
+        "SK_ID_CURR": rng.integers(100000, 100000 + groups, rows),
+        "NUM_INSTALMENT_VERSION": rng.integers(0, 5, rows).astype(np.float64),
+        "NUM_INSTALMENT_NUMBER": rng.integers(1, 100, rows),
+        "DAYS_INSTALMENT": -rng.integers(1, 3000, rows).astype(np.float64),
+        "DAYS_ENTRY_PAYMENT": -rng.integers(1, 3000, rows).astype(np.float64),
+        "AMT_INSTALMENT": rng.uniform(0, 1e5, rows),
+        "AMT_PAYMENT": rng.uniform(0, 1e5, rows),
+    })
+    df.loc[rng.random(rows) < 0.01, ["DAYS_ENTRY_PAYMENT", "AMT_PAYMENT"]] = np.nan
+    return df
+
+
+def measure(fe: FeatureEngineer, df: pd.DataFrame, engine: str, repeat: int):
+    """Meilleur temps (s) sur repeat essais et pic mémoire (Mo) d'une agrégation"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fe.aggregate_numeric(df, "SK_ID_CURR", "ins", engine=engine)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fe.aggregate_numeric(df, "SK_ID_CURR", "ins", engine=engine)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, min(timings), peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000000, help="Nombre de lignes de la table")
+    parser.add_argument("--groups", type=int, default=300000, help="Nombre de clients distincts")
+    parser.add_argument("--repeat", type=int, default=3, help="Nombre d'essais par moteur")
+    args = parser.parse_args()
+
+    fe = FeatureEngineer()
+    raw = make_table(args.rows, args.groups)
+    tables = {"float64 (CSV)": raw, "types réduits (cache)": downcast_dtypes(raw.copy())}
+
+    print(f"{args.rows} lignes, {args.groups} clients, meilleur de {args.repeat} essais")
+    for label, df in tables.items():
+        print(f"\n{label} : {df.memory_usage().sum() / 2**20:.0f} Mo")
+        results = {}
+        for engine in ("pandas", "numpy"):
+            results[engine], seconds, peak = measure(fe, df, engine, args.repeat)
+            print(f"  {engine:<6} {seconds:7.2f} s   pic mémoire {peak:7.0f} Mo")
+
+        expected, result = results["pandas"], results["numpy"]
+        same_layout = list(expected.columns) == list(result.columns) and expected.index.equals(result.index)
+        max_rel = float(np.nanmax(
+            np.abs(result.to_numpy(np.float64) - expected.to_numpy(np.float64))
+            / np.maximum(np.abs(expected.to_numpy(np.float64)), 1.0)
+        ))
+        print(f"  mêmes colonnes et clés : {same_layout}, écart relatif max : {max_rel:.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# benchmarks/bench_drift.py
+"""
+Coût d'une analyse de data drift sur des tables au format application_train / application_test.
+
+- "chargement complet" : lecture intégrale des deux CSV, préalable au rapport Evidently
+  (DataDriftTable, à la charge duquel s'ajoute le calcul des tests sur chaque colonne)
+- "profil"             : calcul unique du profil de référence (ReferenceProfile)
+- "analyse"            : run_data_drift, données courantes lues en flux par blocs et
+  comparées au profil enregistré (le coût d'une analyse périodique)
+
+Temps et pic mémoire Python (tracemalloc) de chaque étape.
+
+Usage :
+    python -m benchmarks.bench_drift --reference-rows 307511 --current-rows 48744 --columns 120
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.config.config import config
+from src.monitoring.data_drift import load_reference_profile, run_data_drift
+
+
+def make_table(rows: int, columns: int, seed: int, shift: float = 0.0) -> pd.DataFrame:
+    """Table factice : 85 % de colonnes numériques (avec manquants), le reste catégoriel"""
+    rng = np.random.default_rng(seed)
+    n_categorical = max(1, columns * 15 // 100)
+    data = {"SK_ID_CURR": np.arange(rows)}
+    for i in range(columns - n_categorical):
+        values = rng.normal(shift * (i % 3 == 0), 1, rows)
+        values[rng.random(rows) < 0.2] = np.nan
+        data[f"num_{i}"] = values
+    for i in range(n_categorical):
+        data[f"cat_{i}"] = rng.choice([f"m{k}" for k in range(2 + i % 10)], rows)
+    return pd.DataFrame(data)
+
+
+def measure(func):
+    """Durée (s) et pic mémoire (Mo) d'un appel"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reference-rows", type=int, default=307511, help="Lignes du jeu de référence")
+    parser.add_argument("--current-rows", type=int, default=48744, help="Lignes du jeu courant")
+    parser.add_argument("--columns", type=int, default=120, help="Nombre de colonnes")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATA_DIR, config.REPORTING_DIR = tmp, os.path.join(tmp, "report")
+        train_path, test_path = os.path.join(tmp, "application_train.csv"), os.path.join(tmp, "application_test.csv")
+        make_table(args.reference_rows, args.columns, 0).to_csv(train_path, index=False)
+        make_table(args.current_rows, args.columns, 1, shift=0.75).to_csv(test_path, index=False)
+        profile_path = os.path.join(tmp, "reference_profile.json")
+        columns = pd.read_csv(test_path, nrows=0).columns.tolist()
+
+        print(f"Référence {args.reference_rows} lignes, courant {args.current_rows} lignes, {args.columns} colonnes")
+        _, seconds, peak = measure(lambda: (pd.read_csv(train_path), pd.read_csv(test_path)))
+        print(f"  chargement complet {seconds:7.2f} s   pic {peak:7.0f} Mo")
+        # Cache Parquet de la référence créé avant la mesure (comme après un premier chargement)
+        from src.data_loader import load_table
+        load_table("application_train.csv", columns=["SK_ID_CURR"])
+        _, seconds, peak = measure(lambda: load_reference_profile(columns, profile_path))
+        print(f"  profil (une fois)  {seconds:7.2f} s   pic {peak:7.0f} Mo   "
+              f"{os.path.getsize(profile_path) / 1024:.0f} Ko sur disque")
+        summary, seconds, peak = measure(lambda: run_data_drift(test_path, profile_path, chunksize=10000))
+        print(f"  analyse            {seconds:7.2f} s   pic {peak:7.0f} Mo   "
+              f"{summary['n_drifted']}/{summary['n_columns']} colonnes en dérive")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+# benchmarks/bench_load.py
+"""
+Test de charge reproductible de l'API de scoring (débit et latences p50 / p95 / p99).
+
+- Transports : "inprocess" (application ASGI appelée directement par httpx, sans
+  réseau, lifespan exécuté) et "server" (serveur uvicorn local lancé dans un
+  sous-processus, requêtes HTTP sur 127.0.0.1).
+- Charge en boucle fermée : concurrency clients virtuels envoient chacun leur
+  requête suivante dès la réponse reçue, jusqu'à --requests requêtes mesurées
+  (après --warmup requêtes d'échauffement non mesurées).
+- Mélanges de requêtes (--mix) : "predict" (/predict?explain=false), "shap"
+  (/predict avec SHAP), "batch" (/predict/batch de BATCH_SIZE clients, sans SHAP)
+  et "mixed" (70 % / 20 % / 10 %).
+- Reproductibilité : les clients (--clients dossiers distincts, certains soumis
+  plusieurs fois, donc servis par le cache) et l'ordre des requêtes sont tirés
+  d'un générateur seedé (--seed) : deux lancements envoient la même séquence.
+
+Les résultats (une entrée transport/mélange/concurrence) sont écrits en JSON par
+--save ; --compare relit un JSON de référence et signale les régressions
+(latence au-delà de --tolerance, débit en deçà), avec un code de sortie 1.
+
+Usage :
+    python -m benchmarks.bench_load --save benchmarks/baselines/main.json
+    python -m benchmarks.bench_load --compare benchmarks/baselines/main.json
+    python -m benchmarks.bench_load --transport inprocess --mix shap --concurrency 1 4 16
+"""
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+TRANSPORTS = ("inprocess", "server")
+# Endpoint de chaque type de requête
+ENDPOINTS = {
+    "predict": "/predict?explain=false",
+    "shap": "/predict?explain=true",
+    "batch": "/predict/batch?explain=false",
+}
+# Part de chaque type de requête dans un mélange
+MIXES = {
+    "predict": {"predict": 1.0},
+    "shap": {"shap": 1.0},
+    "batch": {"batch": 1.0},
+    "mixed": {"predict": 0.7, "shap": 0.2, "batch": 0.1},
+}
+BATCH_SIZE = 20
+# Régression de latence signalée seulement au-delà de cet écart absolu (bruit de mesure)
+MIN_DELTA_MS = 0.2
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_clients(n: int, seed=0) -> list:
+    """n dossiers clients distincts et plausibles (schéma ClientData), tirés d'un générateur seedé"""
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "DAYS_BIRTH": int(rng.integers(-25000, -7000)),
+            "DAYS_EMPLOYED": int(rng.integers(-15000, 0)),
+            "bureau_DAYS_CREDIT_UPDATE_mean": round(float(rng.uniform(-1500, 0)), 2),
+            "REGION_RATING_CLIENT_W_CITY": int(rng.integers(1, 4)),
+            "NAME_INCOME_TYPE_Working": int(rng.integers(0, 2)),
+            "DAYS_LAST_PHONE_CHANGE": int(rng.integers(-4000, 0)),
+            "DAYS_ID_PUBLISH": int(rng.integers(-7000, 0)),
+            "EXT_SOURCE_1": round(float(rng.uniform(0, 1)), 4),
+            "EXT_SOURCE_2": round(float(rng.uniform(0, 1)), 4),
+            "EXT_SOURCE_3": round(float(rng.uniform(0, 1)), 4),
+        }
+        for _ in range(n)
+    ]
+
+
+def make_plan(mix: str, n: int, clients: list, seed=0) -> list:
+    """Séquence reproductible de n requêtes (url, corps JSON) d'un mélange"""
+    rng = np.random.default_rng(seed)
+    kinds = list(MIXES[mix])
+    weights = np.array([MIXES[mix][kind] for kind in kinds])
+    plan = []
+    for kind in rng.choice(kinds, size=n, p=weights / weights.sum()):
+        if kind == "batch":
+            body = [clients[i] for i in rng.integers(0, len(clients), BATCH_SIZE)]
+        else:
+            body = clients[rng.integers(0, len(clients))]
+        plan.append((ENDPOINTS[kind], body))
+    return plan
+
+
+async def run_load(client, plan: list, concurrency: int, warmup: int = 0) -> dict:
+    """
+    Rejoue plan avec concurrency clients virtuels (httpx.AsyncClient) : les warmup
+    premières requêtes échauffent l'API, le débit et les latences sont mesurés sur les suivantes
+    """
+    measured = plan[warmup:]
+    latencies = np.empty(len(measured))
+    errors = 0
+
+    async def user(requests, indices, timed):
+        nonlocal errors
+        for i in indices:
+            url, body = requests[i]
+            start = time.perf_counter()
+            response = await client.post(url, json=body)
+            if timed:
+                latencies[i] = time.perf_counter() - start
+                errors += response.status_code != 200
+
+    # Itérateur partagé : chaque client virtuel prend la requête suivante du plan
+    indices = iter(range(warmup))
+    await asyncio.gather(*(user(plan, indices, False) for _ in range(concurrency)))
+
+    indices = iter(range(len(measured)))
+    started = time.perf_counter()
+    await asyncio.gather(*(user(measured, indices, True) for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+    return summarize(latencies * 1e3, duration, errors)
+
+
+def summarize(latencies_ms: np.ndarray, duration: float, errors: int) -> dict:
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        "requests": len(latencies_ms),
+        "errors": errors,
+        "duration_s": round(duration, 4),
+        "throughput_rps": round(len(latencies_ms) / duration, 2),
+        "mean_ms": round(float(latencies_ms.mean()), 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "max_ms": round(float(latencies_ms.max()), 4),
+    }
+
+
+async def _wait_ready(client, timeout: float = 120.0):
+    """Attend que /ready réponde 200 (modèle chargé et échauffé)"""
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = await client.get("/ready")
+            if response.status_code == 200:
+                return response.json()
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise TimeoutError(f"API non prête après {timeout:.0f} s")
+
+
+async def run_inprocess(plans: dict, warmup: int, log_dir: str) -> dict:
+    """Application ASGI appelée dans le même processus (lifespan compris)"""
+    import httpx
+
+    from src.api import app as api
+
+    # Journal des décisions du benchmark hors de data/
+    api.prediction_log.directory = log_dir
+    results = {}
+    async with api.app.router.lifespan_context(api.app):
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await _wait_ready(client)
+            for (mix, concurrency), plan in plans.items():
+                results[f"inprocess/{mix}/c{concurrency}"] = await run_load(client, plan, concurrency, warmup)
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_server(plans: dict, warmup: int, log_dir: str, workers: int = 1) -> dict:
+    """Serveur uvicorn local (sous-processus), requêtes HTTP réelles"""
+    import httpx
+
+    port = _free_port()
+    env = {**os.environ, "PREDICTION_LOG_DIR": log_dir}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.app:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT_DIR, env=env,
+    )
+    results = {}
+    try:
+        connections = max(concurrency for _, concurrency in plans)
+        limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            await _wait_ready(client)
+            for (mix, concurrency), plan in plans.items():
+                results[f"server/{mix}/c{concurrency}"] = await run_load(client, plan, concurrency, warmup)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return results
+
+
+def run_benchmark(transport=TRANSPORTS, mix=("predict", "shap", "mixed"), concurrency=(1, 8), requests=1000,
+                  warmup=100, clients=500, seed=0, workers=1) -> dict:
+    """Mesure chaque combinaison transport / mélange / concurrence ; résultats et contexte de la mesure"""
+    # Dossiers propres à chaque entrée : une entrée ne profite pas du cache rempli par la précédente
+    plans = {}
+    for i, (name, users) in enumerate(itertools.product(mix, concurrency)):
+        pool = make_clients(clients, seed=[seed, i, 0])
+        plans[name, users] = make_plan(name, warmup + requests, pool, seed=[seed, i, 1])
+
+    results = {}
+    with tempfile.TemporaryDirectory() as log_dir:
+        if "inprocess" in transport:
+            results.update(asyncio.run(run_inprocess(plans, warmup, log_dir)))
+        if "server" in transport:
+            results.update(asyncio.run(run_server(plans, warmup, log_dir, workers)))
+    settings = {"transport": list(transport), "mix": list(mix), "concurrency": list(concurrency), "requests": requests,
+                "warmup": warmup, "clients": clients, "seed": seed, "workers": workers}
+    return {"environment": environment(), "settings": settings, "results": results}
+
+
+def environment() -> dict:
+    """Contexte de la mesure, enregistré avec les résultats"""
+    import lightgbm
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "lightgbm": lightgbm.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 0.25) -> list:
+    """
+    Écarts entre deux runs, pour les entrées présentes dans les deux.
+    Régression : quantile de latence supérieur de plus de tolerance (et de MIN_DELTA_MS)
+    à la référence, ou débit inférieur de plus de tolerance.
+    """
+    rows = []
+    for key, reference in baseline["results"].items():
+        result = current["results"].get(key)
+        if result is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            ratio = result[metric] / reference[metric]
+            regression = ratio > 1 + tolerance and result[metric] - reference[metric] > MIN_DELTA_MS
+            rows.append({"key": key, "metric": metric, "baseline": reference[metric],
+                         "current": result[metric], "ratio": ratio, "regression": regression})
+        ratio = result["throughput_rps"] / reference["throughput_rps"]
+        rows.append({"key": key, "metric": "throughput_rps", "baseline": reference["throughput_rps"],
+                     "current": result["throughput_rps"], "ratio": ratio, "regression": ratio < 1 - tolerance})
+    return rows
+
+
+def report(results: dict):
+    print(f"{'transport/mélange/concurrence':<28} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'erreurs':>8}")
+    for key, result in results.items():
+        print(f"{key:<28} {result['throughput_rps']:9.1f} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} "
+              f"{result['p99_ms']:9.2f} {result['errors']:8d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transport", nargs="+", choices=TRANSPORTS, default=list(TRANSPORTS))
+    parser.add_argument("--mix", nargs="+", choices=list(MIXES), default=["predict", "shap", "mixed"])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8], help="Clients virtuels simultanés")
+    parser.add_argument("--requests", type=int, default=1000, help="Requêtes mesurées par entrée")
+    parser.add_argument("--warmup", type=int, default=100, help="Requêtes d'échauffement par entrée")
+    parser.add_argument("--clients", type=int, default=500, help="Dossiers clients distincts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="Workers uvicorn (transport server)")
+    parser.add_argument("--save", help="Fichier JSON où écrire les résultats")
+    parser.add_argument("--compare", help="Fichier JSON de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Écart relatif toléré avant régression")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    settings = {key: value for key, value in vars(args).items() if key not in ("save", "compare", "tolerance")}
+    run = run_benchmark(**settings)
+    report(run["results"])
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2, ensure_ascii=False)
+        print(f"\nRésultats sauvegardés : {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(baseline, run, args.tolerance)
+        print(f"\nComparaison à {args.compare} (commit {baseline['environment'].get('git_commit')}, "
+              f"tolérance {args.tolerance:.0%})")
+        for row in rows:
+            flag = "  RÉGRESSION" if row["regression"] else ""
+            print(f"  {row['key']:<28} {row['metric']:<15} {row['baseline']:10.2f} -> {row['current']:10.2f} "
+                  f"(x{row['ratio']:.2f}){flag}")
+        regressions = [row for row in rows if row["regression"]]
+        print(f"{len(regressions)} régression(s) sur {len(rows)} mesures")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_metrics.py
+"""
+Coût de l'instrumentation de l'API (histogrammes par étape, compteurs, middleware).
+
+- coût unitaire des primitives (observation d'un histogramme, étape mesurée)
+- latence de bout en bout de /predict?explain=false avec l'instrumentation
+  activée puis désactivée (client de test in-process, même payload)
+
+Usage :
+    python -m benchmarks.bench_metrics --n 3000
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from src.api import app as api
+from src.api.metrics import Histogram
+from benchmarks.bench_predict import PAYLOAD
+
+
+def per_call_ns(func, n=200000):
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return (time.perf_counter() - start) / n * 1e9
+
+
+def measure_endpoint(client, n):
+    """Latences (µs) de n appels à /predict?explain=false"""
+    for _ in range(100):
+        client.post("/predict?explain=false", json=PAYLOAD)
+    timings = np.empty(n)
+    for i in range(n):
+        start = time.perf_counter()
+        client.post("/predict?explain=false", json=PAYLOAD)
+        timings[i] = time.perf_counter() - start
+    return timings * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=3000, help="Nombre de requêtes mesurées par mode")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    api.registry.ensure_ready()
+
+    histogram = Histogram()
+    metrics = api.metrics
+
+    def stage():
+        with metrics.stage("bench"):
+            pass
+
+    print("Primitives")
+    print(f"  Histogram.observe          {per_call_ns(lambda: histogram.observe(1e-4)):7.0f} ns")
+    metrics.enabled = True
+    print(f"  étape mesurée (activée)    {per_call_ns(stage):7.0f} ns")
+    metrics.enabled = False
+    print(f"  étape mesurée (désactivée) {per_call_ns(stage):7.0f} ns")
+
+    client = TestClient(api.app)
+    results = {}
+    for enabled in (False, True, False, True):
+        metrics.enabled = enabled
+        results.setdefault(enabled, []).append(measure_endpoint(client, args.n))
+
+    print(f"\n/predict?explain=false, {2 * args.n} appels par mode (client de test in-process)")
+    for enabled in (False, True):
+        timings = np.concatenate(results[enabled])
+        p50, p99 = np.percentile(timings, [50, 99])
+        label = "activée" if enabled else "désactivée"
+        print(f"  instrumentation {label:<11} p50={p50:8.1f} µs   p99={p99:8.1f} µs")
+    overhead = np.median(np.concatenate(results[True])) - np.median(np.concatenate(results[False]))
+    print(f"  surcoût médian : {overhead:.1f} µs par requête")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# benchmarks/bench_offline.py
+"""
+Temps et pic mémoire de chaque étape du pipeline hors ligne, sur le jeu Home Credit
+synthétique (src/synthetic_data.py) à plusieurs échelles.
+
+Étapes mesurées, dans l'ordre du pipeline :
+- chargement : load_all_data au premier appel (lecture des CSV et création du cache
+  Parquet), puis depuis le cache
+- feature engineering : chaque agrégation de FeatureEngineer (séquentielle, pour
+  isoler son coût) et la jointure des agrégats à train et test
+- Preprocessor.fit sur train, Preprocessor.transform sur train puis test
+- optimize_decision_threshold sur la cible de train (score : 1 - moyenne des
+  EXT_SOURCE, un score par client comme les probabilités du modèle)
+
+Chaque étape est exécutée deux fois : une pour le temps, une sous tracemalloc
+pour le pic mémoire Python (tableaux NumPy et objets pandas ; les tampons Arrow
+de la lecture Parquet n'y figurent pas). L'exposant d'échelle est la pente de
+log(temps) en fonction de log(échelle) : ~1 pour une étape linéaire en volume.
+
+Usage :
+    python -m benchmarks.bench_offline --scales 0.01 0.03 0.1
+    python -m benchmarks.bench_offline --scales 0.1 1 --data-dir /data/synthetic --save offline.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+
+from src.config.config import config
+from src.data_loader import load_all_data
+from src.preprocessing.feature_engineering import FeatureEngineer
+from src.preprocessing.preprocess import Preprocessor
+from src.synthetic_data import ensure_dataset
+from src.training.scoring import optimize_decision_threshold
+
+
+def measure(func, setup=None):
+    """Temps (s) d'un appel, puis pic mémoire Python (Mo) d'un second appel ; résultat du premier"""
+    # Les étapes affichent leur propre timer : sortie masquée pendant la mesure
+    with contextlib.redirect_stdout(io.StringIO()):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - start
+
+        if setup:
+            setup()
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, seconds, peak / 2**20
+
+
+def run_stages(data_dir: str) -> dict:
+    """Étape -> {"seconds", "peak_mb", "rows"} sur le jeu de data_dir"""
+    cache_dir = os.path.join(data_dir, "cache")
+    results = {}
+
+    def record(stage, func, rows, *args, setup=None):
+        # Tables passées en arguments (pas de closure) : libérées dès que l'étape est mesurée
+        result, seconds, peak = measure(lambda: func(*args), setup)
+        results[stage] = {"seconds": round(seconds, 4), "peak_mb": round(peak, 1), "rows": int(rows)}
+        return result
+
+    data = record("chargement CSV + cache", lambda: load_all_data(max_workers=1), 0,
+                  setup=lambda: shutil.rmtree(cache_dir, ignore_errors=True))
+    rows = sum(len(df) for df in data.values())
+    results["chargement CSV + cache"]["rows"] = rows
+    data = record("chargement cache Parquet", lambda: load_all_data(max_workers=1), rows)
+
+    fe = FeatureEngineer()
+    aggregates = [
+        record("FE bureau + bureau_balance", fe.process_bureau, len(data["bureau"]) + len(data["bureau_balance"]),
+               data["bureau"], data["bureau_balance"]),
+        record("FE previous", fe.process_previous, len(data["previous"]), data["previous"]),
+        record("FE installments", fe.process_installments, len(data["installments"]), data["installments"]),
+        record("FE POS", fe.process_pos, len(data["pos"]), data["pos"]),
+        record("FE credit", fe.process_credit, len(data["credit"]), data["credit"]),
+    ]
+    train, test = record("FE jointure", fe.merge_aggregates, len(data["train"]) + len(data["test"]),
+                         data["train"], data["test"], aggregates)
+    del data, aggregates
+
+    preprocessor = Preprocessor()
+    record("Preprocessor.fit", lambda: preprocessor.fit(train), len(train))
+    record("Preprocessor.transform train", lambda: preprocessor.transform(train), len(train))
+    record("Preprocessor.transform test", lambda: preprocessor.transform(test), len(test))
+
+    y = train[config.TARGET].to_numpy()
+    score = 1 - train[["EXT_SOURCE_1", "EXT_SOURCE_2", "EXT_SOURCE_3"]].mean(axis=1).fillna(0.5).to_numpy()
+    record("optimize_decision_threshold", lambda: optimize_decision_threshold(y, score, save=False), len(y))
+    return results
+
+
+def scaling_exponents(runs: dict) -> dict:
+    """Étape -> pente de log(temps) en fonction de log(échelle)"""
+    scales = sorted(runs)
+    if len(scales) < 2:
+        return {}
+    exponents = {}
+    for stage in runs[scales[0]]:
+        seconds = np.array([max(runs[scale][stage]["seconds"], 1e-6) for scale in scales])
+        exponents[stage] = round(float(np.polyfit(np.log(scales), np.log(seconds), 1)[0]), 2)
+    return exponents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", type=float, default=[0.01, 0.03, 0.1],
+                        help="Échelles du jeu synthétique (1 = volume du jeu Kaggle)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", help="Dossier des jeux générés, réutilisés d'un lancement à l'autre "
+                                           "(par défaut : dossier temporaire)")
+    parser.add_argument("--save", help="Fichier JSON où écrire les résultats")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    root = args.data_dir or tempfile.mkdtemp(prefix="synthetic-")
+    data_dir = config.DATA_DIR
+    runs = {}
+    try:
+        for scale in sorted(args.scales):
+            directory = os.path.join(root, f"scale-{scale:g}")
+            start = time.perf_counter()
+            counts = ensure_dataset(directory, scale, args.seed)
+            print(f"\nÉchelle {scale:g} : {counts['train'] + counts['test']:,} clients, "
+                  f"{sum(counts.values()):,} lignes (jeu prêt en {time.perf_counter() - start:.1f} s)")
+            # load_all_data et optimize_decision_threshold utilisent config.DATA_DIR
+            config.DATA_DIR = directory
+            try:
+                runs[scale] = run_stages(directory)
+            finally:
+                config.DATA_DIR = data_dir
+            print(f"  {'étape':<32} {'temps (s)':>10} {'pic (Mo)':>10} {'lignes/s':>12}")
+            for stage, result in runs[scale].items():
+                rate = result["rows"] / result["seconds"] if result["seconds"] else float("nan")
+                print(f"  {stage:<32} {result['seconds']:10.3f} {result['peak_mb']:10.1f} {rate:12,.0f}")
+    finally:
+        if not args.data_dir:
+            shutil.rmtree(root, ignore_errors=True)
+
+    exponents = scaling_exponents(runs)
+    if exponents:
+        print("\nExposant d'échelle du temps (1 : linéaire)")
+        for stage, exponent in exponents.items():
+            print(f"  {stage:<32} {exponent:5.2f}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"seed": args.seed, "runs": {f"{scale:g}": run for scale, run in runs.items()},
+                       "scaling_exponents": exponents}, f, indent=2, ensure_ascii=False)
+        print(f"\nRésultats sauvegardés : {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/bench_predict.py
+"""
+Comparaison avant / après du chemin de prédiction unitaire de l'API.
+
+- "avant" : pd.DataFrame([client.model_dump()]) + model.predict + model.predict_proba
+- "après" : ligne NumPy préallouée + une seule inférence sur le booster natif
+
+Les deux chemins sont mesurés sur le payload de tests/test_api.py,
+avec et sans le calcul SHAP (identique dans les deux cas).
+
+Usage :
+    python -m benchmarks.bench_predict --n 2000
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from src.api import app as api
+from src.api.schemas import ClientData
+
+PAYLOAD = {
+    "DAYS_BIRTH": -12000,
+    "DAYS_EMPLOYED": -2000,
+    "bureau_DAYS_CREDIT_UPDATE_mean": -30.0,
+    "REGION_RATING_CLIENT_W_CITY": 2,
+    "NAME_INCOME_TYPE_Working": 1,
+    "DAYS_LAST_PHONE_CHANGE": -1000,
+    "DAYS_ID_PUBLISH": -3000,
+    "EXT_SOURCE_1": 0.45,
+    "EXT_SOURCE_2": 0.62,
+    "EXT_SOURCE_3": 0.58
+}
+
+
+def legacy_inference(client: ClientData):
+    """Ancien chemin : DataFrame + deux inférences"""
+    model = api.registry.current.model
+    df = pd.DataFrame([client.model_dump()])
+    prediction = model.predict(df)[0]
+    probability = model.predict_proba(df)[0][1]
+    return df, prediction, probability
+
+
+def fast_inference(client: ClientData):
+    """Nouveau chemin : ligne préallouée + une inférence"""
+    row = api._client_row(client)
+    probability = api.predict_default_proba(api.registry.current, row)[0]
+    return row, probability
+
+
+def legacy_full(client: ClientData):
+    df, _, _ = legacy_inference(client)
+    return api.registry.current.explainer.shap_values(df)
+
+
+def fast_full(client: ClientData):
+    row, _ = fast_inference(client)
+    return api.registry.current.explainer.shap_values(row)
+
+
+def measure(func, client, n, warmup=50):
+    """Retourne les latences (en µs) de n appels après un échauffement"""
+    for _ in range(warmup):
+        func(client)
+    timings = np.empty(n)
+    for i in range(n):
+        start = time.perf_counter()
+        func(client)
+        timings[i] = time.perf_counter() - start
+    return timings * 1e6
+
+
+def report(name, timings):
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+    print(f"{name:<28} p50={p50:9.1f} µs   p95={p95:9.1f} µs   p99={p99:9.1f} µs")
+    return p50, p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=2000, help="Nombre d'appels mesurés par chemin")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    client = ClientData(**PAYLOAD)
+
+    # Vérification : les deux chemins donnent la même probabilité
+    _, _, p_legacy = legacy_inference(client)
+    _, p_fast = fast_inference(client)
+    assert abs(p_legacy - p_fast) < 1e-12, (p_legacy, p_fast)
+
+    print(f"Inférence seule ({args.n} appels)")
+    before = report("  avant (DataFrame x2)", measure(legacy_inference, client, args.n))
+    after = report("  après (ligne NumPy x1)", measure(fast_inference, client, args.n))
+    print(f"  gain p50 x{before[0] / after[0]:.1f}, p99 x{before[1] / after[1]:.1f}\n")
+
+    print(f"Inférence + SHAP ({args.n} appels)")
+    before = report("  avant (DataFrame x2)", measure(legacy_full, client, args.n))
+    after = report("  après (ligne NumPy x1)", measure(fast_full, client, args.n))
+    print(f"  gain p50 x{before[0] / after[0]:.1f}, p99 x{before[1] / after[1]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# benchmarks/bench_prediction_log.py
+"""
+Coût du journal des décisions (PredictionLogger) sur le chemin des requêtes.
+
+- coût unitaire de log() (dépôt dans la file) et débit de l'écrivain de fond
+- latence de bout en bout de /predict?explain=false avec le journal activé
+  (écrivain Parquet en arrière-plan) puis désactivé (client de test in-process)
+
+Usage :
+    python -m benchmarks.bench_prediction_log --n 3000
+"""
+import argparse
+import tempfile
+import time
+import warnings
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from src.api import app as api
+from src.api.prediction_log import PredictionLogger
+from benchmarks.bench_metrics import measure_endpoint, per_call_ns
+from benchmarks.bench_predict import PAYLOAD
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=3000, help="Nombre de requêtes mesurées par mode")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    api.registry.ensure_ready()
+    features = [float(PAYLOAD[name]) for name in api.FEATURE_NAMES]
+    response = {"model_version": "v1", "threshold_used": 0.5, "probability_default": 0.1, "prediction": 0}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = PredictionLogger(tmp, api.FEATURE_NAMES, max_queue=10**7)
+        print("Primitives")
+        print(f"  log() (dépôt dans la file)   {per_call_ns(lambda: logger.log('/predict', features, response, 1.0)):7.0f} ns")
+        queued = logger.stats()["queued"]
+        start = time.perf_counter()
+        logger.flush()
+        seconds = time.perf_counter() - start
+        print(f"  écriture Parquet par lots    {queued / seconds:9.0f} décisions/s")
+
+        api.prediction_log = PredictionLogger(tmp, api.FEATURE_NAMES)
+        api.prediction_log.start()
+        client = TestClient(api.app)
+        results = {}
+        for enabled in (False, True, False, True):
+            api.prediction_log.enabled = enabled
+            results.setdefault(enabled, []).append(measure_endpoint(client, args.n))
+        api.prediction_log.stop()
+
+    print(f"\n/predict?explain=false, {2 * args.n} appels par mode (client de test in-process)")
+    for enabled in (False, True):
+        timings = np.concatenate(results[enabled])
+        p50, p99 = np.percentile(timings, [50, 99])
+        label = "activé" if enabled else "désactivé"
+        print(f"  journal {label:<10} p50={p50:8.1f} µs   p99={p99:8.1f} µs")
+    overhead = np.median(np.concatenate(results[True])) - np.median(np.concatenate(results[False]))
+    print(f"  surcoût médian : {overhead:.1f} µs par requête")
+
+
+if __name__ == "__main__":
+    main()
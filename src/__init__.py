@@ -1,4 +1,16 @@
-from .data_loader import load_all_data
-from .preprocessing.preprocess import Preprocessor
-from .preprocessing.feature_engineering import FeatureEngineer
-from .config import config  # pour exposer la config globalement
\ No newline at end of file
+from .config import config  # pour exposer la config globalement
+
+# Imports paresseux : le pipeline d'entraînement (pandas, etc.) n'est chargé
+# qu'à la première utilisation, pour ne pas ralentir le démarrage de l'API
+_LAZY_IMPORTS = {
+    "load_all_data": ".data_loader",
+    "Preprocessor": ".preprocessing.preprocess",
+    "FeatureEngineer": ".preprocessing.feature_engineering",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        import importlib
+        return getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,2 +1,10 @@
-from .app import FastAPI
-from .schemas import ClientData
\ No newline at end of file
+from .schemas import ClientData
+
+
+# Import paresseux de l'application : importer un sous-module (schemas, cache...)
+# ne doit pas déclencher le chargement du modèle
+def __getattr__(name):
+    if name == "FastAPI":
+        from .app import FastAPI
+        return FastAPI
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,93 +1,600 @@
 # Import du framework FastAPI pour créer l’API
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 
-# Pour gérer les requêtes JSON entrantes
-from pydantic import BaseModel
+from typing import List
 
-# Pour charger le modèle sauvegardé
-import joblib
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 
-# Pour l'interprétabilité
-import shap
-
-# Pour manipuler les données sous forme de DataFrame
-import pandas as pd
+# Pour construire les lignes de features sans passer par pandas
+import numpy as np
+import threading
+import time
+from contextlib import asynccontextmanager
 
 # Importation du schéma de données client
-from src.api.schemas import ClientData
+from src.api.schemas import ClientData, ClientId
+
+# Caches des prédictions et des explications SHAP
+from src.api.cache import LRUCache, client_key
+
+# Registre du modèle servi (rechargement à chaud)
+from src.api.registry import ModelBundle, ModelRegistry, DEFAULT_MODEL_PATH, DEFAULT_THRESHOLD_PATH
+
+# Regroupement des requêtes concurrentes
+from src.api.batching import MicroBatcher
+
+# Features précalculées par client (memory-map)
+from src.api.feature_store import OnlineFeatureStore
+
+# Instrumentation (histogrammes de latence, exposition Prometheus)
+from src.api.metrics import Metrics, MetricsMiddleware
+
+# Surveillance en ligne du data drift des requêtes
+from src.api.drift import LiveDriftMonitor
+
+# Journal des décisions, écrit en arrière-plan
+from src.api.prediction_log import PredictionLogger
 
 # Importation de la fonction de décision
 from src.training.scoring import make_decision
 
 # Importation de la configuration
-import os
-import json
 from src.config.config import config
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Au lancement du worker : chargement (si besoin) et échauffement du modèle en
+    arrière-plan, puis surveillance du modèle, du seuil et du drift. Le serveur répond
+    immédiatement sur /, et /ready passe à 200 une fois l'échauffement terminé.
+    """
+    threading.Thread(target=_warmup_worker, name="model-warmup", daemon=True).start()
+    registry.start_watching()
+    drift_monitor.start()
+    prediction_log.start()
+    yield
+    registry.stop_watching()
+    drift_monitor.stop()
+    batcher.stop()
+    # Écrit les décisions en attente et ferme le segment courant
+    prediction_log.stop()
+
+
 # Création de l'application FastAPI
 app = FastAPI(
     title="Home Credit Scoring API",
     description="API de prédiction du risque de défaut client",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan
 )
 
-# Chargement du modèle
-model = joblib.load(os.path.join(config.MODELS_DIR, "final_model_LightGBM.pkl"))
-# Chargement du seuil optimal
-THRESHOLD_PATH = os.path.join(config.DATA_DIR, "best_threshold.json")
-with open(THRESHOLD_PATH, "r") as f:
-    THRESHOLD = json.load(f)["best_threshold"]
+# Instrumentation par étape et par endpoint (désactivable par METRICS_ENABLED=0)
+metrics = Metrics(enabled=config.METRICS_ENABLED)
+app.add_middleware(MetricsMiddleware, metrics=metrics)
 
-# Initialisation de l'explainer SHAP (au démarrage pour ne pas ralentir les requêtes)
-explainer = shap.TreeExplainer(model)
+# Chargement du modèle, du seuil optimal et de l'explainer SHAP via le registre
+MODEL_PATH = DEFAULT_MODEL_PATH
+THRESHOLD_PATH = DEFAULT_THRESHOLD_PATH
+registry = ModelRegistry(MODEL_PATH, THRESHOLD_PATH, poll_interval=config.MODEL_WATCH_INTERVAL)
 
-@app.post("/predict")
-def predict(client: ClientData):
+# Ordre figé des colonnes envoyées au modèle : celui du schéma ClientData
+# (identique à l'ancien pd.DataFrame([client.model_dump()]), le modèle étant positionnel)
+FEATURE_NAMES = list(ClientData.model_fields)
+
+# Cache des explications SHAP, indexé par la clé canonique du client
+explain_cache = LRUCache(maxsize=config.EXPLAIN_CACHE_SIZE)
+
+# Cache des probabilités, pour les soumissions répétées d'un même dossier
+prediction_cache = LRUCache(
+    maxsize=config.PREDICTION_CACHE_SIZE,
+    ttl=config.PREDICTION_CACHE_TTL
+)
+
+
+def _on_model_swap(bundle: ModelBundle):
+    """Invalide les caches dès qu'un nouveau modèle ou un nouveau seuil est actif"""
+    prediction_cache.set_generation((bundle.version, bundle.threshold))
+    explain_cache.set_generation(bundle.version)
+
+
+registry.on_swap(_on_model_swap)
+
+# Features et probabilités des dernières requêtes, comparées en arrière-plan aux données d'entraînement
+drift_monitor = LiveDriftMonitor(
+    FEATURE_NAMES,
+    reference_path=config.DRIFT_REFERENCE_PATH,
+    capacity=config.DRIFT_WINDOW_SIZE,
+    interval=config.DRIFT_INTERVAL,
+    enabled=config.DRIFT_MONITOR_ENABLED
+)
+
+# Journal de toutes les décisions (features, probabilité, seuil, version, latence)
+prediction_log = PredictionLogger(
+    config.PREDICTION_LOG_DIR,
+    FEATURE_NAMES,
+    fmt=config.PREDICTION_LOG_FORMAT,
+    max_queue=config.PREDICTION_LOG_MAX_QUEUE,
+    segment_rows=config.PREDICTION_LOG_SEGMENT_ROWS,
+    policy=config.PREDICTION_LOG_POLICY,
+    enabled=config.PREDICTION_LOG_ENABLED
+)
+
+# Feature store en ligne, ouvert au premier appel à /predict/by_id
+feature_store = OnlineFeatureStore(config.FEATURE_STORE_DIR, FEATURE_NAMES)
+
+# Préchargement à l'import, sans inférence : l'échauffement est fait par chaque worker
+if config.API_PRELOAD:
+    registry.load(warmup=False)
+
+
+def process_stats() -> dict:
     """
-    Endpoint de prédiction du risque client
+    Temps de démarrage à froid et mémoire du processus courant (worker).
+    - rss : mémoire résidente totale (inclut les pages partagées avec le maître)
+    - pss : part proportionnelle des pages partagées
+    - uss : mémoire propre au worker (ce que coûte un worker supplémentaire)
     """
+    import psutil
 
-    # Conversion du JSON en DataFrame
-    df = pd.DataFrame([client.model_dump()])
+    process = psutil.Process()
+    memory = process.memory_full_info()
+    startup = registry.ready_at - process.create_time() if registry.ready_at else None
 
-    # Prédiction de la classe (0 = remboursé, 1 = défaut)
-    prediction = model.predict(df)[0]
+    return {
+        "pid": process.pid,
+        "startup_seconds": round(startup, 3) if startup is not None else None,
+        "rss_mb": round(memory.rss / 2**20, 1),
+        "pss_mb": round(getattr(memory, "pss", memory.rss) / 2**20, 1),
+        "uss_mb": round(memory.uss / 2**20, 1)
+    }
 
-    # Probabilité associée à la classe 1 (défaut)
-    probability = model.predict_proba(df)[0][1]
 
-    # Décision finale selon le seuil optimal
-    decision = make_decision(probability, THRESHOLD)
+def _warmup_worker():
+    """Échauffement du worker puis trace du démarrage à froid"""
+    registry.ensure_ready()
+    stats = process_stats()
+    print(
+        f"Worker {stats['pid']} prêt en {stats['startup_seconds']} sec "
+        f"(RSS {stats['rss_mb']} Mo, USS {stats['uss_mb']} Mo)"
+    )
+
+# Une ligne préallouée par thread (les endpoints synchrones tournent dans un pool de threads)
+_local = threading.local()
+
+
+def _client_row(client: ClientData) -> np.ndarray:
+    """
+    Remplit la ligne préallouée du thread courant avec les features du client,
+    dans l'ordre FEATURE_NAMES, sans construire de dict ni de DataFrame.
+    """
+    row = getattr(_local, "row", None)
+    if row is None:
+        row = _local.row = np.empty((1, len(FEATURE_NAMES)), dtype=np.float64)
+    for i, name in enumerate(FEATURE_NAMES):
+        row[0, i] = getattr(client, name)
+    return row
+
+
+def _clients_matrix(clients: List[ClientData]) -> np.ndarray:
+    """
+    Matrice (n_clients x n_features) dans l'ordre FEATURE_NAMES
+    """
+    X = np.empty((len(clients), len(FEATURE_NAMES)), dtype=np.float64)
+    for j, client in enumerate(clients):
+        for i, name in enumerate(FEATURE_NAMES):
+            X[j, i] = getattr(client, name)
+    return X
+
 
-    # Calcul des valeurs SHAP pour l'interprétabilité
-    shap_vals = explainer.shap_values(df)
-    
-    # Gestion robuste selon la version de SHAP / LightGBM
+def predict_default_proba(bundle: ModelBundle, X: np.ndarray) -> np.ndarray:
+    """
+    Probabilité de défaut (classe 1) : une seule inférence, la classe
+    étant ensuite dérivée de cette probabilité par make_decision.
+    """
+    return bundle.booster.predict(X)
+
+
+def cached_probabilities(bundle: ModelBundle, X: np.ndarray, keys: List[str]) -> list:
+    """
+    Probabilités de défaut de chaque ligne de X, mémoïsées par
+    (version du modèle, seuil, clé du client). Les lignes absentes du cache
+    sont scorées ensemble en une seule inférence.
+    """
+    generation = (bundle.version, bundle.threshold)
+
+    probabilities = [prediction_cache.get((*generation, key)) for key in keys]
+    missing = [i for i, probability in enumerate(probabilities) if probability is None]
+
+    if missing:
+        with metrics.stage("inference"):
+            computed = predict_default_proba(bundle, X[missing])
+        for i, probability in zip(missing, computed):
+            probability = float(probability)
+            prediction_cache.set((*generation, keys[i]), probability)
+            probabilities[i] = probability
+
+    return probabilities
+
+
+def _shap_outputs(bundle: ModelBundle, shap_vals):
+    """
+    Normalise la sortie de explainer.shap_values selon la version de SHAP / LightGBM.
+    Retourne la matrice (n_clients x n_features) de la classe 1 et la valeur de base.
+    """
     if isinstance(shap_vals, list):
         # On prend la classe 1 (Défaut)
-        shap_values_client = shap_vals[1][0].tolist()
-        base_value = explainer.expected_value[1]
-    else:
-        shap_values_client = shap_vals[0].tolist()
-        base_value = explainer.expected_value
+        return shap_vals[1], bundle.explainer.expected_value[1]
+    return shap_vals, bundle.explainer.expected_value
 
-    # Retour JSON
-    return {
+
+def _compute_explanations(bundle: ModelBundle, X: np.ndarray, keys: List[str]) -> list:
+    """
+    Calcule les explications SHAP (valeurs, valeur de base) des lignes de X
+    en un seul appel à SHAP, puis les met en cache.
+    """
+    with metrics.stage("shap"):
+        shap_matrix, base_value = _shap_outputs(bundle, bundle.explainer.shap_values(X))
+    explanations = []
+    for key, shap_row in zip(keys, shap_matrix):
+        explanation = (shap_row.tolist(), float(base_value))
+        explain_cache.set((bundle.version, key), explanation)
+        explanations.append(explanation)
+    return explanations
+
+
+def explain_rows(bundle: ModelBundle, X: np.ndarray, keys: List[str]) -> list:
+    """
+    Explications SHAP pour chaque ligne de X : les explications déjà en cache
+    sont réutilisées, les autres sont calculées ensemble.
+    """
+    explanations = [explain_cache.get((bundle.version, key)) for key in keys]
+    missing = [i for i, explanation in enumerate(explanations) if explanation is None]
+
+    if missing:
+        computed = _compute_explanations(bundle, X[missing], [keys[i] for i in missing])
+        for i, explanation in zip(missing, computed):
+            explanations[i] = explanation
+
+    return explanations
+
+
+def _build_response(bundle: ModelBundle, probability, explanation=None):
+    """
+    Construit la réponse JSON d'un client (commune à /predict et /predict/batch).
+    Les champs SHAP ne sont présents que si une explication est fournie.
+    """
+    # Décision finale selon le seuil optimal
+    decision = make_decision(probability, bundle.threshold)
+
+    response = {
         "prediction": int(decision),
         "probability_default": float(probability),
-        "threshold_used": THRESHOLD,
+        "threshold_used": bundle.threshold,
         "decision": "REFUSÉ" if decision == 1 else "ACCEPTÉ",
+        "model_version": bundle.version
+    }
+
+    if explanation is not None:
+        shap_values_client, base_value = explanation
+        response["shap_values"] = shap_values_client
+        response["base_value"] = base_value
+        response["feature_names"] = FEATURE_NAMES
+
+    return response
+
+
+def score_rows(X: np.ndarray, keys: List[str], explain: List[bool]) -> list:
+    """
+    Score vectorisé d'un ensemble de lignes : une inférence pour toutes les
+    lignes absentes du cache, un appel SHAP pour celles qui demandent une
+    explication. Utilisé par /predict/batch et par le micro-batching de /predict.
+    """
+    bundle = registry.get()
+
+    # Probabilités de défaut (classe 1) en un seul appel (clients absents du cache)
+    probabilities = cached_probabilities(bundle, X, keys)
+    drift_monitor.record_many(X, probabilities)
+
+    # Valeurs SHAP en un seul appel (clients absents du cache uniquement)
+    explanations = [None] * len(keys)
+    to_explain = [i for i, flag in enumerate(explain) if flag]
+    if to_explain:
+        computed = explain_rows(bundle, X[to_explain], [keys[i] for i in to_explain])
+        for i, explanation in zip(to_explain, computed):
+            explanations[i] = explanation
+
+    return [
+        _build_response(bundle, probability, explanation)
+        for probability, explanation in zip(probabilities, explanations)
+    ]
+
+
+def _score_microbatch(items: list) -> list:
+    """Score d'un lot de requêtes /predict regroupées : items = [(ligne, clé, explain)]"""
+    X = np.array([row for row, _, _ in items])
+    keys = [key for _, key, _ in items]
+    explain = [flag for _, _, flag in items]
+    return score_rows(X, keys, explain)
+
+
+# Regroupement des requêtes /predict concurrentes (activé par MICROBATCH_ENABLED)
+batcher = MicroBatcher(
+    _score_microbatch,
+    max_batch_size=config.MICROBATCH_MAX_SIZE,
+    max_wait_ms=config.MICROBATCH_MAX_WAIT_MS
+)
+
+
+def _elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
+
+
+def _predict_one(client: ClientData, explain: bool, started: float) -> dict:
+    """Chemin unitaire de /predict (sans regroupement)"""
+
+    # Bundle actif lu une seule fois : la requête reste cohérente pendant un rechargement
+    bundle = registry.get()
+
+    # Ligne de features préallouée (ordre fixe des colonnes)
+    with metrics.stage("features"):
+        row = _client_row(client)
+        key = client_key(row)
+
+    # Probabilité associée à la classe 1 (défaut), une seule inférence (ou cache)
+    probability = cached_probabilities(bundle, row, [key])[0]
+    drift_monitor.record(row[0], probability)
+
+    # Valeurs SHAP pour l'interprétabilité (depuis le cache si possible)
+    explanation = explain_rows(bundle, row, [key])[0] if explain else None
+
+    # Retour JSON (décision journalisée hors du chemin de la requête)
+    response = _build_response(bundle, probability, explanation)
+    prediction_log.log("/predict", row[0].tolist(), response, _elapsed_ms(started))
+    return response
+
+
+@app.post("/predict")
+async def predict(client: ClientData, explain: bool = True):
+    """
+    Endpoint de prédiction du risque client.
+    explain=false : décision seule, sans calcul des valeurs SHAP.
+    Avec MICROBATCH_ENABLED, les requêtes concurrentes sont regroupées et
+    scorées ensemble ; la réponse de chaque client est inchangée.
+    """
+    metrics.mark_handler_start()
+    started = time.perf_counter()
+
+    if config.MICROBATCH_ENABLED:
+        with metrics.stage("features"):
+            row = _clients_matrix([client])[0]
+            key = client_key(row)
+        response = await batcher.submit((row, key, explain))
+        log_args = ("/predict", row.tolist(), response, _elapsed_ms(started))
+        # Politique "block" : l'attente d'une place dans la file se fait hors de la boucle
+        if prediction_log.may_block:
+            await run_in_threadpool(prediction_log.log, *log_args)
+        else:
+            prediction_log.log(*log_args)
+        return response
+
+    return await run_in_threadpool(_predict_one, client, explain, started)
+
+
+@app.post("/predict/batch")
+def predict_batch(clients: List[ClientData], explain: bool = True):
+    """
+    Endpoint de prédiction pour une liste de clients.
+    Un seul appel à predict_proba et à SHAP pour tout le lot.
+    """
+    metrics.mark_handler_start()
+    started = time.perf_counter()
+
+    if len(clients) == 0:
+        raise HTTPException(status_code=422, detail="La liste de clients est vide")
+    if len(clients) > config.API_MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lot trop volumineux : {len(clients)} clients (maximum {config.API_MAX_BATCH_SIZE})"
+        )
+
+    # Une matrice unique pour tout le lot
+    with metrics.stage("features"):
+        X = _clients_matrix(clients)
+        keys = [client_key(x) for x in X]
+
+    results = score_rows(X, keys, [explain] * len(clients))
+    latency = _elapsed_ms(started)
+    for x, result in zip(X.tolist(), results):
+        prediction_log.log("/predict/batch", x, result, latency)
+
+    return {
+        "count": len(results),
+        "results": results
+    }
+
+
+@app.post("/predict/by_id")
+def predict_by_id(client: ClientId, explain: bool = True):
+    """
+    Endpoint de prédiction à partir du seul identifiant client : les features
+    sont lues dans le feature store en ligne puis scorées par le modèle actif.
+    """
+    metrics.mark_handler_start()
+    started = time.perf_counter()
+
+    with metrics.stage("lookup"):
+        try:
+            row = feature_store.lookup(client.SK_ID_CURR)
+        except (OSError, ValueError) as e:
+            raise HTTPException(status_code=503, detail=f"Feature store indisponible : {e}")
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Client {client.SK_ID_CURR} absent du feature store")
+
+    with metrics.stage("features"):
+        key = client_key(row)
+
+    result = score_rows(row, [key], [explain])[0]
+    prediction_log.log("/predict/by_id", row[0].tolist(), result, _elapsed_ms(started))
+
+    return {
+        "SK_ID_CURR": client.SK_ID_CURR,
+        **result
+    }
+
+
+@app.post("/explain")
+def explain(client: ClientData):
+    """
+    Endpoint d'explication SHAP d'un client, sans décision.
+    Réutilise l'explication en cache si le même client a déjà été expliqué.
+    """
+    metrics.mark_handler_start()
+
+    bundle = registry.get()
+    with metrics.stage("features"):
+        row = _client_row(client)
+        key = client_key(row)
+
+    explanation = explain_cache.get((bundle.version, key))
+    cached = explanation is not None
+    if not cached:
+        explanation = _compute_explanations(bundle, row, [key])[0]
+    shap_values_client, base_value = explanation
+
+    return {
         "shap_values": shap_values_client,
-        "base_value": float(base_value),
-        "feature_names": df.columns.tolist()
+        "base_value": base_value,
+        "feature_names": FEATURE_NAMES,
+        "model_version": bundle.version,
+        "cached": cached
     }
 
+
+def _cache_metrics() -> list:
+    """Compteurs des caches et du micro-batching, au format Prometheus"""
+    lines = [
+        "# HELP scoring_cache_hits_total Nombre de hits par cache",
+        "# TYPE scoring_cache_hits_total counter",
+    ]
+    caches = (("predictions", prediction_cache), ("explanations", explain_cache))
+    for name, cache in caches:
+        lines.append(f'scoring_cache_hits_total{{cache="{name}"}} {cache.hits}')
+    lines += [
+        "# HELP scoring_cache_misses_total Nombre de misses par cache",
+        "# TYPE scoring_cache_misses_total counter",
+    ]
+    for name, cache in caches:
+        lines.append(f'scoring_cache_misses_total{{cache="{name}"}} {cache.misses}')
+    lines += [
+        "# HELP scoring_microbatch_items_total Requêtes /predict scorées par micro-batching",
+        "# TYPE scoring_microbatch_items_total counter",
+        f"scoring_microbatch_items_total {batcher.items}",
+        "# HELP scoring_microbatch_batches_total Lots scorés par micro-batching",
+        "# TYPE scoring_microbatch_batches_total counter",
+        f"scoring_microbatch_batches_total {batcher.batches}",
+    ]
+    return lines
+
+
+metrics.register_collector(_cache_metrics)
+metrics.register_collector(drift_monitor.prometheus_lines)
+metrics.register_collector(prediction_log.prometheus_lines)
+
+
+@app.get("/metrics")
+def metrics_endpoint():
+    """
+    Métriques de l'API au format texte Prometheus (propres à ce worker)
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/monitoring/drift")
+def monitoring_drift(refresh: bool = False):
+    """
+    PSI, KS et taux de manquants par feature (et pour la probabilité de défaut) des
+    dernières requêtes de ce worker, par rapport aux données d'entraînement.
+    Dernier calcul de la tâche de fond ; refresh=true force un nouveau calcul.
+    """
+    result = drift_monitor.result
+    if refresh or result is None:
+        result = drift_monitor.refresh()
+    if result is None:
+        raise HTTPException(status_code=503, detail=f"Drift indisponible : {drift_monitor.last_error}")
+    return {
+        "interval_seconds": drift_monitor.interval,
+        "capacity": drift_monitor.capacity,
+        **result
+    }
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    """
+    Statistiques des caches de prédictions et d'explications
+    """
+    bundle = registry.get()
+    return {
+        "model_version": bundle.version,
+        "threshold": bundle.threshold,
+        "predictions": prediction_cache.stats(),
+        "explanations": explain_cache.stats(),
+        "microbatching": batcher.stats()
+    }
+
+
 @app.get("/")
 def root():
     """
     Endpoint racine pour vérifier que l'API fonctionne
     """
+    bundle = registry.current
     return {
         "message": "API is running",
-        "version": app.version
+        "version": app.version,
+        **(bundle.info() if bundle is not None else {})
+    }
+
+
+@app.get("/ready")
+def ready():
+    """
+    Sonde de disponibilité : 200 une fois le modèle chargé et échauffé dans ce
+    worker, 503 sinon. Expose aussi le démarrage à froid et la mémoire du worker.
+    """
+    if not registry.ready:
+        return JSONResponse(status_code=503, content={"ready": False})
+
+    return {
+        "ready": True,
+        **registry.current.info(),
+        **process_stats()
+    }
+
+
+@app.post("/admin/reload")
+def admin_reload():
+    """
+    Recharge le modèle et le seuil depuis le disque.
+    Le nouveau bundle est construit hors du chemin des requêtes puis échangé
+    atomiquement ; les requêtes en cours terminent avec l'ancien.
+    """
+    previous = registry.get()
+    swapped = registry.reload(force=True)
+    if not swapped:
+        raise HTTPException(status_code=500, detail=f"Rechargement impossible : {registry.last_error}")
+
+    # Le feature store reconstruit depuis est rouvert à la demande
+    if feature_store.is_open:
+        try:
+            feature_store.open()
+        except (OSError, ValueError) as e:
+            print(f"Attention: Réouverture du feature store impossible: {e}")
+
+    return {
+        "previous_version": previous.version,
+        **registry.current.info(),
+        "feature_store": feature_store.info()
     }
@@ -0,0 +1,110 @@
+# src/api/batching.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MicroBatcher:
+    """
+    Regroupement adaptatif des requêtes concurrentes (micro-batching).
+
+    Chaque appel à submit() dépose un élément dans une file et attend son résultat.
+    Une tâche de fond vide la file par lots et appelle score_fn(lot) dans un thread
+    dédié (inférence vectorisée), puis résout le futur de chaque appelant avec
+    son propre résultat.
+
+    Règles de constitution d'un lot :
+    - au plus max_batch_size éléments
+    - tout ce qui est déjà en file est pris sans attendre
+    - la fenêtre d'attente (max_wait_ms) n'est appliquée que sous charge, c'est-à-dire
+      si le lot précédent contenait plusieurs éléments : une requête isolée
+      n'attend jamais
+    """
+
+    def __init__(self, score_fn, max_batch_size: int = 64, max_wait_ms: float = 2.0):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="microbatch")
+        self._loop = None
+        self._queue = None
+        self._task = None
+        self._last_batch_size = 0
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item):
+        """Dépose un élément et attend le résultat qui lui correspond"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._start(loop)
+
+        future = loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    def _start(self, loop):
+        """(Re)démarre la tâche de regroupement sur la boucle courante"""
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._task = loop.create_task(self._run())
+
+    async def _collect(self) -> list:
+        """Constitue le prochain lot"""
+        batch = [await self._queue.get()]
+
+        # Tout ce qui est déjà en file, sans attendre
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        # Sous charge uniquement : on attend un peu pour remplir le lot
+        if self._last_batch_size > 1 and len(batch) < self.max_batch_size:
+            deadline = self._loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+        return batch
+
+    async def _run(self):
+        """Boucle de fond : un lot à la fois, pendant que le suivant se remplit"""
+        while True:
+            batch = await self._collect()
+            items = [item for item, _ in batch]
+            self._last_batch_size = len(batch)
+            self.batches += 1
+            self.items += len(batch)
+
+            try:
+                results = await self._loop.run_in_executor(self._executor, self.score_fn, items)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stop(self):
+        """Arrête la tâche de regroupement"""
+        if self._task is not None:
+            try:
+                self._task.cancel()
+            except RuntimeError:
+                # Boucle déjà fermée : la tâche ne tourne plus
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        """Nombre de lots traités et taille moyenne"""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0
+        }
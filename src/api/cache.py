@@ -0,0 +1,103 @@
+# src/api/cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def client_key(row: np.ndarray) -> str:
+    """
+    Clé canonique d'un client : hash des octets de sa ligne de features.
+    La ligne étant en float64 et dans l'ordre figé des colonnes, deux payloads
+    identiques (ex: 2 et 2.0) produisent toujours la même clé.
+    """
+    return hashlib.blake2b(np.ascontiguousarray(row, dtype=np.float64).tobytes(), digest_size=16).hexdigest()
+
+
+def file_digest(path: str, length: int = 12) -> str:
+    """
+    Empreinte courte (sha256) du contenu d'un fichier, utilisée comme version
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:length]
+
+
+class LRUCache:
+    """
+    Cache LRU borné et thread-safe.
+    - maxsize : nombre maximal d'entrées (la moins récemment utilisée est évincée)
+    - ttl : durée de vie d'une entrée en secondes (None = pas d'expiration)
+    - compteurs de hits / misses pour le suivi
+    - génération : le cache se vide automatiquement quand elle change
+      (ex: nouvelle version du modèle ou nouveau seuil)
+    """
+
+    def __init__(self, maxsize: int, ttl: float = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Retourne la valeur associée à la clé, ou None si absente ou expirée"""
+        with self._lock:
+            try:
+                value, expires_at = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Ajoute ou met à jour une entrée, en évinçant la plus ancienne si besoin"""
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def set_generation(self, generation):
+        """Vide le cache si la génération a changé depuis le dernier appel"""
+        if generation == self._generation:
+            return
+        with self._lock:
+            if generation != self._generation:
+                self._data.clear()
+                self._generation = generation
+
+    def clear(self):
+        """Vide le cache (les compteurs sont conservés)"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Statistiques du cache"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
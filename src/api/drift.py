@@ -0,0 +1,192 @@
+# src/api/drift.py
+"""
+Surveillance en ligne du data drift des requêtes de scoring.
+
+- Chemin des requêtes : record() copie les features du client et la probabilité de
+  défaut dans un tampon circulaire préalloué (NumPy). L'emplacement est réservé par
+  next() sur un itertools.count (atomique sous le GIL) : pas de verrou, pas
+  d'allocation, ~1 µs par enregistrement.
+- Tâche de fond : toutes les interval secondes, une copie du tampon (les capacity
+  dernières requêtes) est comparée au profil de référence construit sur les données
+  d'entraînement (src.monitoring.drift : PSI, KS, taux de manquants par feature).
+- Résultat exposé par /monitoring/drift et /metrics (propres au worker).
+
+Construction du profil de référence (features d'entraînement et probabilités du modèle) :
+    python -m src.api.drift
+"""
+import itertools
+import os
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from src.config.config import config
+
+# pandas et le moteur de drift ne sont chargés qu'au premier calcul, pas au démarrage de l'API
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from src.monitoring.drift import ReferenceProfile
+
+# Colonne de la probabilité de défaut dans le tampon et le profil
+PROBABILITY_COLUMN = "probability_default"
+DEFAULT_REFERENCE_PATH = config.DRIFT_REFERENCE_PATH
+
+
+def build_reference_profile(model, X: "pd.DataFrame", path: str = DEFAULT_REFERENCE_PATH) -> "ReferenceProfile":
+    """Profil des features d'entraînement et des probabilités de défaut du modèle"""
+    from src.monitoring.drift import ReferenceProfile
+
+    reference = X.copy()
+    reference[PROBABILITY_COLUMN] = model.predict_proba(X)[:, 1]
+    profile = ReferenceProfile.from_frame(reference, meta={"source": "training"})
+    profile.save(path)
+    return profile
+
+
+class LiveDriftMonitor:
+    """
+    Tampon circulaire des capacity dernières requêtes (features + probabilité) et
+    dernière comparaison au profil de référence.
+    """
+
+    def __init__(self, feature_names: list, reference_path: str = DEFAULT_REFERENCE_PATH,
+                 capacity: int = 10000, interval: float = 30.0, enabled: bool = True):
+        self.columns = [*feature_names, PROBABILITY_COLUMN]
+        self.reference_path = reference_path
+        self.capacity = capacity
+        self.interval = interval
+        self.enabled = enabled
+        self.buffer = np.full((capacity, len(self.columns)), np.nan)
+        # Numéro d'ordre de l'enregistrement de chaque emplacement (-1 : vide)
+        self.sequence = np.full(capacity, -1, dtype=np.int64)
+        self._counter = itertools.count()
+        self.profile = None
+        self._profile_mtime = None
+        self.result = None
+        self.last_error = None
+        self._init_process_state()
+        # Les threads ne survivent pas à un fork : on les recrée dans l'enfant
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._init_process_state)
+
+    def _init_process_state(self):
+        self._stop = threading.Event()
+        self._worker = None
+
+    def record(self, row: np.ndarray, probability: float):
+        """Enregistre une requête (ligne de features dans l'ordre feature_names)"""
+        if not self.enabled:
+            return
+        n = next(self._counter)
+        slot = n % self.capacity
+        values = self.buffer[slot]
+        values[:-1] = row
+        values[-1] = probability
+        self.sequence[slot] = n
+
+    def record_many(self, X: np.ndarray, probabilities):
+        """Enregistre un lot de requêtes (matrice n_clients x n_features)"""
+        if not self.enabled:
+            return
+        numbers = np.fromiter((next(self._counter) for _ in range(len(X))), dtype=np.int64, count=len(X))
+        # Au-delà de capacity lignes, seules les dernières sont gardées
+        numbers, X = numbers[-self.capacity:], X[-self.capacity:]
+        slots = numbers % self.capacity
+        self.buffer[slots, :-1] = X
+        self.buffer[slots, -1] = np.asarray(probabilities)[-self.capacity:]
+        self.sequence[slots] = numbers
+
+    def _load_profile(self) -> bool:
+        """(Re)charge le profil de référence s'il a changé sur disque"""
+        from src.monitoring.drift import ReferenceProfile
+
+        try:
+            mtime = os.stat(self.reference_path).st_mtime_ns
+        except OSError:
+            return self.profile is not None
+        if mtime != self._profile_mtime:
+            profile = ReferenceProfile.load(self.reference_path)
+            missing = [col for col in self.columns if col not in profile.columns]
+            if missing:
+                raise ValueError(f"Colonnes absentes du profil de référence : {missing}")
+            self.profile = ReferenceProfile({col: profile.columns[col] for col in self.columns}, profile.meta)
+            self._profile_mtime = mtime
+        return True
+
+    def refresh(self) -> dict:
+        """Compare les requêtes du tampon au profil de référence"""
+        import pandas as pd
+
+        from src.monitoring.drift import DriftStatistics, drift_summary
+
+        try:
+            if not self._load_profile():
+                self.last_error = f"Profil de référence absent : {self.reference_path}"
+                return self.result
+            # Copie : les requêtes continuent d'écrire dans le tampon pendant le calcul
+            sequence = self.sequence.copy()
+            window = self.buffer[sequence >= 0].copy()
+            statistics = DriftStatistics(self.profile).update(pd.DataFrame(window, columns=self.columns))
+            metrics = statistics.metrics()
+            self.result = {
+                "computed_at": time.time(),
+                "window": len(window),
+                "recorded": int(sequence.max()) + 1 if len(window) else 0,
+                "summary": drift_summary(metrics),
+                "features": metrics.replace({np.nan: None}).to_dict(orient="records"),
+            }
+            self.last_error = None
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+        return self.result
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.refresh()
+
+    def start(self):
+        """Démarre la comparaison périodique en arrière-plan"""
+        if not self.enabled or self.interval <= 0 or (self._worker is not None and self._worker.is_alive()):
+            return
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._run, name="drift-monitor", daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout=self.interval + 1)
+            self._worker = None
+
+    def prometheus_lines(self) -> list:
+        """PSI par feature au format Prometheus"""
+        if self.result is None:
+            return []
+        lines = [
+            "# HELP scoring_feature_psi PSI des requêtes récentes par rapport aux données d'entraînement",
+            "# TYPE scoring_feature_psi gauge",
+        ]
+        for feature in self.result["features"]:
+            if feature["psi"] is not None:
+                lines.append(f'scoring_feature_psi{{feature="{feature["column"]}"}} {feature["psi"]}')
+        return lines
+
+
+def main():
+    """Profil de référence du modèle servi, sur les données d'entraînement (format colonne)"""
+    import joblib
+
+    from src.training.datasets import ensure_training_data, load_training_data
+
+    ensure_training_data()
+    X_train, _, _, _, _ = load_training_data()
+    model = joblib.load(os.path.join(config.MODELS_DIR, "final_model_LightGBM.pkl"))
+    build_reference_profile(model, X_train)
+    print(f"Profil de référence sauvegardé : {DEFAULT_REFERENCE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
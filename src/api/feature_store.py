@@ -0,0 +1,170 @@
+# src/api/feature_store.py
+"""
+Feature store en ligne : features du modèle par client (SK_ID_CURR), lues par l'API
+sans que chaque worker ne charge la table dans sa mémoire propre.
+
+- features.npy : matrice float64 (n_clients x n_features), lignes triées par identifiant
+- ids.npy      : identifiants triés (int64), recherche dichotomique (searchsorted)
+- meta.json    : noms des features, nombre de clients, date de construction
+
+Les deux tableaux sont ouverts en memory-map : seules les pages lues sont chargées,
+et elles sont partagées entre les workers par le cache de pages du système.
+
+Construction :
+    python -m src.api.feature_store data/features.parquet       (SK_ID_CURR + features du modèle)
+    python -m src.api.feature_store --from-raw                   (CSV bruts -> merge_all -> Preprocessor)
+"""
+import argparse
+import datetime
+import json
+import os
+import shutil
+import threading
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from src.api.schemas import ClientData
+from src.config.config import config
+
+# pandas n'est chargé que pour construire le store, pas au démarrage de l'API
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Features servies : celles du modèle, dans l'ordre du schéma ClientData
+FEATURE_NAMES = list(ClientData.model_fields)
+
+
+def build_feature_store(df: "pd.DataFrame", path: str, id_column: str = "SK_ID_CURR",
+                        feature_names: list = FEATURE_NAMES) -> dict:
+    """
+    Écrit le feature store à partir d'une table contenant id_column et les features.
+    Un identifiant présent plusieurs fois garde sa dernière ligne.
+    Le répertoire est construit à côté puis échangé avec l'ancien par renommage.
+    """
+    missing = [c for c in [id_column] + list(feature_names) if c not in df.columns]
+    if missing:
+        raise ValueError(f"Colonnes manquantes pour le feature store : {missing}")
+
+    df = df.drop_duplicates(subset=id_column, keep="last").sort_values(id_column)
+    ids = df[id_column].to_numpy(dtype=np.int64)
+    features = np.ascontiguousarray(df[list(feature_names)].to_numpy(dtype=np.float64))
+    meta = {
+        "id_column": id_column,
+        "feature_names": list(feature_names),
+        "count": len(ids),
+        "built_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+
+    path = os.path.abspath(path)
+    tmp_path, old_path = path + ".tmp", path + ".old"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    np.save(os.path.join(tmp_path, "ids.npy"), ids)
+    np.save(os.path.join(tmp_path, "features.npy"), features)
+    with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    # Les workers qui ont déjà ouvert l'ancien store gardent leur mapping
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.rename(path, old_path)
+    os.rename(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    return meta
+
+
+class OnlineFeatureStore:
+    """
+    Lecture du feature store : ouverture paresseuse (au premier appel) en memory-map,
+    puis recherche d'un client en O(log n) sur les identifiants triés.
+    """
+
+    def __init__(self, path: str, feature_names: list = FEATURE_NAMES):
+        self.path = path
+        self.feature_names = list(feature_names)
+        self.ids = None
+        self.features = None
+        self.meta = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.ids is not None
+
+    def open(self):
+        """(Ré)ouvre les fichiers du store ; FileNotFoundError s'il n'a pas été construit"""
+        with self._lock:
+            with open(os.path.join(self.path, "meta.json")) as f:
+                meta = json.load(f)
+            if meta["feature_names"] != self.feature_names:
+                raise ValueError(
+                    f"Features du store {meta['feature_names']} différentes de celles du modèle {self.feature_names}"
+                )
+            ids = np.load(os.path.join(self.path, "ids.npy"), mmap_mode="r")
+            features = np.load(os.path.join(self.path, "features.npy"), mmap_mode="r")
+            if len(ids) != len(features):
+                raise ValueError("Store incohérent : identifiants et features de tailles différentes")
+            self.ids, self.features, self.meta = ids, features, meta
+
+    def lookup(self, client_id: int):
+        """
+        Ligne (1 x n_features) du client, copiée hors du memory-map,
+        ou None si le client est inconnu
+        """
+        if not self.is_open:
+            self.open()
+        ids = self.ids
+        position = int(np.searchsorted(ids, client_id))
+        if position == len(ids) or ids[position] != client_id:
+            return None
+        return np.array(self.features[position:position + 1], dtype=np.float64)
+
+    def info(self) -> dict:
+        if not self.is_open:
+            return {"available": False}
+        return {"available": True, "count": self.meta["count"], "built_at": self.meta["built_at"]}
+
+
+def _features_from_raw() -> "pd.DataFrame":
+    """Features de tous les clients (train + test) avec le pipeline du projet"""
+    import pandas as pd
+
+    from src.data_loader import load_all_data
+    from src.preprocessing.feature_engineering import FeatureEngineer
+    from src.preprocessing.preprocess import Preprocessor
+
+    train, test = FeatureEngineer().merge_all(load_all_data())
+    train = train.drop(columns=[config.TARGET])
+    preprocessor = Preprocessor()
+    preprocessor.fit(train)
+    return pd.concat([preprocessor.transform(train), preprocessor.transform(test)], ignore_index=True)
+
+
+def _read_features(path: str) -> "pd.DataFrame":
+    import pandas as pd
+
+    columns = ["SK_ID_CURR"] + FEATURE_NAMES
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+    if path.endswith(".pkl"):
+        return pd.read_pickle(path)
+    return pd.read_csv(path, usecols=columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", nargs="?", help="Table des features (.parquet, .csv ou .pkl)")
+    parser.add_argument("--from-raw", action="store_true", help="Recalculer les features depuis les CSV bruts")
+    parser.add_argument("--output", default=config.FEATURE_STORE_DIR, help="Répertoire du feature store")
+    args = parser.parse_args()
+    if not args.from_raw and args.input is None:
+        parser.error("indiquer une table de features ou --from-raw")
+
+    df = _features_from_raw() if args.from_raw else _read_features(args.input)
+    meta = build_feature_store(df, args.output)
+    print(f"Feature store écrit dans {args.output} : {meta['count']} clients")
+
+
+if __name__ == "__main__":
+    main()
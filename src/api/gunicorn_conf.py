@@ -0,0 +1,31 @@
+# src/api/gunicorn_conf.py
+"""
+Configuration gunicorn pour servir l'API avec plusieurs workers uvicorn.
+
+    gunicorn src.api.app:app -c src/api/gunicorn_conf.py
+
+Mode préchargement (par défaut) : le module de l'API est importé une seule fois
+dans le processus maître, qui construit le modèle et l'explainer SHAP. Les workers
+sont ensuite forkés et partagent ces objets en copy-on-write au lieu d'en garder
+chacun une copie. Chaque worker fait son inférence d'échauffement avant que /ready
+ne réponde 200.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import de l'application (et donc chargement du modèle) dans le maître avant le fork
+preload_app = os.getenv("API_PRELOAD", "1") == "1"
+
+
+def when_ready(server):
+    """
+    Le modèle est chargé dans le maître : on gèle les objets existants pour que
+    le ramasse-miettes des workers ne les parcoure pas. Sinon il écrit dans leurs
+    en-têtes, ce qui casse le partage copy-on-write des pages.
+    """
+    gc.freeze()
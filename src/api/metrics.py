@@ -0,0 +1,237 @@
+# src/api/metrics.py
+import bisect
+import contextvars
+import threading
+import time
+
+# Bornes (en secondes) des histogrammes de latence : de 5 µs à 10 s
+LATENCY_BUCKETS = (
+    5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Début de la requête HTTP en cours (posé par le middleware)
+_request_start = contextvars.ContextVar("request_start", default=None)
+
+
+class Histogram:
+    """
+    Histogramme à bornes fixes : une recherche dichotomique et trois
+    incréments par observation.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+
+class _Stage:
+    """Mesure d'une étape (gestionnaire de contexte sans générateur, pour limiter le coût)"""
+
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe_stage(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NoStage:
+    """Étape non mesurée (instrumentation désactivée)"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{key}="{value}"' for key, value in labels.items())
+
+
+class Metrics:
+    """
+    Instrumentation de l'API :
+    - histogrammes de durée par étape (validation, features, inference, shap...)
+    - histogramme de durée par endpoint, compteurs de requêtes et d'erreurs
+    - jauge des requêtes en cours
+    - exposition au format texte Prometheus
+    Désactivée (enabled=False), chaque point de mesure se réduit à un test booléen.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.stages = {}
+        self.requests = {}
+        self.request_counts = {}
+        self.errors = {}
+        self.in_flight = 0
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    # --- Étapes ---
+
+    def stage(self, name: str):
+        """Gestionnaire de contexte mesurant la durée d'une étape"""
+        if not self.enabled:
+            return _NO_STAGE
+        return _Stage(self, name)
+
+    def observe_stage(self, name: str, seconds: float):
+        histogram = self.stages.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.stages.setdefault(name, Histogram())
+        histogram.observe(seconds)
+
+    def mark_handler_start(self):
+        """
+        Appelé en entrée de handler : le temps écoulé depuis l'arrivée de la requête
+        correspond au routage et à la validation pydantic du payload.
+        """
+        if not self.enabled:
+            return
+        start = _request_start.get()
+        if start is not None:
+            self.observe_stage("validation", time.perf_counter() - start)
+
+    # --- Requêtes ---
+
+    def _inc(self, counter: dict, key, value=1):
+        with self._lock:
+            counter[key] = counter.get(key, 0) + value
+
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+        return _request_start.set(time.perf_counter())
+
+    def request_finished(self, endpoint: str, status: int, token):
+        start = _request_start.get()
+        _request_start.reset(token)
+        with self._lock:
+            self.in_flight -= 1
+        self._inc(self.request_counts, (endpoint, status))
+        if status >= 500:
+            self._inc(self.errors, endpoint)
+
+        histogram = self.requests.get(endpoint)
+        if histogram is None:
+            with self._lock:
+                histogram = self.requests.setdefault(endpoint, Histogram())
+        histogram.observe(time.perf_counter() - start)
+
+    # --- Exposition ---
+
+    def register_collector(self, collector):
+        """Ajoute une fonction renvoyant des lignes Prometheus supplémentaires"""
+        self._collectors.append(collector)
+
+    @staticmethod
+    def _render_histogram(lines, name, label_name, histograms):
+        for label_value, histogram in sorted(histograms.items()):
+            labels = _labels(**{label_name: label_value})
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.9f}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+    def render(self) -> str:
+        """Métriques au format texte Prometheus (version 0.0.4)"""
+        lines = [
+            "# HELP scoring_stage_duration_seconds Durée de chaque étape du scoring",
+            "# TYPE scoring_stage_duration_seconds histogram",
+        ]
+        self._render_histogram(lines, "scoring_stage_duration_seconds", "stage", self.stages)
+
+        lines += [
+            "# HELP scoring_request_duration_seconds Durée totale des requêtes par endpoint",
+            "# TYPE scoring_request_duration_seconds histogram",
+        ]
+        self._render_histogram(lines, "scoring_request_duration_seconds", "endpoint", self.requests)
+
+        lines += [
+            "# HELP scoring_requests_total Nombre de requêtes par endpoint et statut HTTP",
+            "# TYPE scoring_requests_total counter",
+        ]
+        for (endpoint, status), count in sorted(self.request_counts.items()):
+            lines.append(f"scoring_requests_total{{{_labels(endpoint=endpoint, status=status)}}} {count}")
+
+        lines += [
+            "# HELP scoring_request_errors_total Nombre de requêtes en erreur (5xx) par endpoint",
+            "# TYPE scoring_request_errors_total counter",
+        ]
+        for endpoint, count in sorted(self.errors.items()):
+            lines.append(f"scoring_request_errors_total{{{_labels(endpoint=endpoint)}}} {count}")
+
+        lines += [
+            "# HELP scoring_requests_in_flight Requêtes en cours de traitement",
+            "# TYPE scoring_requests_in_flight gauge",
+            f"scoring_requests_in_flight {self.in_flight}",
+        ]
+
+        for collector in self._collectors:
+            lines.extend(collector())
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI : compte les requêtes, les erreurs et les requêtes en cours,
+    et mesure leur durée totale. Le libellé d'endpoint est le chemin de la route
+    (ex: /predict), pour ne pas multiplier les séries.
+    """
+
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = self.metrics.request_started()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Route résolue par le routeur ; les chemins inconnus sont regroupés
+            route = scope.get("route")
+            self.metrics.request_finished(
+                getattr(route, "path", "unmatched"), status, token
+            )
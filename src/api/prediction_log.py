@@ -0,0 +1,304 @@
+# src/api/prediction_log.py
+"""
+Journal des décisions de l'API (audit et monitoring), écrit hors du chemin des requêtes.
+
+- Chemin des requêtes : log() dépose un tuple dans une file bornée en mémoire
+  (deque : ajout atomique sous le GIL, sans verrou ni E/S).
+- Écrivain de fond : toutes les flush_interval secondes (ou dès batch_size
+  enregistrements en attente), la file est vidée par lots et écrite en colonnes
+  dans le segment courant (Parquet : un row group par lot ; ou JSONL). Un lot est
+  converti par tranches de CONVERT_SLICE enregistrements, le GIL étant rendu entre
+  deux tranches : sur un seul cœur, l'écrivain ne retarde pas les requêtes.
+- Rotation : un segment est fermé après segment_rows lignes ou segment_seconds
+  secondes. Il est écrit sous un nom .inprogress puis renommé : un segment visible
+  est complet.
+- Contre-pression : file pleine, policy="drop" abandonne l'enregistrement (compté
+  dans dropped) ; policy="block" attend au plus block_timeout secondes qu'une place
+  se libère, puis l'abandonne.
+- Arrêt : stop() vide la file et ferme le segment courant.
+
+Une ligne par client : date, endpoint, features, probabilité, décision, seuil,
+version du modèle et latence du handler (ms).
+"""
+import collections
+import datetime
+import glob
+import json
+import os
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+# pandas n'est chargé que pour relire le journal, pas au démarrage de l'API
+if TYPE_CHECKING:
+    import pandas as pd
+
+POLICIES = ("drop", "block")
+FORMATS = ("parquet", "jsonl")
+INPROGRESS = ".inprogress"
+# Enregistrements convertis entre deux libérations du GIL par l'écrivain
+CONVERT_SLICE = 128
+
+
+class PredictionLogger:
+    """File bornée des décisions et écrivain de fond en segments tournants"""
+
+    def __init__(self, directory: str, feature_names: list, fmt: str = "parquet", max_queue: int = 100000,
+                 batch_size: int = 1000, flush_interval: float = 1.0, segment_rows: int = 1000000,
+                 segment_seconds: float = 3600.0, policy: str = "drop", block_timeout: float = 0.01,
+                 enabled: bool = True):
+        if policy not in POLICIES:
+            raise ValueError(f"Politique inconnue : {policy} (attendu : {POLICIES})")
+        if fmt not in FORMATS:
+            raise ValueError(f"Format inconnu : {fmt} (attendu : {FORMATS})")
+        self.directory = directory
+        self.feature_names = list(feature_names)
+        self.fmt = fmt
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.segment_rows = segment_rows
+        self.segment_seconds = segment_seconds
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.enabled = enabled
+        self._queue = collections.deque()
+        self.dropped = 0
+        self.written = 0
+        self.segments = 0
+        self.last_error = None
+        self._segment = None
+        self._init_process_state()
+        # Les threads et verrous ne survivent pas à un fork : on les recrée dans l'enfant
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._init_process_state)
+
+    def _init_process_state(self):
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._not_full = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._drop_lock = threading.Lock()
+        self._writer = None
+        # Segment ouvert dans le processus parent : propre à lui
+        self._segment = None
+
+    # --- Chemin des requêtes ---
+
+    @property
+    def may_block(self) -> bool:
+        """
+        log() peut attendre (politique "block", au plus block_timeout) : depuis une
+        coroutine, l'appeler dans un thread pour ne pas bloquer la boucle d'événements
+        """
+        return self.enabled and self.policy == "block"
+
+    def log(self, endpoint: str, features, response: dict, latency_ms: float):
+        """Dépose la décision d'un client (features : liste dans l'ordre feature_names)"""
+        if not self.enabled:
+            return
+        queue = self._queue
+        if len(queue) >= self.max_queue and not self._wait_for_space():
+            with self._drop_lock:
+                self.dropped += 1
+            return
+        queue.append((
+            time.time(), endpoint, response["model_version"], response["threshold_used"],
+            response["probability_default"], response["prediction"], latency_ms, features,
+        ))
+        if len(queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def _wait_for_space(self) -> bool:
+        if self.policy != "block":
+            return False
+        self._wakeup.set()
+        deadline = time.monotonic() + self.block_timeout
+        with self._not_full:
+            while len(self._queue) >= self.max_queue:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._not_full.wait(remaining)
+        return True
+
+    # --- Écriture ---
+
+    def _segment_path(self) -> str:
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+        return os.path.join(self.directory, f"predictions-{stamp}-{os.getpid()}-{self.segments:06d}.{self.fmt}")
+
+    def _to_table(self, records: list):
+        """Tableau Arrow (une colonne par champ et par feature) d'une tranche d'enregistrements"""
+        import pyarrow as pa
+
+        timestamps, endpoints, versions, thresholds, probabilities, predictions, latencies, features = zip(*records)
+        columns = {
+            "timestamp": pa.array((np.array(timestamps) * 1e6).astype(np.int64), pa.timestamp("us", tz="UTC")),
+            "endpoint": pa.array(endpoints, pa.string()),
+            "model_version": pa.array(versions, pa.string()),
+            "threshold_used": pa.array(thresholds, pa.float64()),
+            "probability_default": pa.array(probabilities, pa.float64()),
+            "prediction": pa.array(predictions, pa.int64()),
+            "latency_ms": pa.array(latencies, pa.float64()),
+        }
+        matrix = np.array(features, dtype=np.float64).reshape(len(records), len(self.feature_names))
+        for i, name in enumerate(self.feature_names):
+            columns[name] = pa.array(matrix[:, i])
+        return pa.table(columns)
+
+    def _to_lines(self, records: list) -> str:
+        """Lignes JSON d'une tranche d'enregistrements"""
+        lines = []
+        for timestamp, endpoint, version, threshold, probability, prediction, latency, features in records:
+            line = {
+                "timestamp": datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).isoformat(),
+                "endpoint": endpoint,
+                "model_version": version,
+                "threshold_used": threshold,
+                "probability_default": probability,
+                "prediction": prediction,
+                "latency_ms": latency,
+                **dict(zip(self.feature_names, features)),
+            }
+            lines.append(json.dumps(line, ensure_ascii=False))
+        return "\n".join(lines) + "\n"
+
+    def _convert(self, records: list):
+        """
+        Conversion par tranches de CONVERT_SLICE enregistrements : le GIL est rendu
+        entre deux tranches, les requêtes ne restent pas bloquées pendant un lot entier
+        """
+        parts = []
+        for start in range(0, len(records), CONVERT_SLICE):
+            part = records[start:start + CONVERT_SLICE]
+            parts.append(self._to_table(part) if self.fmt == "parquet" else self._to_lines(part))
+            time.sleep(0)
+        if self.fmt == "parquet":
+            import pyarrow as pa
+
+            return pa.concat_tables(parts)
+        return "".join(parts)
+
+    def _open_segment(self, data):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._segment_path()
+        self.segments += 1
+        segment = {"path": path, "rows": 0, "opened": time.monotonic()}
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            segment["writer"] = pq.ParquetWriter(path + INPROGRESS, data.schema)
+        else:
+            segment["writer"] = open(path + INPROGRESS, "a", encoding="utf-8")
+        self._segment = segment
+
+    def _close_segment(self):
+        segment, self._segment = self._segment, None
+        if segment is None:
+            return
+        segment["writer"].close()
+        os.replace(segment["path"] + INPROGRESS, segment["path"])
+
+    def _write(self, records: list):
+        data = self._convert(records)
+        if self._segment is None:
+            self._open_segment(data)
+        segment = self._segment
+        if self.fmt == "parquet":
+            # Un row group par lot
+            segment["writer"].write_table(data, row_group_size=len(records))
+        else:
+            segment["writer"].write(data)
+            segment["writer"].flush()
+        segment["rows"] += len(records)
+        self.written += len(records)
+        if segment["rows"] >= self.segment_rows or time.monotonic() - segment["opened"] >= self.segment_seconds:
+            self._close_segment()
+
+    def flush(self):
+        """Écrit tous les enregistrements en attente (appelé par l'écrivain de fond)"""
+        with self._write_lock:
+            queue = self._queue
+            while queue:
+                records = []
+                while queue and len(records) < self.batch_size:
+                    records.append(queue.popleft())
+                with self._not_full:
+                    self._not_full.notify_all()
+                try:
+                    self._write(records)
+                    self.last_error = None
+                except Exception as e:
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    print(f"Attention: Écriture du journal des prédictions impossible: {self.last_error}")
+                    with self._drop_lock:
+                        self.dropped += len(records)
+            # Segment trop ancien fermé même sans nouvel enregistrement
+            segment = self._segment
+            if segment is not None and time.monotonic() - segment["opened"] >= self.segment_seconds:
+                self._close_segment()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def start(self):
+        """Démarre l'écrivain de fond"""
+        if not self.enabled or (self._writer is not None and self._writer.is_alive()):
+            return
+        self._stop.clear()
+        self._writer = threading.Thread(target=self._run, name="prediction-log", daemon=True)
+        self._writer.start()
+
+    def stop(self):
+        """Arrête l'écrivain, écrit les enregistrements en attente et ferme le segment courant"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+        self.flush()
+        with self._write_lock:
+            self._close_segment()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "queued": len(self._queue),
+            "written": self.written,
+            "dropped": self.dropped,
+            "segments": self.segments,
+            "last_error": self.last_error,
+        }
+
+    def prometheus_lines(self) -> list:
+        """Compteurs du journal au format Prometheus"""
+        return [
+            "# HELP scoring_prediction_log_records_total Décisions écrites ou abandonnées",
+            "# TYPE scoring_prediction_log_records_total counter",
+            f'scoring_prediction_log_records_total{{state="written"}} {self.written}',
+            f'scoring_prediction_log_records_total{{state="dropped"}} {self.dropped}',
+            "# HELP scoring_prediction_log_queue Décisions en attente d'écriture",
+            "# TYPE scoring_prediction_log_queue gauge",
+            f"scoring_prediction_log_queue {len(self._queue)}",
+        ]
+
+
+def read_prediction_log(directory: str) -> "pd.DataFrame":
+    """Segments complets (Parquet et JSONL) d'un répertoire de journal, dans l'ordre des noms"""
+    import pandas as pd
+
+    frames = []
+    for path in sorted(glob.glob(os.path.join(directory, "predictions-*"))):
+        if path.endswith(".parquet"):
+            frames.append(pd.read_parquet(path))
+        elif path.endswith(".jsonl"):
+            frame = pd.read_json(path, lines=True)
+            frame["timestamp"] = pd.to_datetime(frame["timestamp"], utc=True)
+            frames.append(frame)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
@@ -0,0 +1,221 @@
+# src/api/registry.py
+import json
+import os
+import threading
+import time
+import datetime
+
+import numpy as np
+
+from src.api.cache import file_digest
+from src.config.config import config
+
+# Artefacts servis par défaut (produits par train_model)
+DEFAULT_MODEL_PATH = os.path.join(config.MODELS_DIR, "final_model_LightGBM.pkl")
+DEFAULT_THRESHOLD_PATH = os.path.join(config.DATA_DIR, "best_threshold.json")
+
+
+class ModelBundle:
+    """
+    Ensemble immuable servi par l'API : modèle, booster natif, explainer SHAP,
+    seuil de décision et version. Une requête lit le bundle actif une seule fois,
+    elle reste donc cohérente même si un rechargement a lieu pendant son traitement.
+    """
+
+    def __init__(self, model, explainer, threshold: float, version: str):
+        self.model = model
+        # Booster LightGBM natif : évite la validation sklearn à chaque appel
+        self.booster = model.booster_
+        self.explainer = explainer
+        self.threshold = threshold
+        self.version = version
+        self.loaded_at = datetime.datetime.now().isoformat(timespec="seconds")
+
+    def info(self) -> dict:
+        """Description courte du bundle (exposée par l'API)"""
+        return {
+            "model_version": self.version,
+            "threshold": self.threshold,
+            "loaded_at": self.loaded_at
+        }
+
+
+def load_bundle(model_path: str, threshold_path: str, with_explainer: bool = True) -> ModelBundle:
+    """
+    Charge le modèle et le seuil depuis le disque et construit l'explainer SHAP
+    (sauf with_explainer=False, pour un scoring sans explications).
+    joblib et shap sont importés ici : hors du chemin des requêtes, ils ne
+    ralentissent pas l'import du module de l'API.
+    """
+    import joblib
+
+    model = joblib.load(model_path)
+    with open(threshold_path, "r") as f:
+        threshold = json.load(f)["best_threshold"]
+
+    # Initialisation de l'explainer SHAP (au chargement pour ne pas ralentir les requêtes)
+    explainer = None
+    if with_explainer:
+        import shap
+        explainer = shap.TreeExplainer(model)
+
+    return ModelBundle(model, explainer, threshold, version=file_digest(model_path))
+
+
+def warmup_bundle(bundle: ModelBundle):
+    """
+    Inférence et explication (si le bundle a un explainer) sur une ligne factice,
+    pour que la première vraie requête ne paie pas les initialisations paresseuses.
+    """
+    row = np.zeros((1, bundle.booster.num_feature()), dtype=np.float64)
+    bundle.booster.predict(row)
+    if bundle.explainer is not None:
+        bundle.explainer.shap_values(row)
+
+
+class ModelRegistry:
+    """
+    Registre du modèle servi :
+    - construit le bundle (modèle + explainer + seuil) hors du chemin des requêtes
+    - l'échange de façon atomique (simple réaffectation de référence)
+    - surveille les fichiers du modèle et du seuil et recharge à chaque changement
+    - permet un rechargement manuel (endpoint d'administration)
+    - n'est « prêt » qu'après une inférence d'échauffement dans le processus courant
+      (un worker forké après un chargement anticipé doit refaire son échauffement)
+    """
+
+    def __init__(self, model_path: str, threshold_path: str, poll_interval: float = 5.0):
+        self.model_path = model_path
+        self.threshold_path = threshold_path
+        self.poll_interval = poll_interval
+        self._current = None
+        self._signature = None
+        self._listeners = []
+        self._init_process_state()
+        self.last_error = None
+        # Les threads et verrous ne survivent pas à un fork : on les recrée dans l'enfant
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._init_process_state)
+
+    def _init_process_state(self):
+        """État propre au processus : verrous, surveillance et échauffement"""
+        self._reload_lock = threading.Lock()
+        self._ready_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        self.ready = False
+        self.ready_at = None
+
+    @property
+    def current(self) -> ModelBundle:
+        """Bundle actif"""
+        return self._current
+
+    def get(self) -> ModelBundle:
+        """
+        Bundle actif, prêt à servir. Si le processus n'est pas encore prêt
+        (chargement ou échauffement en cours), attend qu'il le soit.
+        """
+        if not self.ready:
+            self.ensure_ready()
+        return self._current
+
+    def on_swap(self, listener):
+        """Enregistre une fonction appelée avec le nouveau bundle après chaque échange"""
+        self._listeners.append(listener)
+
+    def _files_signature(self):
+        """(mtime, taille) des deux fichiers : détecte un changement sans les relire"""
+        signature = []
+        for path in (self.model_path, self.threshold_path):
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def reload(self, force: bool = False, warmup: bool = True) -> bool:
+        """
+        Reconstruit le bundle si les fichiers ont changé (ou si force=True),
+        puis l'échange avec le bundle actif. Retourne True si un échange a eu lieu.
+        En cas d'erreur, le bundle actif est conservé.
+        """
+        with self._reload_lock:
+            signature = self._files_signature()
+            if not force and signature == self._signature and self._current is not None:
+                return False
+
+            try:
+                bundle = load_bundle(self.model_path, self.threshold_path)
+                if warmup:
+                    warmup_bundle(bundle)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"Attention: Rechargement du modèle impossible: {self.last_error}")
+                if self._current is None:
+                    raise
+                return False
+
+            # Échange atomique : les requêtes en cours gardent l'ancien bundle
+            self._current = bundle
+            self._signature = signature
+            self.last_error = None
+            for listener in self._listeners:
+                listener(bundle)
+            return True
+
+    def load(self, warmup: bool = True) -> ModelBundle:
+        """
+        Chargement initial (synchrone). Avec warmup=False, le bundle est construit
+        sans inférence : c'est le mode à utiliser avant un fork (préchargement).
+        """
+        self.reload(force=True, warmup=warmup)
+        if warmup:
+            self._mark_ready()
+        return self._current
+
+    def ensure_ready(self):
+        """Charge le bundle si besoin, l'échauffe dans ce processus et le marque prêt"""
+        with self._ready_lock:
+            if self.ready:
+                return
+            if self._current is None:
+                self.reload(force=True)
+            else:
+                warmup_bundle(self._current)
+            self._mark_ready()
+
+    def _mark_ready(self):
+        self.ready_at = time.time()
+        self.ready = True
+
+    def _watch(self):
+        """Boucle de surveillance des fichiers (thread d'arrière-plan)"""
+        pending = None
+        while not self._stop.wait(self.poll_interval):
+            try:
+                signature = self._files_signature()
+            except OSError:
+                # Fichier en cours de remplacement : on réessaiera au prochain tour
+                continue
+            if signature == self._signature:
+                pending = None
+            elif signature == pending:
+                # Signature stable sur deux tours : l'écriture est terminée
+                self.reload()
+                pending = None
+            else:
+                pending = signature
+
+    def start_watching(self):
+        """Démarre la surveillance des fichiers en arrière-plan"""
+        if self.poll_interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        """Arrête la surveillance des fichiers"""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.poll_interval + 1)
+            self._watcher = None
@@ -10,4 +10,7 @@ class ClientData(BaseModel):
     DAYS_ID_PUBLISH: int
     EXT_SOURCE_1: float
     EXT_SOURCE_2: float
-    EXT_SOURCE_3: float
\ No newline at end of file
+    EXT_SOURCE_3: float
+
+class ClientId(BaseModel):
+    SK_ID_CURR: int
@@ -16,6 +16,40 @@ class Config:
 
     TARGET = "TARGET"
 
+    # Nombre maximal de clients acceptés par un appel à /predict/batch
+    API_MAX_BATCH_SIZE = int(os.getenv("API_MAX_BATCH_SIZE", 10000))
+    # Nombre maximal d'explications SHAP gardées en cache (LRU)
+    EXPLAIN_CACHE_SIZE = int(os.getenv("EXPLAIN_CACHE_SIZE", 10000))
+    # Cache des prédictions : nombre maximal d'entrées et durée de vie (secondes)
+    PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", 50000))
+    PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", 3600))
+    # Intervalle (secondes) de surveillance du modèle et du seuil par l'API (0 = désactivé)
+    MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", 5))
+    # Préchargement : modèle et explainer construits à l'import du module de l'API
+    # (avec gunicorn --preload, une seule fois dans le maître puis partagés par les workers).
+    # Désactivé : l'import est rapide et le chargement se fait en arrière-plan au démarrage.
+    API_PRELOAD = os.getenv("API_PRELOAD", "1") == "1"
+    # Micro-batching de /predict : taille maximale d'un lot et fenêtre d'attente (ms)
+    MICROBATCH_ENABLED = os.getenv("MICROBATCH_ENABLED", "0") == "1"
+    MICROBATCH_MAX_SIZE = int(os.getenv("MICROBATCH_MAX_SIZE", 64))
+    MICROBATCH_MAX_WAIT_MS = float(os.getenv("MICROBATCH_MAX_WAIT_MS", 2))
+    # Instrumentation de l'API (histogrammes par étape, endpoint /metrics)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+    # Feature store en ligne (features par SK_ID_CURR, lues par /predict/by_id)
+    FEATURE_STORE_DIR = os.getenv("FEATURE_STORE_DIR", os.path.join(DATA_DIR, "feature_store"))
+    # Surveillance en ligne du drift : requêtes gardées, intervalle de calcul (secondes) et profil de référence
+    DRIFT_MONITOR_ENABLED = os.getenv("DRIFT_MONITOR_ENABLED", "1") == "1"
+    DRIFT_WINDOW_SIZE = int(os.getenv("DRIFT_WINDOW_SIZE", 10000))
+    DRIFT_INTERVAL = float(os.getenv("DRIFT_INTERVAL", 30))
+    DRIFT_REFERENCE_PATH = os.getenv("DRIFT_REFERENCE_PATH", os.path.join(MODELS_DIR, "drift_reference.json"))
+    # Journal des décisions : répertoire, format (parquet / jsonl), taille de la file et politique si elle est pleine (drop / block)
+    PREDICTION_LOG_ENABLED = os.getenv("PREDICTION_LOG_ENABLED", "1") == "1"
+    PREDICTION_LOG_DIR = os.getenv("PREDICTION_LOG_DIR", os.path.join(DATA_DIR, "prediction_log"))
+    PREDICTION_LOG_FORMAT = os.getenv("PREDICTION_LOG_FORMAT", "parquet")
+    PREDICTION_LOG_MAX_QUEUE = int(os.getenv("PREDICTION_LOG_MAX_QUEUE", 100000))
+    PREDICTION_LOG_POLICY = os.getenv("PREDICTION_LOG_POLICY", "drop")
+    PREDICTION_LOG_SEGMENT_ROWS = int(os.getenv("PREDICTION_LOG_SEGMENT_ROWS", 1000000))
+
     # Vérifie que les répertoires existent
     os.makedirs(BASE_DIR, exist_ok=True)
     os.makedirs(MONITORING_DIR, exist_ok=True)
@@ -1,44 +1,155 @@
 # src/data_loader.py
+import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
-import sys
 
 from src.config import config
 from src.utils.timer import timer
 
-def load_csv(filename: str) -> pd.DataFrame:
+# Tables du dataset Home Credit : clé -> fichier CSV source
+TABLES = {
+    "train": "application_train.csv",
+    "test": "application_test.csv",
+    "bureau": "bureau.csv",
+    "bureau_balance": "bureau_balance.csv",
+    "previous": "previous_application.csv",
+    "pos": "POS_CASH_balance.csv",
+    "installments": "installments_payments.csv",
+    "credit": "credit_card_balance.csv",
+}
+
+# Une colonne texte devient "category" si elle a moins de valeurs distinctes que
+# cette fraction du nombre de lignes (sinon le dictionnaire coûte plus qu'il ne rapporte)
+CATEGORY_MAX_RATIO = 0.5
+
+# Constructions de cache simultanées : chaque CSV est d'abord lu en pleine largeur
+# (float64, object), le pic mémoire croît avec le nombre de lectures en parallèle
+CACHE_BUILD_WORKERS = 2
+_cache_build_slots = threading.BoundedSemaphore(CACHE_BUILD_WORKERS)
+
+
+def load_csv(filename: str, columns: list = None, data_dir: str = None) -> pd.DataFrame:
     """
     Charge un fichier CSV dans le dossier /data.
     """
-    path = os.path.join(config.DATA_DIR, filename)
+    path = os.path.join(data_dir or config.DATA_DIR, filename)
     if not os.path.exists(path):
         raise FileNotFoundError(f"Erreur: Le fichier {path} est introuvable.")
-    return pd.read_csv(path)
+    return pd.read_csv(path, usecols=columns)
+
+
+def downcast_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Réduit l'empreinte mémoire d'une table :
+    - entiers -> int32 quand les valeurs le permettent
+    - flottants -> float32
+    - texte peu varié -> category
+    """
+    int32 = np.iinfo(np.int32)
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_integer_dtype(series):
+            if series.empty or (series.min() >= int32.min and series.max() <= int32.max):
+                df[col] = series.astype(np.int32)
+        elif pd.api.types.is_float_dtype(series):
+            df[col] = series.astype(np.float32)
+        elif series.dtype == object:
+            if series.nunique() < CATEGORY_MAX_RATIO * len(series):
+                df[col] = series.astype("category")
+    return df
+
+
+def _source_signature(path: str) -> dict:
+    """Taille et date de modification du CSV source : invalide le cache s'il change"""
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _build_cache(source: str, cache_path: str, meta_path: str, signature: dict):
+    """
+    Convertit un CSV en Parquet (types réduits), une seule fois.
+    Au plus CACHE_BUILD_WORKERS conversions à la fois dans le processus.
+    """
+    with _cache_build_slots:
+        df = downcast_dtypes(pd.read_csv(source))
+    # Écriture atomique, fichiers temporaires propres à chaque processus et thread :
+    # deux constructions simultanées (pipeline, job de drift...) ne s'écrasent pas
+    suffix = f".tmp-{os.getpid()}-{threading.get_ident()}"
+    df.to_parquet(cache_path + suffix, index=False)
+    os.replace(cache_path + suffix, cache_path)
+    with open(meta_path + suffix, "w") as f:
+        json.dump(signature, f)
+    os.replace(meta_path + suffix, meta_path)
 
 
-def load_all_data():
+def load_table(filename: str, columns: list = None, use_cache: bool = True, data_dir: str = None) -> pd.DataFrame:
+    """
+    Charge une table du dataset via son cache Parquet (créé au premier appel,
+    reconstruit si le CSV source a changé). Avec columns, seules ces colonnes
+    sont lues depuis le disque.
+    """
+    data_dir = data_dir or config.DATA_DIR
+    if not use_cache:
+        return load_csv(filename, columns=columns, data_dir=data_dir)
+
+    source = os.path.join(data_dir, filename)
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"Erreur: Le fichier {source} est introuvable.")
+
+    cache_dir = os.path.join(data_dir, "cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    stem = os.path.splitext(filename)[0]
+    cache_path = os.path.join(cache_dir, f"{stem}.parquet")
+    meta_path = os.path.join(cache_dir, f"{stem}.json")
+
+    signature = _source_signature(source)
+    cached_signature = None
+    if os.path.exists(cache_path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            cached_signature = json.load(f)
+    if cached_signature != signature:
+        _build_cache(source, cache_path, meta_path, signature)
+
+    return pd.read_parquet(cache_path, columns=columns)
+
+
+def iter_chunks(input_path: str, chunksize: int, columns: list):
+    """
+    Lit un fichier (CSV ou Parquet) en flux, bloc par bloc, en ne chargeant que les colonnes utiles
+    """
+    if input_path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(input_path)
+        available = set(parquet_file.schema_arrow.names)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=[c for c in columns if c in available]):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunksize, usecols=lambda c: c in columns)
+
+
+def load_all_data(columns: dict = None, tables: list = None, use_cache: bool = True, max_workers: int = None):
     """
     Charge toutes les tables du dataset Home Credit.
     Equivalent de la partie chargement du notebook Kaggle,
     mais sous forme de module réutilisable dans tout le projet.
+
+    - columns : {table: [colonnes]} pour ne lire que les colonnes utiles
+    - tables : sous-ensemble des tables à charger (par défaut toutes)
+    - les tables sont lues en parallèle (la lecture Parquet/CSV libère le GIL) ;
+      les caches à construire le sont au plus CACHE_BUILD_WORKERS à la fois
     """
-    with timer("Chargement de tous les fichiers CSV"):
-        application_train = load_csv("application_train.csv")
-        application_test  = load_csv("application_test.csv")
-        bureau            = load_csv("bureau.csv")
-        bureau_balance    = load_csv("bureau_balance.csv")
-        previous_app      = load_csv("previous_application.csv")
-        pos_cash          = load_csv("POS_CASH_balance.csv")
-        installments      = load_csv("installments_payments.csv")
-        credit_card       = load_csv("credit_card_balance.csv")
-
-    return {
-        "train": application_train,
-        "test": application_test,
-        "bureau": bureau,
-        "bureau_balance": bureau_balance,
-        "previous": previous_app,
-        "pos": pos_cash,
-        "installments": installments,
-        "credit": credit_card
-    }
+    columns = columns or {}
+    tables = tables or list(TABLES)
+
+    with timer("Chargement des tables"):
+        with ThreadPoolExecutor(max_workers=max_workers or len(tables)) as pool:
+            futures = {
+                name: pool.submit(load_table, TABLES[name], columns.get(name), use_cache)
+                for name in tables
+            }
+            return {name: future.result() for name, future in futures.items()}
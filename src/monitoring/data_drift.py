@@ -1,27 +1,116 @@
+import argparse
+import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 
-from evidently.report import Report
-from evidently.metrics import DataDriftTable
 from src.config.config import config
+from src.data_loader import _source_signature, iter_chunks, load_table
+from src.monitoring.drift import PROFILE_FORMAT, DriftStatistics, ReferenceProfile, drift_summary
+
+REFERENCE_FILE = "application_train.csv"
+CURRENT_FILE = "application_test.csv"
+# Profil de référence, calculé une fois (recalculé si le CSV de référence change)
+DEFAULT_PROFILE_PATH = os.path.join(config.MONITORING_DIR, "reference_profile.json")
+
+
+def _csv_columns(path: str) -> list:
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(path).schema_arrow.names
+    return pd.read_csv(path, nrows=0).columns.tolist()
 
 
+def load_reference_profile(columns: list, profile_path: str = DEFAULT_PROFILE_PATH, rebuild: bool = False,
+                           n_jobs: int = None) -> ReferenceProfile:
+    """
+    Profil de référence de application_train (colonnes columns) : relu s'il existe pour le
+    même CSV et les mêmes colonnes, sinon calculé depuis le cache Parquet et enregistré.
+    Les colonnes float32 du cache gardent leur largeur dans le profil : les valeurs
+    courantes (CSV en float64) y sont ramenées avant d'être comparées.
+    """
+    source = os.path.join(config.DATA_DIR, REFERENCE_FILE)
+    signature = _source_signature(source) if os.path.exists(source) else None
+    if not rebuild and os.path.exists(profile_path):
+        profile = ReferenceProfile.load(profile_path)
+        # Sans CSV de référence (machine de monitoring), le profil enregistré fait foi
+        if signature is None or (profile.meta.get("source") == signature
+                                 and profile.meta.get("format") == PROFILE_FORMAT
+                                 and set(columns) <= set(profile.columns)):
+            return profile
 
-def run_data_drift():
+    print("Calcul du profil de référence...")
+    reference_columns = [col for col in _csv_columns(source) if col in set(columns)]
+    profile = ReferenceProfile.from_table(REFERENCE_FILE, reference_columns, n_jobs=n_jobs,
+                                          meta={"source": signature})
+    profile.save(profile_path)
+    print(f"Profil de référence sauvegardé : {profile_path}")
+    return profile
+
+
+def run_data_drift(current_path: str = None, profile_path: str = DEFAULT_PROFILE_PATH, chunksize: int = 100000,
+                   html: bool = False, rebuild_reference: bool = False, n_jobs: int = None) -> dict:
+    """
+    Data drift des données courantes (application_test par défaut) par rapport au profil
+    de référence : lecture en flux par blocs, colonnes traitées en parallèle.
+    Écrit data_drift.csv (métriques par colonne) et data_drift.json (synthèse) dans
+    REPORTING_DIR ; html=True ajoute le rapport Evidently (lecture complète des deux jeux).
+    """
     print("Lancement de l'analyse de data drift...")
+    start = time.perf_counter()
+    current_path = current_path or os.path.join(config.DATA_DIR, CURRENT_FILE)
+
+    # Colonnes communes : exclut TARGET qui n'est pas dans le test
+    current_columns = _csv_columns(current_path)
+    profile = load_reference_profile(current_columns, profile_path, rebuild_reference, n_jobs)
+    columns = [col for col in current_columns if col in profile.columns]
+    profile = ReferenceProfile({col: profile.columns[col] for col in columns}, profile.meta)
 
-    # Chargement des données
-    X_train = pd.read_csv(os.path.join(config.DATA_DIR, "application_train.csv"))
-    X_test = pd.read_csv(os.path.join(config.DATA_DIR, "application_test.csv"))
+    statistics = DriftStatistics(profile)
+    n_rows = 0
+    with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as pool:
+        for chunk in iter_chunks(current_path, chunksize, columns):
+            statistics.update(chunk, pool)
+            n_rows += len(chunk)
+
+    metrics = statistics.metrics()
+    summary = {**drift_summary(metrics), "n_rows_reference": profile.meta.get("n_rows"), "n_rows_current": n_rows}
+    print(f"Reference : {summary['n_rows_reference']} lignes, courant : {n_rows} lignes, {len(columns)} colonnes")
+    print(f"Colonnes en dérive (PSI) : {summary['n_drifted']}/{summary['n_columns']} "
+          f"- dérive du jeu : {summary['dataset_drift']} ({time.perf_counter() - start:.2f} sec)")
+
+    # Dossier de reporting
+    os.makedirs(config.REPORTING_DIR, exist_ok=True)
+    metrics.to_csv(os.path.join(config.REPORTING_DIR, "data_drift.csv"), index=False)
+    with open(os.path.join(config.REPORTING_DIR, "data_drift.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    print(f"Métriques sauvegardées : {config.REPORTING_DIR}")
+
+    if html:
+        save_html_report(columns, current_path)
+    return summary
+
+
+def save_html_report(columns: list, current_path: str = None):
+    """Rapport Evidently (DataDriftTable) sur les jeux complets : coûteux, à la demande"""
+    from evidently.report import Report
+    from evidently.metrics import DataDriftTable
+
+    # Chargement des données (cache Parquet), sur les seules colonnes communes
+    if current_path is None or current_path == os.path.join(config.DATA_DIR, CURRENT_FILE):
+        X_test = load_table(CURRENT_FILE, columns=columns)
+    elif current_path.endswith(".parquet"):
+        X_test = pd.read_parquet(current_path, columns=columns)
+    else:
+        X_test = pd.read_csv(current_path, usecols=columns)
+    X_train = load_table(REFERENCE_FILE, columns=columns)
 
     print(f"Train shape : {X_train.shape}")
     print(f"Test shape  : {X_test.shape}")
 
-    # Alignement des colonnes : on ne garde que les features communes (exclut TARGET qui n'est pas dans le test)
-    common_cols = list(set(X_train.columns) & set(X_test.columns))
-    X_train = X_train[common_cols]
-    X_test = X_test[common_cols]
-
     # Création du rapport Evidently
     report = Report(
         metrics=[DataDriftTable()]
@@ -31,8 +120,6 @@ def run_data_drift():
         current_data=X_test
     )
 
-    # Dossier de reporting 
-    os.makedirs(config.REPORTING_DIR, exist_ok=True)
     # Chemin de sauvegarde du rapport
     output_path = os.path.join(
         config.REPORTING_DIR,
@@ -44,5 +131,17 @@ def run_data_drift():
     print(f"Rapport sauvegardé : {output_path}")
 
 
+def main():
+    parser = argparse.ArgumentParser(description="Data drift par rapport au profil de référence")
+    parser.add_argument("--current", help="Fichier courant (CSV ou Parquet), par défaut data/application_test.csv")
+    parser.add_argument("--chunksize", type=int, default=100000, help="Nombre de lignes par bloc")
+    parser.add_argument("--html", action="store_true", help="Génère aussi le rapport HTML Evidently")
+    parser.add_argument("--rebuild-reference", action="store_true", help="Recalcule le profil de référence")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de threads (colonnes en parallèle)")
+    args = parser.parse_args()
+    run_data_drift(args.current, chunksize=args.chunksize, html=args.html,
+                   rebuild_reference=args.rebuild_reference, n_jobs=args.workers)
+
+
 if __name__ == "__main__":
-    run_data_drift()
+    main()
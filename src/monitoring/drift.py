@@ -0,0 +1,274 @@
+# src/monitoring/drift.py
+"""
+Moteur de data drift sur profil de référence précalculé.
+
+- ReferenceProfile : profil compact de chaque colonne du jeu de référence, calculé une
+  seule fois et enregistré en JSON
+    - numérique : bornes des déciles (bins du PSI), grille des centiles et fonction de
+      répartition de la référence en ces points (KS), moyenne
+    - catégorielle : fréquences des modalités les plus courantes (+ "autres")
+    - taux de valeurs manquantes
+- DriftStatistics : effectifs des données courantes dans les bins du profil, mis à jour
+  bloc par bloc (update, colonnes traitées en parallèle) et fusionnables (merge)
+- les valeurs courantes sont lues à la largeur de la référence (float32 pour une colonne
+  du cache Parquet) : des décimales identiques tombent dans les mêmes bins
+- metrics() : PSI (valeurs manquantes comptées comme un bin : une source devenue vide
+  dérive), KS approché sur la grille des centiles (à 1 % près), taux de manquants
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Seuils usuels : PSI >= 0.2 -> dérive ; jeu en dérive si au moins la moitié des colonnes dérivent
+PSI_THRESHOLD = 0.2
+DATASET_DRIFT_SHARE = 0.5
+# Proportion minimale d'un bin dans le PSI (évite log(0))
+PSI_EPSILON = 1e-4
+# Version du format des profils enregistrés (un profil d'une autre version est recalculé)
+PROFILE_FORMAT = 2
+
+
+def population_stability_index(reference_counts, current_counts) -> float:
+    """PSI entre deux histogrammes sur les mêmes bins"""
+    reference = np.asarray(reference_counts, dtype=np.float64)
+    current = np.asarray(current_counts, dtype=np.float64)
+    if reference.sum() == 0 or current.sum() == 0:
+        return float("nan")
+    p = np.maximum(reference / reference.sum(), PSI_EPSILON)
+    q = np.maximum(current / current.sum(), PSI_EPSILON)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def is_numeric(series: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+class ColumnProfile:
+    """
+    Profil d'une colonne de référence. Pour une colonne numérique, bin_index(values)
+    donne le bin du PSI de chaque valeur non manquante (0..len(edges)) et grid_index(values)
+    l'intervalle de la grille des centiles ; pour une colonne catégorielle, bin_index
+    donne l'indice de la modalité (len(categories) : autre modalité).
+    dtype : largeur des valeurs de référence (float32 ou float64), appliquée aux valeurs
+    courantes avant comparaison.
+    """
+
+    def __init__(self, kind: str, count: int, null_count: int, counts, edges=None, grid=None,
+                 grid_cdf=None, mean=None, categories=None, dtype: str = "float64"):
+        self.kind = kind
+        self.dtype = dtype
+        self.count = int(count)
+        self.null_count = int(null_count)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.edges = np.asarray(edges if edges is not None else [], dtype=np.float64)
+        self.grid = np.asarray(grid if grid is not None else [], dtype=np.float64)
+        self.grid_cdf = np.asarray(grid_cdf if grid_cdf is not None else [], dtype=np.float64)
+        self.mean = mean
+        self.categories = list(categories or [])
+        self._category_index = pd.Index(self.categories)
+
+    @classmethod
+    def from_series(cls, series: pd.Series, n_bins: int = 10, n_quantiles: int = 100,
+                    max_categories: int = 50) -> "ColumnProfile":
+        null_count = int(series.isna().sum())
+        if is_numeric(series):
+            dtype = "float32" if series.dtype == np.float32 else "float64"
+            values = np.sort(series.dropna().to_numpy(dtype=np.float64))
+            if len(values):
+                edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+                grid = np.unique(np.quantile(values, np.linspace(0, 1, n_quantiles + 1)[1:-1]))
+                grid_cdf = np.searchsorted(values, grid, side="right") / len(values)
+                mean = float(values.mean())
+            else:
+                edges, grid, grid_cdf, mean = [], [], [], None
+            counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+            return cls("numeric", len(series), null_count, counts, edges, grid, grid_cdf, mean, dtype=dtype)
+
+        frequencies = series.dropna().astype(str).value_counts()
+        categories = frequencies.index[:max_categories].tolist()
+        counts = [*frequencies.iloc[:max_categories].tolist(), int(frequencies.iloc[max_categories:].sum())]
+        return cls("categorical", len(series), null_count, counts, categories=categories)
+
+    def values_of(self, series: pd.Series) -> np.ndarray:
+        """Valeurs non manquantes d'une série courante, au type (et à la largeur) du profil"""
+        if self.kind == "numeric":
+            values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=self.dtype, na_value=np.nan)
+            return values[~np.isnan(values)].astype(np.float64, copy=False)
+        return series.dropna().astype(str).to_numpy()
+
+    def bin_index(self, values: np.ndarray) -> np.ndarray:
+        if self.kind == "numeric":
+            return np.searchsorted(self.edges, values, side="right")
+        codes = self._category_index.get_indexer(values)
+        codes[codes < 0] = len(self.categories)
+        return codes
+
+    def grid_index(self, values: np.ndarray) -> np.ndarray:
+        return np.searchsorted(self.grid, values, side="left")
+
+    def psi_counts(self) -> np.ndarray:
+        """Histogramme du PSI : [manquants, bins]"""
+        return np.concatenate([[self.null_count], self.counts])
+
+    def to_dict(self) -> dict:
+        data = {"kind": self.kind, "count": self.count, "null_count": self.null_count, "counts": self.counts.tolist()}
+        if self.kind == "numeric":
+            data.update(edges=self.edges.tolist(), grid=self.grid.tolist(),
+                        grid_cdf=self.grid_cdf.tolist(), mean=self.mean, dtype=self.dtype)
+        else:
+            data["categories"] = self.categories
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ColumnProfile":
+        return cls(**data)
+
+
+class ReferenceProfile:
+    """Profils des colonnes d'un jeu de référence et métadonnées (source, paramètres)"""
+
+    def __init__(self, columns: dict, meta: dict = None):
+        self.columns = columns
+        self.meta = meta or {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, n_bins: int = 10, n_quantiles: int = 100, max_categories: int = 50,
+                   n_jobs: int = None, meta: dict = None) -> "ReferenceProfile":
+        """Profil des colonnes d'un DataFrame (colonnes profilées en parallèle)"""
+        with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as pool:
+            profiles = pool.map(
+                lambda col: ColumnProfile.from_series(df[col], n_bins, n_quantiles, max_categories), df.columns
+            )
+            columns = dict(zip(df.columns, profiles))
+        meta = {**(meta or {}), "n_rows": len(df), "n_bins": n_bins, "n_quantiles": n_quantiles,
+                "format": PROFILE_FORMAT}
+        return cls(columns, meta)
+
+    @classmethod
+    def from_table(cls, filename: str, columns: list, batch_size: int = 20, n_jobs: int = None,
+                   meta: dict = None, **kwargs) -> "ReferenceProfile":
+        """
+        Profil d'une table du dataset lue par groupes de batch_size colonnes depuis son
+        cache Parquet (mémoire bornée à un groupe de colonnes)
+        """
+        from src.data_loader import load_table
+
+        profiles, n_rows = {}, 0
+        for start in range(0, len(columns), batch_size):
+            part = load_table(filename, columns=columns[start:start + batch_size])
+            profiles.update(cls.from_frame(part, n_jobs=n_jobs, **kwargs).columns)
+            n_rows = len(part)
+        profile = cls(profiles, meta)
+        profile.meta.update(n_rows=n_rows, format=PROFILE_FORMAT, **{k: v for k, v in kwargs.items() if k in ("n_bins", "n_quantiles")})
+        return profile
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        payload = {"meta": self.meta, "columns": {col: p.to_dict() for col, p in self.columns.items()}}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "ReferenceProfile":
+        with open(path) as f:
+            payload = json.load(f)
+        return cls({col: ColumnProfile.from_dict(p) for col, p in payload["columns"].items()}, payload["meta"])
+
+
+class DriftStatistics:
+    """
+    Effectifs des données courantes dans les bins du profil de référence :
+    par colonne, nombre de lignes, de manquants, histogramme du PSI, histogramme
+    de la grille des centiles et somme des valeurs.
+    """
+
+    def __init__(self, profile: ReferenceProfile):
+        self.profile = profile
+        self.count = {}
+        self.null_count = {}
+        self.counts = {}
+        self.grid_counts = {}
+        self.sums = {}
+        for col, ref in profile.columns.items():
+            self.count[col] = self.null_count[col] = 0
+            self.counts[col] = np.zeros_like(ref.counts)
+            self.grid_counts[col] = np.zeros(len(ref.grid) + 1, dtype=np.int64)
+            self.sums[col] = 0.0
+
+    def _update_column(self, col: str, series: pd.Series):
+        ref = self.profile.columns[col]
+        values = ref.values_of(series)
+        self.count[col] += len(series)
+        self.null_count[col] += len(series) - len(values)
+        self.counts[col] += np.bincount(ref.bin_index(values), minlength=len(ref.counts))
+        if ref.kind == "numeric":
+            self.grid_counts[col] += np.bincount(ref.grid_index(values), minlength=len(ref.grid) + 1)
+            self.sums[col] += float(values.sum())
+
+    def update(self, chunk: pd.DataFrame, pool: ThreadPoolExecutor = None):
+        """Ajoute un bloc de données courantes ; une colonne absente compte comme manquante"""
+        columns = [col for col in self.profile.columns if col in chunk.columns]
+        for col in self.profile.columns:
+            if col not in chunk.columns:
+                self.count[col] += len(chunk)
+                self.null_count[col] += len(chunk)
+        if pool is None:
+            for col in columns:
+                self._update_column(col, chunk[col])
+        else:
+            # Chaque colonne a ses propres compteurs : pas de verrou
+            list(pool.map(lambda col: self._update_column(col, chunk[col]), columns))
+        return self
+
+    def merge(self, other: "DriftStatistics") -> "DriftStatistics":
+        for col in self.profile.columns:
+            self.count[col] += other.count[col]
+            self.null_count[col] += other.null_count[col]
+            self.counts[col] += other.counts[col]
+            self.grid_counts[col] += other.grid_counts[col]
+            self.sums[col] += other.sums[col]
+        return self
+
+    def metrics(self, psi_threshold: float = PSI_THRESHOLD) -> pd.DataFrame:
+        """Métriques par colonne, triées par PSI décroissant"""
+        rows = []
+        for col, ref in self.profile.columns.items():
+            current_psi = np.concatenate([[self.null_count[col]], self.counts[col]])
+            psi = population_stability_index(ref.psi_counts(), current_psi)
+            non_null = self.count[col] - self.null_count[col]
+            ks = mean = None
+            if ref.kind == "numeric" and non_null and len(ref.grid):
+                current_cdf = np.cumsum(self.grid_counts[col])[:len(ref.grid)] / non_null
+                ks = float(np.max(np.abs(current_cdf - ref.grid_cdf)))
+                mean = self.sums[col] / non_null
+            rows.append({
+                "column": col,
+                "kind": ref.kind,
+                "psi": psi,
+                "ks": ks,
+                "null_rate_reference": ref.null_count / ref.count if ref.count else None,
+                "null_rate_current": self.null_count[col] / self.count[col] if self.count[col] else None,
+                "mean_reference": ref.mean,
+                "mean_current": mean,
+                "drift": bool(psi >= psi_threshold),
+            })
+        result = pd.DataFrame(rows)
+        return result.sort_values("psi", ascending=False, na_position="last").reset_index(drop=True)
+
+
+def drift_summary(metrics: pd.DataFrame, dataset_drift_share: float = DATASET_DRIFT_SHARE) -> dict:
+    """Nombre et part des colonnes en dérive, et dérive du jeu complet"""
+    n_drifted = int(metrics["drift"].sum())
+    share = n_drifted / len(metrics) if len(metrics) else 0.0
+    return {
+        "n_columns": len(metrics),
+        "n_drifted": n_drifted,
+        "share_drifted": share,
+        "dataset_drift": share >= dataset_drift_share,
+        "drifted_columns": metrics.loc[metrics["drift"], "column"].tolist(),
+    }
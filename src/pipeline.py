@@ -0,0 +1,425 @@
+# src/pipeline.py
+"""
+Pipeline d'entraînement de bout en bout, en étapes mises en cache sur disque.
+
+features (chargement + feature engineering) -> preprocess (Preprocessor, features du
+modèle, split train/test) -> baselines et search (en parallèle) -> threshold,
+puis publication (MLflow, modèle et seuil), qui n'est pas mise en cache mais
+enregistrée : un marqueur, clé des étapes publiées, évite de republier le même modèle.
+
+- Chaque étape a une clé : empreinte de ses paramètres, du code qui la produit
+  (source de la fonction et des modules dont elle dépend), des clés des étapes
+  dont elle dépend et, pour la première, de la taille et de la date des CSV sources.
+- Sa sortie est écrite dans PIPELINE_DIR/<étape>-<clé>/ (répertoire construit à côté
+  puis renommé : un répertoire présent est forcément complet). Une étape dont la
+  sortie existe déjà n'est pas refaite ; après un crash, la relance reprend aux
+  étapes qui n'ont pas été terminées.
+- Les étapes indépendantes sont exécutées en parallèle (threads) ; les sorties en
+  cache ne sont relues que si une étape à exécuter en a besoin.
+
+Usage :
+    python -m src.pipeline --search halving --workers 2
+    python -m src.pipeline --force search       # refait search (et la publication)
+"""
+import argparse
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import joblib
+import pandas as pd
+
+from src.config.config import config
+
+PIPELINE_DIR = os.path.join(config.DATA_DIR, "pipeline")
+MANIFEST = "_manifest.json"
+
+
+def _digest(obj) -> str:
+    """Empreinte (sha256) d'un objet JSON"""
+    payload = json.dumps(obj, sort_keys=True, default=repr).encode()
+    return hashlib.sha256(payload).hexdigest()
+
+
+def code_version(func, modules=()) -> str:
+    """Empreinte du code d'une étape : source de la fonction et des modules listés"""
+    sources = [inspect.getsource(func)]
+    for name in sorted(modules):
+        with open(importlib.import_module(name).__file__, "rb") as f:
+            sources.append(hashlib.sha256(f.read()).hexdigest())
+    return _digest(sources)
+
+
+def _save_joblib(output, directory: str):
+    joblib.dump(output, os.path.join(directory, "output.pkl"))
+
+
+def _load_joblib(directory: str):
+    return joblib.load(os.path.join(directory, "output.pkl"))
+
+
+class Stage:
+    """
+    Étape du pipeline : func(*sorties des étapes inputs, **params) -> sortie.
+    - code : modules dont le contenu entre dans la clé (en plus de la source de func)
+    - fingerprint : fonction sans argument décrivant des entrées externes (fichiers sources)
+    - save(sortie, répertoire) / load(répertoire) : persistance (joblib par défaut)
+    """
+
+    def __init__(self, name: str, func, inputs=(), params: dict = None, code=(), fingerprint=None,
+                 save=None, load=None):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.params = dict(params or {})
+        self.code = tuple(code)
+        self.fingerprint = fingerprint
+        self.save = save or _save_joblib
+        self.load = load or _load_joblib
+
+
+class Pipeline:
+    """
+    Étapes (dans un ordre où chaque étape suit celles dont elle dépend) exécutées
+    avec cache adressé par contenu ; max_workers étapes au plus en même temps.
+    """
+
+    def __init__(self, stages: list, cache_dir: str = PIPELINE_DIR, max_workers: int = 2, verbose: int = 1):
+        self.stages = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Étape en double : {stage.name}")
+            unknown = [dep for dep in stage.inputs if dep not in self.stages]
+            if unknown:
+                raise ValueError(f"L'étape {stage.name} dépend d'étapes inconnues ou placées après elle : {unknown}")
+            self.stages[stage.name] = stage
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.verbose = verbose
+        # Étapes exécutées (et non relues depuis le cache) lors du dernier run
+        self.executed = []
+
+    def keys(self) -> dict:
+        """Clé de chaque étape"""
+        keys = {}
+        for name, stage in self.stages.items():
+            keys[name] = _digest({
+                "stage": name,
+                "params": stage.params,
+                "code": code_version(stage.func, stage.code),
+                "inputs": {dep: keys[dep] for dep in stage.inputs},
+                "fingerprint": stage.fingerprint() if stage.fingerprint else None,
+            })
+        return keys
+
+    def path(self, name: str, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{name}-{key[:16]}")
+
+    def status(self) -> dict:
+        """"cached" ou "pending" pour chaque étape"""
+        return {
+            name: "cached" if os.path.isdir(self.path(name, key)) else "pending"
+            for name, key in self.keys().items()
+        }
+
+    def action_path(self, action: str, stages) -> str:
+        """Marqueur d'une action hors cache (publication...) faite sur les sorties de stages"""
+        keys = self.keys()
+        return os.path.join(self.cache_dir, f"{action}-{_digest([keys[name] for name in stages])[:16]}.json")
+
+    def action_done(self, action: str, stages) -> bool:
+        return os.path.exists(self.action_path(action, stages))
+
+    def record_action(self, action: str, stages):
+        """Enregistre l'action, une fois terminée, pour les clés courantes de stages"""
+        path = self.action_path(action, stages)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        keys = self.keys()
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "action": action,
+                "stages": {name: keys[name] for name in stages},
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _required(self, targets) -> list:
+        """Étapes cibles et toutes celles dont elles dépendent, dans l'ordre du pipeline"""
+        required = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.stages:
+                raise ValueError(f"Étape inconnue : {name}")
+            if name not in required:
+                required.add(name)
+                stack.extend(self.stages[name].inputs)
+        return [name for name in self.stages if name in required]
+
+    def _execute(self, stage: Stage, key: str, inputs: list, replace: bool = False):
+        """
+        Exécute l'étape, écrit sa sortie et la relit (sortie identique à celle d'une reprise) ;
+        replace : remplace une sortie existante (étape forcée)
+        """
+        start = time.perf_counter()
+        output = stage.func(*inputs, **stage.params)
+        seconds = time.perf_counter() - start
+
+        final_dir = self.path(stage.name, key)
+        tmp_dir = f"{final_dir}.tmp-{os.getpid()}-{threading.get_ident()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        stage.save(output, tmp_dir)
+        with open(os.path.join(tmp_dir, MANIFEST), "w") as f:
+            json.dump({
+                "stage": stage.name,
+                "key": key,
+                "params": stage.params,
+                "inputs": list(stage.inputs),
+                "seconds": round(seconds, 3),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }, f, indent=2, default=repr)
+        if replace and os.path.isdir(final_dir):
+            shutil.rmtree(final_dir)
+        try:
+            os.rename(tmp_dir, final_dir)
+        except OSError:
+            # Sortie écrite entre-temps par un autre run : même clé, même contenu
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        if self.verbose:
+            print(f"[pipeline] {stage.name} exécutée en {seconds:.2f} sec")
+        return stage.load(final_dir)
+
+    def run(self, targets=None, force=()) -> dict:
+        """
+        Exécute les étapes nécessaires aux cibles (par défaut toutes) et renvoie
+        {cible: sortie}. Les étapes de force sont refaites même si leur sortie existe.
+        En cas d'erreur, les étapes en cours sont terminées (et enregistrées) avant
+        que l'erreur ne soit relevée.
+        """
+        targets = list(targets or self.stages)
+        unknown = [name for name in force if name not in self.stages]
+        if unknown:
+            raise ValueError(f"Étapes inconnues : {unknown}")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        keys = self.keys()
+        required = self._required(targets)
+        to_run = [
+            name for name in required
+            if name in force or not os.path.isdir(self.path(name, keys[name]))
+        ]
+        if self.verbose:
+            for name in required:
+                if name not in to_run:
+                    print(f"[pipeline] {name} en cache ({self.path(name, keys[name])})")
+
+        outputs = {}
+
+        def output_of(name):
+            # Sortie en cache relue à la demande
+            if name not in outputs:
+                stage = self.stages[name]
+                outputs[name] = stage.load(self.path(name, keys[name]))
+            return outputs[name]
+
+        self.executed = []
+        error = None
+        running = {}
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+            while running or (to_run and error is None):
+                if error is None:
+                    blocked = set(to_run) | set(running.values())
+                    ready = [name for name in to_run if not blocked & set(self.stages[name].inputs)]
+                    for name in ready:
+                        stage = self.stages[name]
+                        inputs = [output_of(dep) for dep in stage.inputs]
+                        running[pool.submit(self._execute, stage, keys[name], inputs, name in force)] = name
+                        to_run.remove(name)
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        outputs[name] = future.result()
+                        self.executed.append(name)
+                    except Exception as exc:
+                        error = error or exc
+                        if self.verbose:
+                            print(f"[pipeline] échec de {name} : {exc!r}")
+        if error is not None:
+            raise error
+        return {name: output_of(name) for name in targets}
+
+
+# Étapes du projet ------------------------------------------------------------------
+
+def _sources_fingerprint() -> dict:
+    """Taille et date de modification des CSV sources (None pour un fichier absent)"""
+    from src.data_loader import TABLES, _source_signature
+
+    paths = {name: os.path.join(config.DATA_DIR, filename) for name, filename in TABLES.items()}
+    return {name: _source_signature(path) if os.path.exists(path) else None for name, path in paths.items()}
+
+
+def build_features() -> dict:
+    """Chargement des tables et feature engineering (train et test enrichis)"""
+    from src.data_loader import load_all_data
+    from src.preprocessing.feature_engineering import FeatureEngineer
+
+    train, test = FeatureEngineer().merge_all(load_all_data())
+    return {"train": train, "test": test}
+
+
+def _save_features(output: dict, directory: str):
+    for name, df in output.items():
+        df.to_parquet(os.path.join(directory, f"{name}.parquet"))
+
+
+def _load_features(directory: str) -> dict:
+    return {name: pd.read_parquet(os.path.join(directory, f"{name}.parquet")) for name in ("train", "test")}
+
+
+def prepare_training_data(features: dict, feature_names: list, test_size: float, random_state: int) -> dict:
+    """
+    Préprocessing du jeu d'entraînement (Preprocessor appris sur train), sélection des
+    features du modèle et split train/test stratifié, comme dans le notebook
+    """
+    from sklearn.model_selection import train_test_split
+
+    from src.preprocessing.preprocess import Preprocessor
+
+    preprocessor = Preprocessor()
+    preprocessor.fit(features["train"])
+    train_clean = preprocessor.transform(features["train"])
+    missing = [col for col in feature_names if col not in train_clean.columns]
+    if missing:
+        raise ValueError(f"Features du modèle absentes après préprocessing : {missing}")
+
+    X = train_clean[feature_names]
+    y = train_clean[config.TARGET].astype(int)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=random_state, stratify=y
+    )
+    return {
+        "X_train": X_train.reset_index(drop=True), "y_train": y_train.reset_index(drop=True),
+        "X_test": X_test.reset_index(drop=True), "y_test": y_test.reset_index(drop=True),
+        "preprocessor": preprocessor,
+    }
+
+
+def _save_training_data(output: dict, directory: str):
+    from src.training.datasets import save_training_data
+
+    save_training_data(output["X_train"], output["y_train"], output["X_test"], output["y_test"],
+                       directory=os.path.join(directory, "training"))
+    joblib.dump(output["preprocessor"], os.path.join(directory, "preprocessor.pkl"))
+
+
+def _load_training_data(directory: str) -> dict:
+    """Matrices en memory-map (format colonne de src.training.datasets)"""
+    from src.training.datasets import load_training_data
+
+    X_train, y_train, X_test, y_test, meta = load_training_data(os.path.join(directory, "training"))
+    return {
+        "X_train": X_train, "y_train": y_train, "X_test": X_test, "y_test": y_test, "meta": meta,
+        "preprocessor": joblib.load(os.path.join(directory, "preprocessor.pkl")),
+    }
+
+
+def run_baselines(data: dict) -> dict:
+    from src.training.train import evaluate_baselines
+
+    return evaluate_baselines(data["X_train"], data["y_train"], data["X_test"], data["y_test"])
+
+
+def run_search(data: dict, search: str, param_grid: dict) -> dict:
+    """Recherche d'hyperparamètres ; les folds LightGBM sont relus du cache binaire (empreinte des données)"""
+    from src.training.train import make_search
+
+    model_search = make_search(search, param_grid, data_hash=data["meta"]["hash"])
+    model_search.fit(data["X_train"], data["y_train"])
+    return {
+        "model": model_search.best_estimator_,
+        "best_params": model_search.best_params_,
+        "best_score": float(model_search.best_score_),
+    }
+
+
+def run_threshold(data: dict, search: dict) -> dict:
+    from src.training.train import search_threshold
+
+    return search_threshold(search["model"], data["X_test"], data["y_test"])
+
+
+# Étapes dont les sorties sont publiées (leurs clés couvrent toutes les autres)
+PUBLISHED_STAGES = ("baselines", "threshold")
+
+
+def build_pipeline(search: str = "halving", param_grid: dict = None, test_size: float = 0.20,
+                   random_state: int = 42, cache_dir: str = PIPELINE_DIR, max_workers: int = 2) -> Pipeline:
+    """Pipeline d'entraînement du projet (mêmes étapes et paramètres que le notebook et train.py)"""
+    from src.scoring_batch import FEATURE_NAMES
+    from src.training.train import PARAM_GRID
+
+    # LGBM_PARAMS (src.training.train) entre dans la clé par le code
+    training_code = ("src.training.train", "src.training.scoring", "src.training.search")
+    stages = [
+        Stage("features", build_features,
+              code=("src.data_loader", "src.preprocessing.feature_engineering"),
+              fingerprint=_sources_fingerprint, save=_save_features, load=_load_features),
+        Stage("preprocess", prepare_training_data, inputs=("features",),
+              params={"feature_names": FEATURE_NAMES, "test_size": test_size, "random_state": random_state},
+              code=("src.preprocessing.preprocess", "src.training.datasets"),
+              save=_save_training_data, load=_load_training_data),
+        Stage("baselines", run_baselines, inputs=("preprocess",), code=training_code),
+        Stage("search", run_search, inputs=("preprocess",),
+              params={"search": search, "param_grid": param_grid or PARAM_GRID},
+              code=training_code),
+        Stage("threshold", run_threshold, inputs=("preprocess", "search"), code=training_code),
+    ]
+    return Pipeline(stages, cache_dir=cache_dir, max_workers=max_workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--search", choices=("halving", "grid"), default="halving",
+                        help="Mode de recherche des hyperparamètres")
+    parser.add_argument("--workers", type=int, default=2, help="Nombre d'étapes exécutées en même temps")
+    parser.add_argument("--force", nargs="*", default=[], help="Étapes à refaire même si elles sont en cache")
+    parser.add_argument("--status", action="store_true", help="Affiche l'état du cache sans rien exécuter")
+    parser.add_argument("--no-publish", action="store_true", help="Ne publie pas le modèle (MLflow, models/)")
+    args = parser.parse_args()
+
+    pipeline = build_pipeline(search=args.search, max_workers=args.workers)
+    if args.status:
+        for name, state in pipeline.status().items():
+            print(f"{name:<12} {state}")
+        published = pipeline.action_done("publish", PUBLISHED_STAGES)
+        print(f"{'publish':<12} {'done' if published else 'pending'}")
+        return
+
+    outputs = pipeline.run(force=args.force)
+    if args.no_publish:
+        return
+    # Publication refaite après une étape exécutée, ou si la précédente n'a pas abouti
+    # (--no-publish, échec de MLflow...)
+    if not pipeline.executed and pipeline.action_done("publish", PUBLISHED_STAGES):
+        print("Toutes les étapes étaient en cache : modèle déjà publié, rien à faire")
+        return
+
+    from src.training.train import publish_model
+
+    search = outputs["search"]
+    publish_model(search["model"], search["best_params"], search["best_score"],
+                  outputs["baselines"], outputs["threshold"], args.search,
+                  X_reference=outputs["preprocess"]["X_train"])
+    pipeline.record_action("publish", PUBLISHED_STAGES)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,211 @@
 # src/preprocessing/feature_engineering.py
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import pandas as pd
 import numpy as np
 from src.utils.timer import timer
 
+# Agrégations de merge_all : nom -> (méthode, tables d'entrée)
+AGGREGATION_JOBS = {
+    "bureau": ("process_bureau", ("bureau", "bureau_balance")),
+    "previous": ("process_previous", ("previous",)),
+    "installments": ("process_installments", ("installments",)),
+    "pos": ("process_pos", ("pos",)),
+    "credit": ("process_credit", ("credit",)),
+}
+
+# Tables partagées avec les processus du pool : héritées par fork (copy-on-write),
+# elles ne sont ni sérialisées ni copiées
+_shared_tables = None
+
+
+def _init_aggregation_worker():
+    """
+    Processus du pool : sortie standard redirigée, les spinners des timers
+    de plusieurs processus ne s'entremêlent pas dans la console
+    """
+    sys.stdout = open(os.devnull, "w")
+
+
+def _run_aggregation(engineer, name):
+    """Calcule une agrégation de merge_all sur les tables partagées ; renvoie (résultat, durée)"""
+    method, inputs = AGGREGATION_JOBS[name]
+    start = time.time()
+    result = getattr(engineer, method)(*(_shared_tables[table] for table in inputs))
+    return result, time.time() - start
+
+
+# --- Moteur NumPy d'agrégation (partagé avec le store incrémental) ---
+
+def numeric_columns(df, group_var):
+    """Colonnes agrégées : mêmes que select_dtypes(include=[np.number]), sans copier la table"""
+    return [
+        col for col, dtype in df.dtypes.items()
+        if col != group_var and isinstance(dtype, np.dtype) and np.issubdtype(dtype, np.number)
+    ]
+
+
+def has_extension_dtypes(df, group_var):
+    """Types étendus (Int64 nullable...) : non gérés par le moteur NumPy"""
+    return not isinstance(df[group_var].dtype, np.dtype) or any(
+        not isinstance(dtype, np.dtype) and pd.api.types.is_numeric_dtype(dtype)
+        for dtype in df.dtypes
+    )
+
+
+def sorted_groups(keys):
+    """
+    Tri (stable) des lignes par clé, en ignorant les clés manquantes.
+    Renvoie (rows, starts, group_keys) :
+    - rows : ordre de lecture des lignes (None si la table est déjà triée)
+    - starts : début de chaque groupe dans l'ordre trié
+    - group_keys : clé de chaque groupe (croissantes)
+    """
+    valid = None
+    if keys.dtype.kind == "f":
+        valid = ~np.isnan(keys)
+        if valid.all():
+            valid = None
+
+    rows = np.arange(len(keys)) if valid is None else np.flatnonzero(valid)
+    keys = keys[rows]
+    if len(keys) > 1 and not (keys[1:] >= keys[:-1]).all():
+        order = np.argsort(keys, kind="stable")
+        rows, keys = rows[order], keys[order]
+    # Lignes déjà dans l'ordre : pas de réindexation des colonnes
+    if valid is None and (rows[1:] > rows[:-1]).all():
+        rows = None
+
+    if len(keys):
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    else:
+        starts = np.zeros(0, dtype=np.intp)
+    return rows, starts, keys[starts]
+
+
+def reduce_groups(values, starts):
+    """
+    État partiel d'une colonne triée par groupe : (count, sum, min, max).
+    count ignore les NaN ; sum est accumulée en float64 (int64 / uint64 pour les entiers) ;
+    min/max gardent le type de la colonne (NaN si le groupe n'a aucune valeur).
+    Deux états partiels se combinent par addition (count, sum) et fmin/fmax.
+    """
+    accumulator = {"f": np.float64, "u": np.uint64}.get(values.dtype.kind, np.int64)
+    if len(starts) == 0:
+        return (
+            np.zeros(0, dtype=np.int64), np.zeros(0, dtype=accumulator),
+            np.zeros(0, dtype=values.dtype), np.zeros(0, dtype=values.dtype),
+        )
+
+    if values.dtype.kind == "f":
+        missing = np.isnan(values)
+        if missing.any():
+            counts = np.add.reduceat(~missing, starts, dtype=np.int64)
+            values_filled = np.where(missing, 0.0, values)
+        else:
+            counts = np.diff(np.append(starts, len(values)))
+            values_filled = values
+        # Somme en float64 même pour une colonne float32
+        total = np.add.reduceat(values_filled, starts, dtype=np.float64)
+        with np.errstate(invalid="ignore"):
+            minimum = np.fmin.reduceat(values, starts)
+            maximum = np.fmax.reduceat(values, starts)
+    else:
+        counts = np.diff(np.append(starts, len(values)))
+        total = np.add.reduceat(values, starts, dtype=accumulator)
+        minimum = np.minimum.reduceat(values, starts)
+        maximum = np.maximum.reduceat(values, starts)
+    return counts, total, minimum, maximum
+
+
+def finalize_groups(dtype, counts, total, minimum, maximum):
+    """
+    Statistiques finales (mean, min, max, sum) depuis l'état partiel, avec les types
+    produits par pandas : mean en float64 (float32 pour une colonne float32),
+    min/max dans le type de la colonne, somme nulle pour un groupe sans valeur.
+    Comme pandas, une somme entière reste dans le type de la colonne si toutes les
+    sommes y tiennent, sinon en int64 (uint64 pour une colonne non signée).
+    """
+    if dtype.kind == "f":
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(counts > 0, total / np.maximum(counts, 1), np.nan)
+        return mean.astype(dtype), minimum, maximum, total.astype(dtype)
+    mean = total / np.maximum(counts, 1) if len(counts) else np.zeros(0, dtype=np.float64)
+    narrowed = total.astype(dtype)
+    if (narrowed == total).all():
+        total = narrowed
+    return mean, minimum, maximum, total
+
+
+def summation_plan(starts, n):
+    """
+    Ordre de lecture des sommes compensées (float_group_stats), commun aux colonnes
+    d'une table : les groupes sont rangés par taille décroissante, et les lignes par
+    rang dans leur groupe. Le t-ième pas de la sommation lit alors une tranche
+    contiguë (t-ième valeur de chaque groupe d'au moins t + 1 lignes) et met à jour
+    un préfixe des accumulateurs.
+    Renvoie (order, rows, bounds) : groupes par taille décroissante, lignes (dans
+    l'ordre trié par clé) dans l'ordre de lecture, limites des tranches.
+    """
+    sizes = np.diff(np.append(starts, n))
+    order = np.argsort(-sizes, kind="stable")
+    sizes = sizes[order]
+    first = np.cumsum(sizes) - sizes
+    rank = np.arange(n) - np.repeat(first, sizes)
+    rows = (np.repeat(starts[order] - first, sizes) + np.arange(n))[np.argsort(rank, kind="stable")]
+    max_size = int(sizes[0]) if len(sizes) else 0
+    active = np.searchsorted(-sizes, -np.arange(max_size), side="left")
+    return order, rows, np.concatenate(([0], np.cumsum(active)))
+
+
+def float_group_stats(values, starts, plan):
+    """
+    Statistiques (mean, min, max, sum) d'une colonne flottante triée par groupe,
+    identiques à celles de pandas : somme compensée (Kahan) dans le type de la
+    colonne, dans l'ordre des lignes, NaN ignorés ; moyenne = somme / effectif.
+    """
+    order, rows, bounds = plan
+    dtype = values.dtype
+    missing = np.isnan(values)
+    if len(starts):
+        counts = np.add.reduceat(~missing, starts, dtype=np.int64)
+        with np.errstate(invalid="ignore"):
+            minimum = np.fmin.reduceat(values, starts)
+            maximum = np.fmax.reduceat(values, starts)
+    else:
+        counts = np.zeros(0, dtype=np.int64)
+        minimum = maximum = np.zeros(0, dtype=dtype)
+
+    ordered = values[rows]
+    total = np.zeros(len(starts), dtype=dtype)
+    compensation = np.zeros(len(starts), dtype=dtype)
+    with np.errstate(invalid="ignore"):
+        for t in range(len(bounds) - 1):
+            x = ordered[bounds[t]:bounds[t + 1]]
+            k = len(x)
+            s, c = total[:k], compensation[:k]
+            y = x - c
+            new_total = s + y
+            new_compensation = (new_total - s) - y
+            new_compensation[np.isnan(new_compensation)] = 0
+            skip = np.isnan(x)
+            if skip.any():
+                new_total = np.where(skip, s, new_total)
+                new_compensation = np.where(skip, c, new_compensation)
+            total[:k] = new_total
+            compensation[:k] = new_compensation
+    sums = np.empty_like(total)
+    sums[order] = total
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = sums / counts.astype(dtype)
+    return mean, minimum, maximum, sums
+
+
 class FeatureEngineer:
     """
     Feature Engineering
@@ -14,13 +217,32 @@ class FeatureEngineer:
     - Aucun data leakage
     """
 
+    # Statistiques calculées pour chaque colonne numérique, dans l'ordre des colonnes produites
+    AGG_STATS = ("mean", "min", "max", "sum")
+
+    def __init__(self, engine: str = "numpy"):
+        """
+        engine : moteur d'agrégation par défaut
+        - "numpy" : tri unique par clé puis réductions vectorisées (reduceat)
+        - "pandas" : groupby(...).agg(...) d'origine
+        """
+        self.engine = engine
+
     # 1. AGRÉGATIONS 
-    def aggregate_numeric(self, df, group_var, df_name):
+    def aggregate_numeric(self, df, group_var, df_name, engine=None):
         """
         Fonction d'agrégation numérique :
         - https://www.kaggle.com/c/home-credit-default-risk
         simplifie les agrégations à moyenne/max/min/sum/count
+        Les deux moteurs produisent les mêmes colonnes, clés, types et valeurs : le moteur
+        NumPy reproduit la somme compensée de pandas, dans le type de chaque colonne.
         """
+        engine = engine or self.engine
+        if engine == "numpy":
+            return self._aggregate_numeric_numpy(df, group_var, df_name)
+        if engine != "pandas":
+            raise ValueError(f"Moteur d'agrégation inconnu : {engine}")
+
         df = df.copy()
 
         numeric_df = df.select_dtypes(include=[np.number])
@@ -31,6 +253,43 @@ class FeatureEngineer:
 
         return agg
 
+    def _aggregate_numeric_numpy(self, df, group_var, df_name):
+        """
+        Moteur NumPy de aggregate_numeric :
+        - un seul tri (stable) des lignes par clé, inutile si la table est déjà triée
+        - pour chaque colonne, les groupes sont des tranches contiguës réduites en une
+          passe par statistique (np.add / np.fmin / np.fmax .reduceat) ; les sommes des
+          colonnes flottantes sont compensées comme dans pandas (float_group_stats)
+        - une seule colonne réordonnée à la fois en mémoire, sans copie de la table
+        Même sémantique que pandas : clés manquantes ignorées, clés triées, NaN
+        ignorés (somme nulle et moyenne/min/max NaN pour un groupe sans valeur).
+        """
+        columns = numeric_columns(df, group_var)
+        if has_extension_dtypes(df, group_var):
+            return self.aggregate_numeric(df, group_var, df_name, engine="pandas")
+
+        rows, starts, keys = sorted_groups(df[group_var].to_numpy())
+        index = pd.Index(keys, name=group_var)
+
+        plan = None
+        result = {}
+        for col in columns:
+            values = df[col].to_numpy()
+            if rows is not None:
+                values = np.take(values, rows)
+
+            if values.dtype.kind == "f":
+                # Plan calculé une fois pour toutes les colonnes flottantes
+                plan = plan or summation_plan(starts, len(values))
+                stats = float_group_stats(values, starts, plan)
+            else:
+                stats = finalize_groups(values.dtype, *reduce_groups(values, starts))
+            for stat, array in zip(self.AGG_STATS, stats):
+                result['{}_{}_{}'.format(df_name, col, stat)] = array
+
+        # copy=False : les colonnes calculées sont reprises telles quelles (pas de consolidation)
+        return pd.DataFrame(result, index=index, copy=False)
+
     # 2. Transformations sur les tables secondaires
     def process_bureau(self, bureau, bureau_balance):
         """Agrégations bureau + bureau_balance (Kaggle, simplifié)"""
@@ -63,20 +322,87 @@ class FeatureEngineer:
             return self.aggregate_numeric(credit, "SK_ID_CURR", "cc")
 
     # 3. MASTER METHOD
-    def merge_all(self, data_dict):
-        """Fusionne toutes les tables secondaires dans train/test"""
+    def merge_all(self, data_dict, n_jobs=None):
+        """
+        Fusionne toutes les tables secondaires dans train/test
+        - les cinq agrégations sont calculées en parallèle (n_jobs processus,
+          par défaut un par cœur disponible ; n_jobs=1 : séquentiel)
+        - les agrégats, indexés par SK_ID_CURR, sont joints en une passe à train
+          puis à test, chacun sur son index (sans copies successives)
+        """
         train = data_dict["train"]
         test  = data_dict["test"]
 
         with timer("Feature Engineering global"):
-            bureau_agg = self.process_bureau(data_dict["bureau"], data_dict["bureau_balance"])
-            prev_agg   = self.process_previous(data_dict["previous"])
-            ins_agg    = self.process_installments(data_dict["installments"])
-            pos_agg    = self.process_pos(data_dict["pos"])
-            cc_agg     = self.process_credit(data_dict["credit"])
+            aggregates = self._compute_aggregates(data_dict, n_jobs)
+            return self.merge_aggregates(train, test, aggregates)
+
+    def merge_aggregates(self, train, test, aggregates):
+        """
+        Jointure d'agrégats indexés par SK_ID_CURR à train et test.
+        Chaque agrégat est joint sur son propre index (comme les merges successifs) :
+        ses colonnes entières ne passent en float que si un client du jeu y est absent.
+        """
+        return self._join_aggregates(train, aggregates), self._join_aggregates(test, aggregates)
 
-            for agg in [bureau_agg, prev_agg, ins_agg, pos_agg, cc_agg]:
-                train = train.merge(agg, on="SK_ID_CURR", how="left")
-                test  = test.merge(agg,  on="SK_ID_CURR", how="left")
+    def _compute_aggregates(self, data_dict, n_jobs=None):
+        """Agrégats des tables secondaires, dans l'ordre de AGGREGATION_JOBS"""
+        global _shared_tables
+
+        n_jobs = min(n_jobs or os.cpu_count() or 1, len(AGGREGATION_JOBS))
+        if n_jobs == 1:
+            _shared_tables = data_dict
+            try:
+                return [_run_aggregation(self, name)[0] for name in AGGREGATION_JOBS]
+            finally:
+                _shared_tables = None
+
+        # fork : les processus héritent des tables sans sérialisation.
+        # Sans fork (Windows, macOS), des threads partagent la mémoire : les
+        # réductions NumPy libèrent le GIL
+        if "fork" in multiprocessing.get_all_start_methods() and sys.platform != "darwin":
+            pool = ProcessPoolExecutor(
+                max_workers=n_jobs,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_aggregation_worker,
+            )
+        else:
+            pool = ThreadPoolExecutor(max_workers=n_jobs)
+
+        _shared_tables = data_dict
+        try:
+            with pool:
+                futures = {name: pool.submit(_run_aggregation, self, name) for name in AGGREGATION_JOBS}
+                results = {name: future.result() for name, future in futures.items()}
+        finally:
+            _shared_tables = None
+
+        for name, (_, seconds) in results.items():
+            print(f"[--] Agrégation {name} : {seconds:.2f} sec")
+        return [aggregate for aggregate, _ in results.values()]
+
+    @staticmethod
+    def _join_aggregates(df, aggregates):
+        """
+        Jointure à gauche des agrégats sur SK_ID_CURR, colonne par colonne : les positions
+        des clients sont calculées une fois par agrégat, puis chaque colonne est extraite
+        par take. Pas de table intermédiaire comme avec merge/join, ni de consolidation.
+        Même résultat que des merge(how="left") successifs : ordre des lignes, index
+        réinitialisé, NaN (et entiers convertis en float) pour les clients absents d'un agrégat.
+        """
+        keys = df["SK_ID_CURR"].to_numpy()
+        base = df.reset_index(drop=True)
+        columns = {col: base[col] for col in base.columns}
+        for agg in aggregates:
+            positions = agg.index.get_indexer(keys)
+            missing = positions < 0
+            has_missing = missing.any()
+            for col in agg.columns:
+                values = agg[col].to_numpy().take(positions)
+                if has_missing:
+                    if values.dtype.kind in "iu":
+                        values = values.astype(np.float64)
+                    values[missing] = np.nan
+                columns[col] = values
 
-        return train, test
+        return pd.DataFrame(columns, copy=False)
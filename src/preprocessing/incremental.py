@@ -0,0 +1,287 @@
+# src/preprocessing/incremental.py
+import numpy as np
+import pandas as pd
+
+from src.preprocessing.feature_engineering import (
+    FeatureEngineer,
+    finalize_groups,
+    numeric_columns,
+    reduce_groups,
+    sorted_groups,
+)
+from src.utils.timer import timer
+
+# Tables secondaires agrégées directement par client : nom -> préfixe des colonnes
+# (mêmes préfixes que FeatureEngineer.process_*)
+CLIENT_TABLES = {
+    "previous": "prev",
+    "installments": "ins",
+    "pos": "pos",
+    "credit": "cc",
+}
+
+
+class PartialAggregate:
+    """
+    État partiel fusionnable d'une table agrégée par aggregate_numeric :
+    pour chaque clé et chaque colonne numérique, (count, sum, min, max).
+    Un delta (lignes ajoutées) est réduit par clé puis combiné à l'état des seules
+    clés concernées ; les statistiques finales (mean, min, max, sum) sont dérivées
+    à la demande, avec les mêmes formules et les mêmes types que aggregate_numeric.
+    Les clés connues sont gardées dans un dictionnaire clé -> position (et un tableau
+    de clés à capacité doublée) : une mise à jour coûte O(taille du delta), pas
+    O(nombre de clés). count/min/max et les sommes entières sont exacts ; les sommes
+    (et moyennes) de colonnes décimales, accumulées en float64 dans un autre ordre
+    d'addition, égalent celles d'un recalcul complet à l'arrondi près (~1e-12 relatif).
+    """
+
+    def __init__(self, group_var: str, df_name: str):
+        self.group_var = group_var
+        self.df_name = df_name
+        self.columns = None
+        self.dtypes = {}
+        self.positions = {}
+        self.keys = np.zeros(0)
+        self.state = {}
+        self.size = 0
+
+    def _grow(self, size: int):
+        """Agrandit les tableaux d'état (capacité doublée : ajouts en temps amorti constant)"""
+        if size > len(self.keys):
+            grown = np.empty(max(size, 2 * len(self.keys)), dtype=self.keys.dtype)
+            grown[:self.size] = self.keys[:self.size]
+            self.keys = grown
+        for col, arrays in self.state.items():
+            capacity = len(arrays[0])
+            if size <= capacity:
+                continue
+            capacity = max(size, 2 * capacity)
+            for i, array in enumerate(arrays):
+                grown = np.empty(capacity, dtype=array.dtype)
+                grown[:self.size] = array[:self.size]
+                arrays[i] = grown
+
+    def _promote(self, col: str, dtype: np.dtype):
+        """
+        Élargit l'état d'une colonne au type commun avec un delta (int32 puis int64,
+        entiers puis flottants avec NaN...) : même type que sur la table complète
+        """
+        arrays = self.state.get(col)
+        if arrays is not None:
+            accumulator = {"f": np.float64, "u": np.uint64}.get(dtype.kind, np.int64)
+            arrays[1] = arrays[1].astype(accumulator, copy=False)
+            arrays[2] = arrays[2].astype(dtype, copy=False)
+            arrays[3] = arrays[3].astype(dtype, copy=False)
+        self.dtypes[col] = dtype
+
+    def _lookup(self, keys: np.ndarray) -> np.ndarray:
+        """Position de chaque clé dans l'état (-1 : clé inconnue)"""
+        get = self.positions.get
+        return np.fromiter((get(key, -1) for key in keys.tolist()), dtype=np.int64, count=len(keys))
+
+    def update(self, delta: pd.DataFrame) -> np.ndarray:
+        """Intègre des lignes ajoutées ; renvoie les clés mises à jour"""
+        columns = numeric_columns(delta, self.group_var)
+        if self.columns is None:
+            self.columns = columns
+            self.dtypes = {col: delta[col].dtype for col in columns}
+        elif columns != self.columns:
+            raise ValueError(
+                f"Colonnes du delta différentes de celles de l'état {self.df_name} : {columns}"
+            )
+
+        rows, starts, keys = sorted_groups(delta[self.group_var].to_numpy())
+        if self.size == 0:
+            self.keys = np.zeros(0, dtype=keys.dtype)
+        elif keys.dtype != self.keys.dtype:
+            self.keys = self.keys.astype(np.result_type(self.keys.dtype, keys.dtype))
+        positions = self._lookup(keys)
+        known = positions >= 0
+        new_keys = keys[~known]
+        old_positions = positions[known]
+        new_positions = np.arange(self.size, self.size + len(new_keys))
+        self._grow(self.size + len(new_keys))
+
+        for col in self.columns:
+            values = delta[col].to_numpy()
+            if rows is not None:
+                values = np.take(values, rows)
+            # Type commun à l'état et au delta, comme pd.concat sur l'historique complet
+            dtype = np.result_type(self.dtypes[col], values.dtype)
+            if dtype != self.dtypes[col]:
+                self._promote(col, dtype)
+            values = values.astype(dtype, copy=False)
+            counts, total, minimum, maximum = reduce_groups(values, starts)
+
+            if col not in self.state:
+                self.state[col] = [counts, total, minimum, maximum]
+                continue
+
+            state_counts, state_total, state_min, state_max = self.state[col]
+            state_counts[old_positions] += counts[known]
+            state_total[old_positions] += total[known]
+            if values.dtype.kind == "f":
+                state_min[old_positions] = np.fmin(state_min[old_positions], minimum[known])
+                state_max[old_positions] = np.fmax(state_max[old_positions], maximum[known])
+            else:
+                state_min[old_positions] = np.minimum(state_min[old_positions], minimum[known])
+                state_max[old_positions] = np.maximum(state_max[old_positions], maximum[known])
+
+            for array, partial in zip(self.state[col], (counts, total, minimum, maximum)):
+                array[new_positions] = partial[~known]
+
+        self.keys[new_positions] = new_keys
+        self.positions.update(zip(new_keys.tolist(), new_positions.tolist()))
+        self.size += len(new_keys)
+        return keys
+
+    def frame(self, keys=None) -> pd.DataFrame:
+        """
+        Statistiques finales, au format de aggregate_numeric (clés triées).
+        Avec keys, seules ces clés (si elles sont connues) sont renvoyées.
+        """
+        if keys is None:
+            positions = np.arange(self.size)
+        else:
+            positions = self._lookup(np.unique(np.asarray(keys)))
+            positions = positions[positions >= 0]
+        key_values = self.keys[positions]
+        order = np.argsort(key_values, kind="stable")
+        positions = positions[order]
+
+        result = {}
+        for col in self.columns or []:
+            partial = [array[positions] for array in self.state[col]]
+            stats = finalize_groups(self.dtypes[col], *partial)
+            for stat, array in zip(FeatureEngineer.AGG_STATS, stats):
+                result['{}_{}_{}'.format(self.df_name, col, stat)] = array
+
+        return pd.DataFrame(result, index=pd.Index(key_values[order], name=self.group_var), copy=False)
+
+
+class BureauRows:
+    """
+    Lignes bureau, conservées par lots ajoutés (pas de copie de l'historique à chaque delta).
+    Chaque lot est indexé par SK_ID_CURR et SK_ID_BUREAU (clés triées + ordre des lignes) :
+    une sélection ne lit que les lignes des clés demandées, par recherche dichotomique.
+    """
+
+    KEYS = ("SK_ID_CURR", "SK_ID_BUREAU")
+
+    def __init__(self):
+        self.chunks = []
+
+    def append(self, rows: pd.DataFrame):
+        rows = rows.reset_index(drop=True)
+        index = {}
+        for key in self.KEYS:
+            values = rows[key].to_numpy()
+            order = np.argsort(values, kind="stable")
+            index[key] = (values[order], order)
+        self.chunks.append((rows, index))
+
+    def select(self, key: str, values) -> pd.DataFrame:
+        """Lignes dont la colonne key est dans values, dans l'ordre de la table complète"""
+        values = np.unique(np.asarray(values))
+        parts = []
+        for rows, index in self.chunks:
+            sorted_keys, order = index[key]
+            start = np.searchsorted(sorted_keys, values, side="left")
+            lengths = np.searchsorted(sorted_keys, values, side="right") - start
+            # Positions (dans l'ordre trié) de chaque plage [start, start + length)
+            offsets = np.repeat(start - (np.cumsum(lengths) - lengths), lengths)
+            positions = offsets + np.arange(lengths.sum())
+            if len(positions):
+                parts.append(rows.take(np.sort(order[positions])))
+        if not parts:
+            return self.chunks[0][0].iloc[:0]
+        return pd.concat(parts, ignore_index=True)
+
+
+class IncrementalFeatureStore:
+    """
+    Agrégats des tables secondaires mis à jour par deltas (lignes ajoutées) :
+    - previous, installments, POS, carte de crédit : état partiel par SK_ID_CURR,
+      seuls les clients présents dans le delta sont mis à jour
+    - bureau_balance : état partiel par SK_ID_BUREAU
+    - bureau : ses lignes portent les agrégats bureau_balance, qui changent quand
+      l'historique d'un crédit s'allonge ; les agrégats bureau des seuls clients
+      concernés (nouvelles lignes bureau ou bureau_balance) sont recalculés, à partir
+      de leurs seules lignes (BureauRows)
+    Le résultat est celui de FeatureEngineer.merge_all sur tout l'historique (sommes et
+    moyennes de montants décimaux à l'arrondi flottant près, voir PartialAggregate).
+    """
+
+    def __init__(self, engineer: FeatureEngineer = None):
+        self.engineer = engineer or FeatureEngineer()
+        self.tables = {
+            name: PartialAggregate("SK_ID_CURR", prefix) for name, prefix in CLIENT_TABLES.items()
+        }
+        self.bureau_balance = PartialAggregate("SK_ID_BUREAU", "bb")
+        self.bureau = BureauRows()
+        self.bureau_agg = None
+
+    def update(self, deltas: dict) -> np.ndarray:
+        """
+        Intègre les nouvelles lignes des tables secondaires
+        (dictionnaire au format de load_all_data, tables absentes = pas de nouvelles lignes).
+        Le premier appel, avec tout l'historique, construit le store.
+        Renvoie les SK_ID_CURR dont les agrégats ont changé.
+        """
+        with timer("Mise à jour incrémentale des agrégats"):
+            affected = [
+                self.tables[name].update(deltas[name]) for name in CLIENT_TABLES if name in deltas
+            ]
+            affected.append(self._update_bureau(deltas.get("bureau"), deltas.get("bureau_balance")))
+            return np.unique(np.concatenate(affected))
+
+    def _update_bureau(self, new_bureau, new_balance) -> np.ndarray:
+        """Met à jour bureau_balance puis recalcule les agrégats bureau des clients concernés"""
+        touched_bureaus = np.zeros(0, dtype=np.int64)
+        if new_balance is not None:
+            touched_bureaus = self.bureau_balance.update(new_balance)
+        if new_bureau is not None:
+            # Lignes ajoutées à la suite : l'ordre des lignes est celui de la table complète
+            self.bureau.append(new_bureau)
+        if not self.bureau.chunks:
+            return np.zeros(0, dtype=np.int64)
+
+        customers = [self.bureau.select("SK_ID_BUREAU", touched_bureaus)["SK_ID_CURR"].to_numpy()]
+        if new_bureau is not None:
+            customers.append(new_bureau["SK_ID_CURR"].to_numpy())
+        customers = pd.unique(np.concatenate(customers))
+        if len(customers) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        rows = self.bureau.select("SK_ID_CURR", customers)
+        balance_agg = self.bureau_balance.frame(rows["SK_ID_BUREAU"].unique())
+        rows = rows.merge(balance_agg, on="SK_ID_BUREAU", how="left")
+        agg = self.engineer.aggregate_numeric(rows, group_var="SK_ID_CURR", df_name="bureau")
+
+        if self.bureau_agg is None:
+            self.bureau_agg = agg
+        else:
+            kept = self.bureau_agg.drop(index=agg.index, errors="ignore")
+            # Un crédit sans historique bureau_balance passe ses agrégats en float
+            # (NaN après le merge) : même type que sur la table complète
+            dtypes = {col: np.result_type(kept[col].dtype, agg[col].dtype) for col in agg.columns}
+            self.bureau_agg = pd.concat([kept.astype(dtypes, copy=False), agg.astype(dtypes, copy=False)])
+        return agg.index.to_numpy()
+
+    def aggregates(self) -> list:
+        """Agrégats de toutes les tables, dans l'ordre de FeatureEngineer.merge_all"""
+        bureau_agg = self.bureau_agg.sort_index() if self.bureau_agg is not None else pd.DataFrame()
+        return [bureau_agg] + [self.tables[name].frame() for name in CLIENT_TABLES]
+
+    def merge(self, train: pd.DataFrame, test: pd.DataFrame):
+        """Jointure des agrégats à train et test (même résultat que merge_all)"""
+        return self.engineer.merge_aggregates(train, test, self.aggregates())
+
+    def save(self, path: str):
+        import joblib
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path: str) -> "IncrementalFeatureStore":
+        import joblib
+        return joblib.load(path)
@@ -1,8 +1,240 @@
+import os
+
 import pandas as pd
 import numpy as np
 
+from src.config.config import config
 from src.utils.timer import timer
 
+# Valeur sentinelle des colonnes DAYS_* (remplacée par NaN) et modalité des catégories manquantes
+SENTINEL = 365243
+MISSING_CATEGORY = "Unknown"
+
+# Plan de transformation sauvegardé à côté du modèle
+DEFAULT_PLAN_PATH = os.path.join(config.MODELS_DIR, "preprocessing_plan.pkl")
+
+
+def is_encoded(series: pd.Series) -> bool:
+    """Colonne encodée par pd.get_dummies (texte ou catégorie)"""
+    return pd.api.types.is_object_dtype(series) or isinstance(series.dtype, (pd.CategoricalDtype, pd.StringDtype))
+
+
+def column_kind(series: pd.Series) -> str:
+    """"number" (imputée par la moyenne), "encoded" (one-hot) ou "other" (recopiée, ex. booléens)"""
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return "number"
+    return "encoded" if is_encoded(series) else "other"
+
+
+class FitStatistics:
+    """
+    État fusionnable de l'apprentissage du Preprocessor, accumulé morceau par morceau
+    (morceaux nettoyés par basic_cleaning, sans suppression des colonnes vides) :
+    - nature de chaque colonne, déterminée par les morceaux où elle a des valeurs
+      (un morceau entièrement vide d'une colonne texte est lu en float par read_csv)
+    - effectif et somme des valeurs non manquantes des colonnes numériques
+    - modalités rencontrées des colonnes encodées, et présence de valeurs manquantes
+    Deux états calculés sur des morceaux différents se combinent avec merge.
+    """
+
+    def __init__(self):
+        self.columns = []
+        self.kinds = {}
+        self.counts = {}
+        self.sums = {}
+        self.vocabularies = {}
+        self.missing = {}
+
+    def _add_column(self, col):
+        if col not in self.counts:
+            self.columns.append(col)
+            self.counts[col] = 0
+            self.sums[col] = 0
+            self.missing[col] = False
+
+    def _set_kind(self, col, kind):
+        known = self.kinds.setdefault(col, kind)
+        if known != kind:
+            raise ValueError(f"Colonne {col} de types incompatibles entre morceaux : {known} et {kind}")
+
+    def update(self, chunk: pd.DataFrame):
+        """Intègre un morceau nettoyé"""
+        for col in chunk.columns:
+            self._add_column(col)
+            series = chunk[col]
+            count = int(series.count())
+            self.missing[col] |= count < len(series)
+            if count == 0:
+                continue
+            kind = column_kind(series)
+            self._set_kind(col, kind)
+            self.counts[col] += count
+            if kind == "number":
+                # Somme exacte pour les entiers (int64), en float64 sinon
+                dtype = np.int64 if pd.api.types.is_integer_dtype(series) else np.float64
+                # (NaN comptés 0, comme le calcul de la moyenne par pandas)
+                self.sums[col] += series.to_numpy(dtype=dtype, na_value=0).sum()
+            elif kind == "encoded":
+                self.vocabularies.setdefault(col, {}).update(dict.fromkeys(series.dropna().unique()))
+
+    def merge(self, other: "FitStatistics") -> "FitStatistics":
+        """Combine l'état d'autres morceaux (placés après ceux-ci)"""
+        for col in other.columns:
+            self._add_column(col)
+            self.counts[col] += other.counts[col]
+            self.sums[col] += other.sums[col]
+            self.missing[col] |= other.missing[col]
+            if col in other.kinds:
+                self._set_kind(col, other.kinds[col])
+            if col in other.vocabularies:
+                self.vocabularies.setdefault(col, {}).update(other.vocabularies[col])
+        return self
+
+    def kept_columns(self) -> list:
+        """Colonnes ayant au moins une valeur (les colonnes 100% NaN sont supprimées)"""
+        return [col for col in self.columns if self.counts[col] > 0]
+
+    def vocabularies_after_imputation(self) -> dict:
+        """Modalités des colonnes encodées, avec MISSING_CATEGORY si des valeurs manquaient"""
+        vocabularies = {}
+        for col in self.kept_columns():
+            if self.kinds[col] != "encoded":
+                continue
+            values = list(self.vocabularies[col])
+            if self.missing[col] and MISSING_CATEGORY not in self.vocabularies[col]:
+                values.append(MISSING_CATEGORY)
+            vocabularies[col] = values
+        return vocabularies
+
+
+class TransformPlan:
+    """
+    Transformation apprise par Preprocessor.fit, compilée en tableaux :
+    - colonnes recopiées : position de sortie et valeur d'imputation (NaN et sentinelle remplacés)
+    - colonnes catégorielles : modalité -> position de la colonne one-hot
+      (première modalité retirée par drop_first et modalités inconnues : aucune colonne à 1)
+    - ordre final des colonnes
+    La transformation ne dépend que de l'entraînement, pas du lot transformé :
+    une colonne entièrement vide est imputée, une modalité garde sa colonne même seule.
+    Une colonne absente de l'entrée donne 0, comme le réalignement sur final_columns.
+    """
+
+    def __init__(self, columns: list, numeric: list, numeric_positions, fill_values, categories: dict):
+        self.columns = list(columns)
+        self.numeric = list(numeric)
+        self.numeric_positions = np.asarray(numeric_positions, dtype=np.intp)
+        self.fill_values = np.asarray(fill_values, dtype=np.float64)
+        # colonne -> (modalités, positions de sortie, -1 pour aucune colonne)
+        self.categories = categories
+
+        # get_dummies place les colonnes recopiées en tête : écriture par tranche plutôt
+        # que par indexation avancée (dispersion colonne par colonne, bien plus lente)
+        start = int(self.numeric_positions[0]) if len(self.numeric) else 0
+        contiguous = np.array_equal(self.numeric_positions, np.arange(start, start + len(self.numeric)))
+        self._numeric_slice = slice(start, start + len(self.numeric)) if contiguous else None
+
+        # Mêmes informations en structures Python pour la transformation d'un seul enregistrement
+        self._record_numeric = list(zip(self.numeric, self.numeric_positions.tolist(), self.fill_values.tolist()))
+        self._record_categories = {
+            col: {value: position for value, position in zip(values, positions.tolist()) if position >= 0}
+            for col, (values, positions) in categories.items()
+        }
+
+    @classmethod
+    def compile(cls, final_columns: list, imputation_values: dict, vocabularies: dict) -> "TransformPlan":
+        """
+        Plan équivalent à get_dummies(drop_first=True) réaligné sur final_columns,
+        à partir des modalités (après imputation) de chaque colonne encodée
+        """
+        position = {col: i for i, col in enumerate(final_columns)}
+        numeric = [col for col in final_columns if col in imputation_values and col not in vocabularies]
+        fill_values = []
+        for col in numeric:
+            value = imputation_values[col]
+            fill_values.append(value if isinstance(value, (int, float, np.number)) else np.nan)
+
+        categories = {}
+        for col, values in vocabularies.items():
+            values = pd.Index(values, dtype=object)
+            positions = np.array([position.get(f"{col}_{value}", -1) for value in values], dtype=np.intp)
+            categories[col] = (values, positions)
+
+        return cls(final_columns, numeric, [position[col] for col in numeric], fill_values, categories)
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Transformation vectorisée d'un DataFrame : une seule matrice float64 remplie en place"""
+        out = np.zeros((len(df), len(self.columns)), dtype=np.float64)
+
+        present = np.array([col in df.columns for col in self.numeric], dtype=bool)
+        if present.all() and self._numeric_slice is not None:
+            values = out[:, self._numeric_slice]
+            values[...] = df[self.numeric].to_numpy(dtype=np.float64)
+            self._fill_missing(values, self.fill_values)
+        elif present.any():
+            values = df[[col for col, keep in zip(self.numeric, present) if keep]].to_numpy(dtype=np.float64)
+            self._fill_missing(values, self.fill_values[present])
+            out[:, self.numeric_positions[present]] = values
+
+        for col, (categories, positions) in self.categories.items():
+            if col not in df.columns:
+                continue
+            values = df[col].to_numpy(dtype=object)
+            codes = categories.get_indexer(values)
+            missing = pd.isna(values) | (values == SENTINEL)
+            codes[missing] = categories.get_indexer([MISSING_CATEGORY])[0]
+            # Modalité inconnue (code -1) : dernière entrée, aucune colonne
+            target = np.append(positions, -1)[codes]
+            rows = np.flatnonzero(target >= 0)
+            out[rows, target[rows]] = 1.0
+
+        return pd.DataFrame(out, index=df.index, columns=self.columns, copy=False)
+
+    @staticmethod
+    def _fill_missing(values: np.ndarray, fill_values: np.ndarray):
+        """Sentinelle et NaN remplacés en place par la valeur d'imputation de leur colonne"""
+        values[values == SENTINEL] = np.nan
+        np.copyto(values, fill_values, where=np.isnan(values))
+
+    def transform_record(self, record: dict, out: np.ndarray = None) -> np.ndarray:
+        """
+        Transformation d'un seul enregistrement (dictionnaire colonne -> valeur),
+        écrite dans la ligne out (préallouée, len(columns) float64) si elle est fournie.
+        Même résultat que transform sur un DataFrame d'une ligne.
+        """
+        if out is None:
+            out = np.zeros(len(self.columns), dtype=np.float64)
+        else:
+            out.fill(0.0)
+
+        for col, position, fill in self._record_numeric:
+            if col not in record:
+                continue
+            value = record[col]
+            if value is None or value != value or value == SENTINEL:
+                value = fill
+            out[position] = value
+
+        for col, mapping in self._record_categories.items():
+            if col not in record:
+                continue
+            value = record[col]
+            if value is None or value != value or value == SENTINEL:
+                value = MISSING_CATEGORY
+            position = mapping.get(value)
+            if position is not None:
+                out[position] = 1.0
+        return out
+
+    def save(self, path: str = DEFAULT_PLAN_PATH):
+        import joblib
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path: str = DEFAULT_PLAN_PATH) -> "TransformPlan":
+        import joblib
+        return joblib.load(path)
+
+
 class Preprocessor:
     """
     Nettoyage et préprocessing des données.
@@ -16,17 +248,25 @@ class Preprocessor:
         self.categorical_features = None
         self.imputation_values = {}
         self.final_columns = []
+        self.plan = None
 
     # 1. Nettoyage général
-    def basic_cleaning(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Nettoyage de base :"""
+    def basic_cleaning(self, df: pd.DataFrame, drop_empty: bool = True) -> pd.DataFrame:
+        """Nettoyage de base (drop_empty=False : colonnes vides gardées, pour un morceau du jeu) :"""
         df = df.copy()
 
+        # Colonnes "category" (cache Parquet du data_loader) : repassées en texte
+        # pour que l'imputation et le one-hot encoding restent identiques
+        category_cols = df.select_dtypes(include="category").columns
+        if len(category_cols):
+            df[category_cols] = df[category_cols].astype(object)
+
         # Remplacements de valeurs
-        df.replace({365243: np.nan}, inplace=True)
+        df.replace({SENTINEL: np.nan}, inplace=True)
 
         # Suppression des colonnes 100% NaN
-        df.dropna(axis=1, how="all", inplace=True)
+        if drop_empty:
+            df.dropna(axis=1, how="all", inplace=True)
 
         return df
 
@@ -35,6 +275,7 @@ class Preprocessor:
         Apprend les transformations à partir du jeu de données d'entraînement.
         - Calcule les moyennes pour l'imputation.
         - Détermine la liste finale des colonnes après one-hot encoding.
+        - Compile le plan de transformation (TransformPlan).
         """
         with timer("Fitting Preprocessor"):
             df_clean = self.basic_cleaning(df)
@@ -45,27 +286,60 @@ class Preprocessor:
             for col in self.numeric_features:
                 self.imputation_values[col] = df_clean[col].mean()
             for col in self.categorical_features:
-                self.imputation_values[col] = "Unknown"
+                self.imputation_values[col] = MISSING_CATEGORY
 
             # Apprendre les colonnes du one-hot encoding en simulant une transformation
             df_imputed = self._impute(df_clean)
             df_ohe = pd.get_dummies(df_imputed, drop_first=True)
             self.final_columns = df_ohe.columns.tolist()
+            vocabularies = {col: df_imputed[col].unique() for col in df_imputed.columns if is_encoded(df_imputed[col])}
+            self.plan = TransformPlan.compile(self.final_columns, self.imputation_values, vocabularies)
+
+    def fit_chunks(self, chunks):
+        """
+        Même apprentissage que fit, sur un itérateur de DataFrame (morceaux de lignes,
+        ex. read_csv(chunksize=...)) : seul un morceau et l'état FitStatistics
+        (sommes, effectifs et modalités par colonne) sont en mémoire.
+        """
+        with timer("Fitting Preprocessor (par morceaux)"):
+            stats = FitStatistics()
+            for chunk in chunks:
+                stats.update(self.basic_cleaning(chunk, drop_empty=False))
+            self.fit_statistics(stats)
+
+    def fit_statistics(self, stats: "FitStatistics"):
+        """Termine l'apprentissage à partir d'un état FitStatistics (éventuellement fusionné)"""
+        columns = stats.kept_columns()
+        self.numeric_features = [col for col in columns if stats.kinds[col] == "number"]
+        self.categorical_features = [col for col in columns if stats.kinds[col] != "number"]
+
+        self.imputation_values = {}
+        for col in self.numeric_features:
+            self.imputation_values[col] = stats.sums[col] / stats.counts[col]
+        for col in self.categorical_features:
+            self.imputation_values[col] = MISSING_CATEGORY
+
+        # Colonnes du one-hot encoding : celles de get_dummies sur le vocabulaire de chaque colonne
+        vocabularies = stats.vocabularies_after_imputation()
+        self.final_columns = [col for col in columns if col not in vocabularies]
+        for col, values in vocabularies.items():
+            dummies = pd.get_dummies(pd.DataFrame({col: pd.Series(values, dtype=object)}), drop_first=True)
+            self.final_columns.extend(dummies.columns)
+        self.plan = TransformPlan.compile(self.final_columns, self.imputation_values, vocabularies)
 
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Applique les transformations apprises au jeu de données."""
+        """Applique les transformations apprises au jeu de données (plan compilé, sortie float64)."""
         with timer("Transforming data"):
-            df_clean = self.basic_cleaning(df)
-            df_imputed = self._impute(df_clean)
-            df_ohe = pd.get_dummies(df_imputed, drop_first=True)
+            return self.plan.transform(df)
 
-            # Aligner les colonnes avec celles du jeu d'entraînement
-            missing_cols = set(self.final_columns) - set(df_ohe.columns)
-            for c in missing_cols:
-                df_ohe[c] = 0
+    def transform_chunks(self, chunks):
+        """Générateur : transforme les morceaux un par un (mémoire bornée par la taille d'un morceau)"""
+        for chunk in chunks:
+            yield self.plan.transform(chunk)
 
-            # S'assurer que l'ordre et le nombre de colonnes sont identiques
-            return df_ohe[self.final_columns]
+    def transform_record(self, record: dict, out: np.ndarray = None) -> np.ndarray:
+        """Transforme un seul enregistrement (chemin de service), voir TransformPlan.transform_record."""
+        return self.plan.transform_record(record, out)
 
     def _impute(self, df: pd.DataFrame) -> pd.DataFrame:
         """Imputation interne utilisant les valeurs stockées."""
@@ -0,0 +1,235 @@
+# src/scoring_batch.py
+"""
+Scoring hors ligne d'un fichier complet (CSV ou Parquet) avec le modèle et le seuil persistés.
+
+Le fichier d'entrée est une table de features déjà calculées (merge_all puis Preprocessor) :
+SK_ID_CURR et les colonnes du modèle, au même format que l'entrée du feature store.
+Un fichier brut (application_test.csv) est refusé avant tout scoring.
+
+- lecture en flux par blocs de taille fixe (mémoire bornée)
+- scoring des blocs en parallèle dans un pool de processus (modèle chargé une fois par processus)
+- SHAP optionnel
+- écriture incrémentale : un fichier Parquet par bloc (part-000000.parquet, ...)
+- reprise après crash : les blocs déjà écrits sont ignorés à la relance
+
+Usage :
+    python -m src.scoring_batch data/features.parquet data/scores --chunksize 100000 --workers 4 --shap
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+import pandas as pd
+
+from src.api.cache import file_digest
+from src.api.registry import DEFAULT_MODEL_PATH, DEFAULT_THRESHOLD_PATH, load_bundle
+from src.api.schemas import ClientData
+from src.data_loader import iter_chunks
+
+# Même ordre de colonnes que l'API (le modèle est positionnel)
+FEATURE_NAMES = list(ClientData.model_fields)
+
+MANIFEST = "_manifest.json"
+SUCCESS = "_SUCCESS"
+
+# Bundle chargé dans chaque processus du pool
+_bundle = None
+_num_threads = 0
+
+
+def _init_worker(model_path: str, threshold_path: str, with_shap: bool, num_threads: int):
+    """Initialisation d'un processus du pool : chargement unique du modèle"""
+    global _bundle, _num_threads
+    _bundle = load_bundle(model_path, threshold_path, with_explainer=with_shap)
+    _num_threads = num_threads
+
+
+def score_chunk(X: np.ndarray, ids, bundle, num_threads: int = 0) -> pd.DataFrame:
+    """
+    Score un bloc : probabilité de défaut, décision et, si le bundle a un
+    explainer, valeurs SHAP de la classe 1 par feature.
+    """
+    probabilities = bundle.booster.predict(X, num_threads=num_threads)
+    result = pd.DataFrame({
+        "probability_default": probabilities,
+        "prediction": (probabilities >= bundle.threshold).astype(np.int8),
+        "threshold_used": bundle.threshold,
+        "model_version": bundle.version,
+    })
+    if ids is not None:
+        result.insert(0, ids.name, ids.to_numpy())
+
+    if bundle.explainer is not None:
+        shap_vals = bundle.explainer.shap_values(X)
+        if isinstance(shap_vals, list):
+            # On prend la classe 1 (Défaut)
+            shap_matrix, base_value = shap_vals[1], bundle.explainer.expected_value[1]
+        else:
+            shap_matrix, base_value = shap_vals, bundle.explainer.expected_value
+        for i, name in enumerate(FEATURE_NAMES):
+            result[f"shap_{name}"] = shap_matrix[:, i]
+        result["base_value"] = float(base_value)
+
+    return result
+
+
+def _part_path(output_dir: str, index: int) -> str:
+    return os.path.join(output_dir, f"part-{index:06d}.parquet")
+
+
+def _score_and_write(index: int, X: np.ndarray, ids, output_dir: str) -> int:
+    """Tâche exécutée dans le pool : score un bloc et l'écrit de façon atomique"""
+    result = score_chunk(X, ids, _bundle, _num_threads)
+    path = _part_path(output_dir, index)
+    tmp_path = path + ".tmp"
+    result.to_parquet(tmp_path, index=False)
+    # Renommage atomique : un bloc présent sur disque est forcément complet
+    os.replace(tmp_path, path)
+    return len(result)
+
+
+def check_input_columns(input_path: str):
+    """
+    Vérifie, sur l'en-tête seul, que le fichier d'entrée contient les features du modèle
+    """
+    if input_path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        available = set(pq.ParquetFile(input_path).schema_arrow.names)
+    else:
+        available = set(pd.read_csv(input_path, nrows=0).columns)
+    missing = [c for c in FEATURE_NAMES if c not in available]
+    if missing:
+        raise ValueError(
+            f"Colonnes manquantes dans le fichier d'entrée : {missing}. "
+            "Le scoring attend une table de features (merge_all puis Preprocessor), "
+            "pas un fichier brut comme application_test.csv"
+        )
+
+
+def _prepare_chunk(chunk: pd.DataFrame, id_column: str):
+    """Matrice des features (ordre FEATURE_NAMES) et identifiants d'un bloc"""
+    X = chunk[FEATURE_NAMES].to_numpy(dtype=np.float64)
+    ids = chunk[id_column].reset_index(drop=True) if id_column in chunk.columns else None
+    return X, ids
+
+
+def run_batch_scoring(
+    input_path: str,
+    output_dir: str,
+    chunksize: int = 100000,
+    workers: int = None,
+    with_shap: bool = False,
+    id_column: str = "SK_ID_CURR",
+    model_path: str = DEFAULT_MODEL_PATH,
+    threshold_path: str = DEFAULT_THRESHOLD_PATH,
+) -> dict:
+    """
+    Score tout le fichier d'entrée et écrit les résultats dans output_dir.
+    Relancée sur le même répertoire, la fonction reprend là où elle s'était arrêtée.
+    """
+    check_input_columns(input_path)
+    workers = workers or os.cpu_count()
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Manifeste : garantit qu'une reprise utilise les mêmes entrées et le même modèle
+    stat = os.stat(input_path)
+    manifest = {
+        "input": os.path.abspath(input_path),
+        "input_size": stat.st_size,
+        "input_mtime_ns": stat.st_mtime_ns,
+        "chunksize": chunksize,
+        "with_shap": with_shap,
+        "model_version": file_digest(model_path),
+        "threshold_version": file_digest(threshold_path),
+    }
+    manifest_path = os.path.join(output_dir, MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            previous = json.load(f)
+        if previous != manifest:
+            raise ValueError(
+                f"{output_dir} contient les résultats d'un autre scoring "
+                "(entrée, taille de bloc ou modèle différents) : choisissez un autre répertoire"
+            )
+    else:
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    # Un processus par cœur disponible : chaque booster n'utilise qu'une part des threads
+    num_threads = max(1, (os.cpu_count() or 1) // workers)
+    start = time.time()
+    scored_rows = 0
+    skipped_chunks = 0
+    total_chunks = 0
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(model_path, threshold_path, with_shap, num_threads),
+    ) as pool:
+        pending = set()
+        for index, chunk in enumerate(iter_chunks(input_path, chunksize, FEATURE_NAMES + [id_column])):
+            total_chunks += 1
+            if os.path.exists(_part_path(output_dir, index)):
+                # Bloc déjà écrit lors d'une exécution précédente
+                skipped_chunks += 1
+                continue
+
+            X, ids = _prepare_chunk(chunk, id_column)
+            del chunk
+
+            # Mémoire bornée : au plus 2 blocs en attente par processus
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                scored_rows += sum(future.result() for future in done)
+            pending.add(pool.submit(_score_and_write, index, X, ids, output_dir))
+
+        scored_rows += sum(future.result() for future in pending)
+
+    summary = {
+        "chunks": total_chunks,
+        "skipped_chunks": skipped_chunks,
+        "scored_rows": scored_rows,
+        "seconds": round(time.time() - start, 2),
+    }
+    with open(os.path.join(output_dir, SUCCESS), "w") as f:
+        json.dump(summary, f, indent=2)
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="Table de features à scorer (.csv ou .parquet)")
+    parser.add_argument("output_dir", help="Répertoire des résultats (fichiers Parquet par bloc)")
+    parser.add_argument("--chunksize", type=int, default=100000, help="Nombre de lignes par bloc")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut : nombre de cœurs)")
+    parser.add_argument("--shap", action="store_true", help="Calculer les valeurs SHAP")
+    parser.add_argument("--id-column", default="SK_ID_CURR", help="Colonne identifiant recopiée en sortie")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH, help="Modèle sérialisé")
+    parser.add_argument("--threshold", default=DEFAULT_THRESHOLD_PATH, help="Fichier du seuil de décision")
+    args = parser.parse_args()
+
+    print(f"Scoring de {args.input} -> {args.output_dir}")
+    summary = run_batch_scoring(
+        args.input,
+        args.output_dir,
+        chunksize=args.chunksize,
+        workers=args.workers,
+        with_shap=args.shap,
+        id_column=args.id_column,
+        model_path=args.model,
+        threshold_path=args.threshold,
+    )
+    print(
+        f"{summary['scored_rows']} lignes scorées en {summary['seconds']} sec "
+        f"({summary['chunks']} blocs, {summary['skipped_chunks']} déjà présents)"
+    )
+
+
+if __name__ == "__main__":
+    main()
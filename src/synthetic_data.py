@@ -0,0 +1,568 @@
+# src/synthetic_data.py
+"""
+Générateur déterministe d'un jeu Home Credit synthétique : les huit fichiers CSV
+attendus par load_all_data (src/data_loader.py), pour tester et mesurer le pipeline
+hors ligne sans les données Kaggle, à n'importe quelle échelle.
+
+- Schémas : colonnes, types (entiers, flottants, texte) et valeurs sentinelles
+  (365243 des colonnes DAYS_*) des tables d'origine ; l'application a ses 122 colonnes.
+- Volumétrie : scale=1 reproduit la taille du jeu Kaggle (PRODUCTION_ROWS,
+  356 255 clients et 58 millions de lignes au total), scale=10 dix fois plus.
+- Cardinalités et fan-out : part des clients sans historique et nombre moyen de
+  lignes par clé parent (FANOUT), pour chaque table secondaire ; les tables
+  mensuelles (POS, échéances, carte, bureau_balance) ont des MONTHS_BALANCE consécutifs.
+- Manquants : taux par colonne proches de ceux du jeu d'origine (EXT_SOURCE_1 56 %,
+  bloc logement ~50 %, OCCUPATION_TYPE 31 %...).
+- TARGET : ~8 % de défauts, dépendant des EXT_SOURCE et de l'âge (signal appris par le modèle).
+
+Les clients sont générés par blocs de chunk_clients, chacun avec son propre
+générateur aléatoire (graine [seed, bloc]) : mémoire bornée quelle que soit
+l'échelle, et mêmes fichiers pour mêmes (scale, seed, chunk_clients).
+
+Usage :
+    python -m src.synthetic_data --scale 0.1                 # dans data/synthetic/
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.config.config import config
+from src.data_loader import TABLES
+
+SENTINEL = 365243
+# Lignes par table du jeu Kaggle (scale=1)
+PRODUCTION_ROWS = {
+    "train": 307511,
+    "test": 48744,
+    "bureau": 1716428,
+    "bureau_balance": 27299925,
+    "previous": 1670214,
+    "pos": 10001358,
+    "installments": 13605401,
+    "credit": 3840312,
+}
+# Table -> (part des clés parents sans ligne, nombre moyen de lignes par parent qui en a)
+FANOUT = {
+    "bureau": (0.14, 5.6),           # par client
+    "bureau_balance": (0.52, 33.4),  # par crédit du bureau
+    "previous": (0.05, 4.93),        # par client
+    "pos": (0.44, 10.7),             # par demande précédente
+    "installments": (0.40, 13.6),
+    "credit": (0.94, 36.8),
+}
+MANIFEST = "synthetic.json"
+DEFAULT_OUTPUT_DIR = os.path.join(config.DATA_DIR, "synthetic")
+
+WEEKDAYS = ["MONDAY", "TUESDAY", "WEDNESDAY", "THURSDAY", "FRIDAY", "SATURDAY", "SUNDAY"]
+SUITES = ["Unaccompanied", "Family", "Spouse, partner", "Children", "Other_B", "Other_A", "Group of people"]
+OCCUPATIONS = [
+    "Laborers", "Sales staff", "Core staff", "Managers", "Drivers", "High skill tech staff", "Accountants",
+    "Medicine staff", "Security staff", "Cooking staff", "Cleaning staff", "Private service staff",
+    "Low-skill Laborers", "Waiters/barmen staff", "Secretaries", "Realty agents", "HR staff", "IT staff",
+]
+ORGANIZATIONS = [
+    "Business Entity Type 3", "Self-employed", "Other", "Medicine", "Business Entity Type 2", "Government",
+    "School", "Trade: type 7", "Kindergarten", "Construction", "Business Entity Type 1", "Transport: type 4",
+    "Trade: type 3", "Industry: type 9", "Industry: type 3", "Security", "Housing", "Industry: type 11",
+    "Military", "Bank", "Agriculture", "Police", "Transport: type 2", "Postal", "Security Ministries",
+    "Trade: type 2", "Restaurant", "Services", "University", "Industry: type 7", "Transport: type 3",
+    "Industry: type 1", "Hotel", "Electricity", "Industry: type 4", "Trade: type 6", "Industry: type 5",
+    "Insurance", "Telecom", "Emergency", "Industry: type 2", "Advertising", "Realtor", "Culture",
+    "Industry: type 12", "Trade: type 1", "Mobile", "Legal Services", "Cleaning", "Transport: type 1",
+    "Industry: type 6", "Industry: type 10", "Religion", "Industry: type 13", "Trade: type 4", "Trade: type 5",
+    "Industry: type 8",
+]
+# Colonnes du bloc logement (_AVG, _MODE, _MEDI), manquantes ensemble pour ~la moitié des clients
+HOUSING = [
+    "APARTMENTS", "BASEMENTAREA", "YEARS_BEGINEXPLUATATION", "YEARS_BUILD", "COMMONAREA", "ELEVATORS",
+    "ENTRANCES", "FLOORSMAX", "FLOORSMIN", "LANDAREA", "LIVINGAPARTMENTS", "LIVINGAREA",
+    "NONLIVINGAPARTMENTS", "NONLIVINGAREA",
+]
+CASH_LOAN_PURPOSES = [
+    "XAP", "XNA", "Repairs", "Other", "Urgent needs", "Buying a used car", "Building a house or an annex",
+    "Everyday expenses", "Medicine", "Payments on other loans", "Education", "Journey",
+    "Purchase of electronic equipment", "Buying a new car", "Wedding / gift / holiday", "Buying a home",
+    "Car repairs", "Furniture", "Buying a holiday home / land", "Business development",
+    "Gasification / water supply", "Buying a garage", "Hobby", "Money for a third person",
+    "Refusal to name the goal",
+]
+GOODS_CATEGORIES = [
+    "XNA", "Mobile", "Consumer Electronics", "Computers", "Audio/Video", "Furniture", "Photo / Cinema Equipment",
+    "Construction Materials", "Clothing and Accessories", "Auto Accessories", "Jewelry", "Homewares",
+    "Medical Supplies", "Vehicles", "Sport and Leisure", "Gardening", "Other", "Office Appliances", "Tourism",
+    "Medicine", "Direct Sales", "Fitness", "Additional Service", "Education", "Weapon", "Insurance",
+    "House Construction", "Animals",
+]
+PRODUCT_COMBINATIONS = [
+    "Cash", "POS household with interest", "POS mobile with interest", "Cash X-Sell: middle",
+    "Cash X-Sell: low", "Card Street", "POS industry with interest", "POS household without interest",
+    "Card X-Sell", "Cash Street: high", "Cash X-Sell: high", "Cash Street: middle", "Cash Street: low",
+    "POS mobile without interest", "POS other with interest", "POS industry without interest",
+    "POS others without interest",
+]
+CREDIT_TYPES = [
+    "Consumer credit", "Credit card", "Car loan", "Mortgage", "Microloan", "Loan for business development",
+    "Another type of loan", "Unknown type of loan", "Loan for working capital replenishment",
+    "Cash loan (non-earmarked)", "Real estate loan", "Loan for the purchase of equipment",
+    "Loan for purchase of shares (margin lending)", "Mobile operator loan", "Interbank credit",
+]
+
+
+# --- Tirages élémentaires ---
+
+def _choice(rng, n: int, values: list, head: list = ()) -> np.ndarray:
+    """
+    Modalités tirées avec les probabilités head pour les premières valeurs, le reste
+    de la masse réparti sur les suivantes en loi de Zipf (longue traîne des catégories rares)
+    """
+    weights = np.zeros(len(values))
+    weights[:len(head)] = head
+    tail = len(values) - len(head)
+    if tail:
+        zipf = 1.0 / np.arange(1, tail + 1) ** 1.2
+        weights[len(head):] = zipf / zipf.sum() * max(1.0 - sum(head), 0.0)
+    return rng.choice(np.array(values, dtype=object), size=n, p=weights / weights.sum())
+
+
+def _missing(rng, values: np.ndarray, rate: float, mask: np.ndarray = None) -> np.ndarray:
+    """Valeurs manquantes : proportion rate, ou lignes de mask (NaN, None pour le texte)"""
+    if mask is None:
+        mask = rng.random(len(values)) < rate
+    if values.dtype == object:
+        values = values.copy()
+        values[mask] = None
+    else:
+        values = values.astype(np.float64)
+        values[mask] = np.nan
+    return values
+
+
+def _amounts(rng, n: int, median: float, sigma: float = 0.6, step: float = 0.5) -> np.ndarray:
+    """Montants log-normaux, arrondis au pas step"""
+    return np.round(rng.lognormal(np.log(median), sigma, n) / step) * step
+
+
+def _fanout(rng, n_parents: int, table: str) -> np.ndarray:
+    """Nombre de lignes de table par clé parent (part sans ligne, puis 1 + binomiale négative)"""
+    zero_share, mean = FANOUT[table]
+    counts = 1 + rng.negative_binomial(2, 2 / (2 + mean - 1), n_parents)
+    counts[rng.random(n_parents) < zero_share] = 0
+    return counts
+
+
+def _positions(counts: np.ndarray) -> np.ndarray:
+    """Rang de chaque ligne dans son groupe (0, 1, ... counts[i] - 1)"""
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.arange(counts.sum()) - starts
+
+
+# --- Tables ---
+
+def _applications(rng, ids: np.ndarray) -> pd.DataFrame:
+    """Demandes de crédit (application_train sans TARGET), 121 colonnes"""
+    n = len(ids)
+    income_type = _choice(rng, n, ["Working", "Commercial associate", "Pensioner", "State servant", "Unemployed",
+                                   "Student", "Businessman", "Maternity leave"], [0.516, 0.233, 0.18, 0.0706])
+    pensioner = income_type == "Pensioner"
+    credit = _amounts(rng, n, 5.1e5, 0.65, 0.5)
+    goods = np.round(credit * rng.uniform(0.8, 1.0, n) / 4.5) * 4.5
+    days_birth = -rng.integers(7489, 25230, n)
+    days_employed = np.where(pensioner, SENTINEL, -np.minimum(rng.gamma(1.2, 2000, n).astype(np.int64) + 1,
+                                                               -days_birth - 5000))
+    children = np.minimum(rng.poisson(0.42, n), 19)
+    family_status = _choice(rng, n, ["Married", "Single / not married", "Civil marriage", "Separated", "Widow"],
+                            [0.639, 0.148, 0.097, 0.064, 0.052])
+    own_car = _choice(rng, n, ["N", "Y"], [0.66, 0.34])
+    region_rating = _choice(rng, n, [2, 3, 1], [0.738, 0.157, 0.105]).astype(np.int64)
+
+    df = pd.DataFrame({
+        "SK_ID_CURR": ids,
+        "NAME_CONTRACT_TYPE": _choice(rng, n, ["Cash loans", "Revolving loans"], [0.905, 0.095]),
+        "CODE_GENDER": _choice(rng, n, ["F", "M", "XNA"], [0.65834, 0.34165]),
+        "FLAG_OWN_CAR": own_car,
+        "FLAG_OWN_REALTY": _choice(rng, n, ["Y", "N"], [0.694, 0.306]),
+        "CNT_CHILDREN": children,
+        "AMT_INCOME_TOTAL": _amounts(rng, n, 1.47e5, 0.5, 4.5),
+        "AMT_CREDIT": credit,
+        "AMT_ANNUITY": _missing(rng, np.round(credit * rng.uniform(0.03, 0.09, n) / 4.5) * 4.5, 0.00004),
+        "AMT_GOODS_PRICE": _missing(rng, goods, 0.0009),
+        "NAME_TYPE_SUITE": _missing(rng, _choice(rng, n, SUITES, [0.81, 0.13, 0.037, 0.011]), 0.004),
+        "NAME_INCOME_TYPE": income_type,
+        "NAME_EDUCATION_TYPE": _choice(rng, n, ["Secondary / secondary special", "Higher education",
+                                                "Incomplete higher", "Lower secondary", "Academic degree"],
+                                       [0.71, 0.243, 0.033, 0.0124]),
+        "NAME_FAMILY_STATUS": family_status,
+        "NAME_HOUSING_TYPE": _choice(rng, n, ["House / apartment", "With parents", "Municipal apartment",
+                                              "Rented apartment", "Office apartment", "Co-op apartment"],
+                                     [0.887, 0.048, 0.036, 0.016, 0.0085]),
+        "REGION_POPULATION_RELATIVE": np.round(rng.beta(2, 80, n), 6),
+        "DAYS_BIRTH": days_birth,
+        "DAYS_EMPLOYED": days_employed,
+        "DAYS_REGISTRATION": -np.round(rng.uniform(0, 20000, n)),
+        "DAYS_ID_PUBLISH": -rng.integers(0, 7198, n),
+        "OWN_CAR_AGE": _missing(rng, rng.integers(0, 40, n), 0, mask=own_car == "N"),
+        "FLAG_MOBIL": np.ones(n, dtype=np.int64),
+        "FLAG_EMP_PHONE": (~pensioner).astype(np.int64),
+        "FLAG_WORK_PHONE": (rng.random(n) < 0.2).astype(np.int64),
+        "FLAG_CONT_MOBILE": (rng.random(n) < 0.998).astype(np.int64),
+        "FLAG_PHONE": (rng.random(n) < 0.28).astype(np.int64),
+        "FLAG_EMAIL": (rng.random(n) < 0.057).astype(np.int64),
+        "OCCUPATION_TYPE": _missing(rng, _choice(rng, n, OCCUPATIONS, [0.26, 0.152, 0.13, 0.1, 0.088]), 0.15,
+                                    mask=pensioner | (rng.random(n) < 0.15)),
+        "CNT_FAM_MEMBERS": _missing(rng, children + np.isin(family_status, ["Married", "Civil marriage"]) + 1,
+                                    0.00001),
+        "REGION_RATING_CLIENT": region_rating,
+        "REGION_RATING_CLIENT_W_CITY": np.where(rng.random(n) < 0.05, np.clip(region_rating - 1, 1, 3),
+                                                region_rating),
+        "WEEKDAY_APPR_PROCESS_START": _choice(rng, n, WEEKDAYS, [0.165, 0.175, 0.169, 0.164, 0.164, 0.11, 0.053]),
+        "HOUR_APPR_PROCESS_START": np.clip(np.round(rng.normal(12, 3.3, n)), 0, 23).astype(np.int64),
+    })
+    for col, share in [("REG_REGION_NOT_LIVE_REGION", 0.015), ("REG_REGION_NOT_WORK_REGION", 0.05),
+                       ("LIVE_REGION_NOT_WORK_REGION", 0.04), ("REG_CITY_NOT_LIVE_CITY", 0.078),
+                       ("REG_CITY_NOT_WORK_CITY", 0.23), ("LIVE_CITY_NOT_WORK_CITY", 0.18)]:
+        df[col] = (rng.random(n) < share).astype(np.int64)
+    df["ORGANIZATION_TYPE"] = np.where(pensioner, "XNA",
+                                       _choice(rng, n, ORGANIZATIONS, [0.27, 0.153, 0.067, 0.045, 0.042]))
+
+    # Sources externes : EXT_SOURCE_1 surtout manquante, EXT_SOURCE_2 presque toujours présente
+    ext = {
+        "EXT_SOURCE_1": (rng.beta(3.0, 3.0, n), 0.564),
+        "EXT_SOURCE_2": (rng.beta(4.0, 2.5, n), 0.0021),
+        "EXT_SOURCE_3": (rng.beta(3.5, 2.8, n), 0.198),
+    }
+    for col, (values, rate) in ext.items():
+        df[col] = _missing(rng, np.round(values, 6), rate)
+
+    has_building = rng.random(n) < 0.5
+    for base in HOUSING:
+        values = rng.beta(1.2, 6.0, n)
+        extra = 0.2 if base in ("COMMONAREA", "NONLIVINGAPARTMENTS", "FLOORSMIN", "YEARS_BUILD") else 0.02
+        mask = ~has_building | (rng.random(n) < extra)
+        for suffix, noise in (("_AVG", 0.0), ("_MODE", 0.01), ("_MEDI", 0.005)):
+            df[base + suffix] = _missing(rng, np.round(np.clip(values + rng.normal(0, noise, n), 0, 1), 4),
+                                         0, mask=mask)
+    df["FONDKAPREMONT_MODE"] = _missing(rng, _choice(rng, n, ["reg oper account", "reg oper spec account",
+                                                              "not specified", "org spec account"],
+                                                     [0.76, 0.08, 0.06]), 0.18, mask=~has_building)
+    df["HOUSETYPE_MODE"] = _missing(rng, _choice(rng, n, ["block of flats", "specific housing", "terraced house"],
+                                                 [0.98, 0.01]), 0, mask=~has_building)
+    df["TOTALAREA_MODE"] = _missing(rng, np.round(rng.beta(1.3, 8.0, n), 4), 0, mask=~has_building)
+    df["WALLSMATERIAL_MODE"] = _missing(rng, _choice(rng, n, ["Panel", "Stone, brick", "Block", "Wooden",
+                                                              "Mixed", "Monolithic", "Others"], [0.42, 0.41]),
+                                        0, mask=~has_building)
+    df["EMERGENCYSTATE_MODE"] = _missing(rng, _choice(rng, n, ["No", "Yes"], [0.985, 0.015]), 0,
+                                         mask=~has_building)
+
+    social = rng.random(n) < 0.0033
+    for col, lam in [("OBS_30_CNT_SOCIAL_CIRCLE", 1.4), ("DEF_30_CNT_SOCIAL_CIRCLE", 0.14),
+                     ("OBS_60_CNT_SOCIAL_CIRCLE", 1.4), ("DEF_60_CNT_SOCIAL_CIRCLE", 0.1)]:
+        df[col] = _missing(rng, rng.poisson(lam, n), 0, mask=social)
+    df["DAYS_LAST_PHONE_CHANGE"] = _missing(rng, -np.minimum(rng.exponential(960, n).astype(np.int64), 4292),
+                                            0.000003)
+    for k in range(2, 22):
+        df[f"FLAG_DOCUMENT_{k}"] = (rng.random(n) < (0.71 if k == 3 else 0.08 if k == 6 else 0.005)).astype(np.int64)
+
+    bureau_requests = rng.random(n) < 0.135
+    for col, lam in [("HOUR", 0.006), ("DAY", 0.007), ("WEEK", 0.034), ("MON", 0.27), ("QRT", 0.27), ("YEAR", 1.9)]:
+        df[f"AMT_REQ_CREDIT_BUREAU_{col}"] = _missing(rng, rng.poisson(lam, n), 0, mask=bureau_requests)
+    return df
+
+
+def _target(rng, df: pd.DataFrame) -> np.ndarray:
+    """Défaut (~8 %) plus probable pour des EXT_SOURCE faibles et des clients jeunes"""
+    ext = df[["EXT_SOURCE_1", "EXT_SOURCE_2", "EXT_SOURCE_3"]].mean(axis=1).fillna(0.5).to_numpy()
+    age = -df["DAYS_BIRTH"].to_numpy() / 365.25
+    logit = -2.2 - 6.0 * (ext - 0.5) - 0.02 * (age - 43)
+    return (rng.random(len(df)) < 1 / (1 + np.exp(-logit))).astype(np.int64)
+
+
+def _bureau(rng, client_ids: np.ndarray, first_id: int) -> pd.DataFrame:
+    counts = _fanout(rng, len(client_ids), "bureau")
+    n = int(counts.sum())
+    active = _choice(rng, n, ["Closed", "Active", "Sold", "Bad debt"], [0.629, 0.367, 0.0039])
+    closed = active == "Closed"
+    days_credit = -rng.integers(0, 2923, n)
+    credit_sum = _amounts(rng, n, 1.25e5, 1.1, 0.045)
+    return pd.DataFrame({
+        "SK_ID_CURR": np.repeat(client_ids, counts),
+        "SK_ID_BUREAU": first_id + np.arange(n),
+        "CREDIT_ACTIVE": active,
+        "CREDIT_CURRENCY": _choice(rng, n, ["currency 1", "currency 2", "currency 3", "currency 4"],
+                                   [0.99918, 0.00068, 0.00013]),
+        "DAYS_CREDIT": days_credit,
+        "CREDIT_DAY_OVERDUE": np.where(rng.random(n) < 0.0025, rng.integers(1, 2793, n), 0),
+        "DAYS_CREDIT_ENDDATE": _missing(rng, days_credit + rng.integers(0, 3650, n), 0.061),
+        "DAYS_ENDDATE_FACT": _missing(rng, days_credit + rng.integers(0, -days_credit + 1), 0, mask=~closed),
+        "AMT_CREDIT_MAX_OVERDUE": _missing(rng, np.where(rng.random(n) < 0.9, 0.0, _amounts(rng, n, 5e3, 1.5)),
+                                           0.655),
+        "CNT_CREDIT_PROLONG": (rng.random(n) < 0.005).astype(np.int64),
+        "AMT_CREDIT_SUM": _missing(rng, credit_sum, 0.0000076),
+        "AMT_CREDIT_SUM_DEBT": _missing(rng, np.where(closed, 0.0, np.round(credit_sum * rng.random(n), 3)),
+                                        0.15),
+        "AMT_CREDIT_SUM_LIMIT": _missing(rng, np.where(rng.random(n) < 0.9, 0.0, _amounts(rng, n, 5e4)), 0.345),
+        "AMT_CREDIT_SUM_OVERDUE": np.where(rng.random(n) < 0.0025, _amounts(rng, n, 1e4), 0.0),
+        "CREDIT_TYPE": _choice(rng, n, CREDIT_TYPES, [0.729, 0.234, 0.016, 0.0107, 0.0072]),
+        "DAYS_CREDIT_UPDATE": np.maximum(days_credit, -np.minimum(rng.exponential(590, n).astype(np.int64), 2922)),
+        "AMT_ANNUITY": _missing(rng, _amounts(rng, n, 1e4, 1.2), 0.714),
+    })
+
+
+def _bureau_balance(rng, bureau_ids: np.ndarray) -> pd.DataFrame:
+    counts = _fanout(rng, len(bureau_ids), "bureau_balance")
+    month = _positions(counts)
+    n = len(month)
+    status = _choice(rng, n, ["C", "0", "X", "1", "5", "2", "3", "4"], [0.5, 0.274, 0.21, 0.0089, 0.0023])
+    return pd.DataFrame({
+        "SK_ID_BUREAU": np.repeat(bureau_ids, counts),
+        "MONTHS_BALANCE": -month,
+        "STATUS": status,
+    })
+
+
+def _previous(rng, client_ids: np.ndarray, first_id: int) -> pd.DataFrame:
+    counts = _fanout(rng, len(client_ids), "previous")
+    n = int(counts.sum())
+    contract_type = _choice(rng, n, ["Cash loans", "Consumer loans", "Revolving loans", "XNA"],
+                            [0.447, 0.436, 0.116])
+    status = _choice(rng, n, ["Approved", "Canceled", "Refused", "Unused offer"], [0.62, 0.19, 0.174])
+    application = _amounts(rng, n, 1.1e5, 1.0, 0.045)
+    application[rng.random(n) < 0.22] = 0.0
+    approved = status == "Approved"
+    no_payment_plan = rng.random(n) < 0.22
+    decision = -rng.integers(1, 2923, n)
+    first_due = decision + rng.integers(0, 60, n)
+    down_payment = rng.random(n) < 0.46
+    return pd.DataFrame({
+        "SK_ID_PREV": first_id + np.arange(n),
+        "SK_ID_CURR": np.repeat(client_ids, counts),
+        "NAME_CONTRACT_TYPE": contract_type,
+        "AMT_ANNUITY": _missing(rng, _amounts(rng, n, 1.1e4, 0.8, 0.045), 0, mask=no_payment_plan),
+        "AMT_APPLICATION": application,
+        "AMT_CREDIT": _missing(rng, np.round(application * rng.uniform(0.9, 1.2, n), 3), 0.000001),
+        "AMT_DOWN_PAYMENT": _missing(rng, np.where(rng.random(n) < 0.6, 0.0, _amounts(rng, n, 6e3, 1.0)), 0,
+                                     mask=~down_payment),
+        "AMT_GOODS_PRICE": _missing(rng, application, 0, mask=no_payment_plan | (rng.random(n) < 0.01)),
+        "WEEKDAY_APPR_PROCESS_START": _choice(rng, n, WEEKDAYS, [0.153, 0.152, 0.151, 0.15, 0.149, 0.148]),
+        "HOUR_APPR_PROCESS_START": np.clip(np.round(rng.normal(12.5, 3.3, n)), 0, 23).astype(np.int64),
+        "FLAG_LAST_APPL_PER_CONTRACT": _choice(rng, n, ["Y", "N"], [0.995, 0.005]),
+        "NFLAG_LAST_APPL_IN_DAY": (rng.random(n) < 0.996).astype(np.int64),
+        "RATE_DOWN_PAYMENT": _missing(rng, np.round(rng.beta(0.6, 6.0, n), 6), 0, mask=~down_payment),
+        "RATE_INTEREST_PRIMARY": _missing(rng, np.round(rng.uniform(0.03, 1.0, n), 6), 0.9964),
+        "RATE_INTEREST_PRIVILEGED": _missing(rng, np.round(rng.uniform(0.37, 1.0, n), 6), 0.9964),
+        "NAME_CASH_LOAN_PURPOSE": _choice(rng, n, CASH_LOAN_PURPOSES, [0.552, 0.405]),
+        "NAME_CONTRACT_STATUS": status,
+        "DAYS_DECISION": decision,
+        "NAME_PAYMENT_TYPE": _choice(rng, n, ["Cash through the bank", "XNA", "Non-cash from your account",
+                                              "Cashless from the account of the employer"],
+                                     [0.619, 0.376, 0.0049]),
+        "CODE_REJECT_REASON": _choice(rng, n, ["XAP", "HC", "LIMIT", "SCO", "CLIENT", "SCOFR", "XNA", "VERIF",
+                                               "SYSTEM"], [0.81, 0.105, 0.033, 0.022, 0.016, 0.0077, 0.003]),
+        "NAME_TYPE_SUITE": _missing(rng, _choice(rng, n, SUITES, [0.6, 0.25, 0.08, 0.04]), 0.491),
+        "NAME_CLIENT_TYPE": _choice(rng, n, ["Repeater", "New", "Refreshed", "XNA"], [0.737, 0.18, 0.081]),
+        "NAME_GOODS_CATEGORY": _choice(rng, n, GOODS_CATEGORIES, [0.569, 0.135, 0.073, 0.063, 0.06]),
+        "NAME_PORTFOLIO": _choice(rng, n, ["POS", "Cash", "XNA", "Cards", "Cars"], [0.414, 0.276, 0.222, 0.087]),
+        "NAME_PRODUCT_TYPE": _choice(rng, n, ["XNA", "x-sell", "walk-in"], [0.637, 0.273]),
+        "CHANNEL_TYPE": _choice(rng, n, ["Credit and cash offices", "Country-wide", "Stone", "Regional / Local",
+                                         "Contact center", "AP+ (Cash loan)", "Channel of corporate sales",
+                                         "Car dealer"], [0.431, 0.297, 0.127, 0.065, 0.043, 0.034]),
+        "SELLERPLACE_AREA": np.where(rng.random(n) < 0.46, -1, np.minimum(rng.exponential(300, n), 4e6)
+                                     ).astype(np.int64),
+        "NAME_SELLER_INDUSTRY": _choice(rng, n, ["XNA", "Consumer electronics", "Connectivity", "Furniture",
+                                                 "Construction", "Clothing", "Industry", "Auto technology",
+                                                 "Jewelry", "MLM partners", "Tourism"],
+                                        [0.512, 0.238, 0.165, 0.035, 0.018, 0.014, 0.011]),
+        "CNT_PAYMENT": _missing(rng, _choice(rng, n, [12, 6, 0, 10, 24, 18, 36, 60, 48, 30],
+                                             [0.24, 0.2, 0.15, 0.12, 0.11, 0.07, 0.05, 0.04, 0.02]).astype(np.int64),
+                                0, mask=no_payment_plan),
+        "NAME_YIELD_GROUP": _choice(rng, n, ["XNA", "middle", "high", "low_normal", "low_action"],
+                                    [0.31, 0.23, 0.211, 0.193]),
+        "PRODUCT_COMBINATION": _missing(rng, _choice(rng, n, PRODUCT_COMBINATIONS, [0.171, 0.158, 0.134, 0.086]),
+                                        0.0002),
+        "DAYS_FIRST_DRAWING": _missing(rng, np.where(rng.random(n) < 0.96, SENTINEL, first_due), 0,
+                                       mask=~approved),
+        "DAYS_FIRST_DUE": _missing(rng, np.where(rng.random(n) < 0.025, SENTINEL, first_due), 0, mask=~approved),
+        "DAYS_LAST_DUE_1ST_VERSION": _missing(rng, first_due + rng.integers(0, 1500, n), 0, mask=~approved),
+        "DAYS_LAST_DUE": _missing(rng, np.where(rng.random(n) < 0.5, SENTINEL, first_due + rng.integers(0, 900, n)),
+                                  0, mask=~approved),
+        "DAYS_TERMINATION": _missing(rng, np.where(rng.random(n) < 0.53, SENTINEL,
+                                                   first_due + rng.integers(0, 1200, n)), 0, mask=~approved),
+        "NFLAG_INSURED_ON_APPROVAL": _missing(rng, (rng.random(n) < 0.33).astype(np.int64), 0, mask=~approved),
+    })
+
+
+def _monthly_rows(rng, previous: pd.DataFrame, table: str):
+    """Clés (SK_ID_PREV, SK_ID_CURR) répétées par demande et mois écoulé (0, 1, ...) de chaque ligne"""
+    counts = _fanout(rng, len(previous), table)
+    return (np.repeat(previous["SK_ID_PREV"].to_numpy(), counts),
+            np.repeat(previous["SK_ID_CURR"].to_numpy(), counts),
+            _positions(counts), np.repeat(-rng.integers(1, 60, len(previous)), counts))
+
+
+def _pos(rng, previous: pd.DataFrame) -> pd.DataFrame:
+    prev_ids, client_ids, month, last = _monthly_rows(rng, previous, "pos")
+    n = len(month)
+    instalments = _choice(rng, n, [12, 24, 10, 6, 18, 36, 60, 48, 30], [0.22, 0.16, 0.15, 0.12, 0.1, 0.09, 0.07])
+    return pd.DataFrame({
+        "SK_ID_PREV": prev_ids,
+        "SK_ID_CURR": client_ids,
+        "MONTHS_BALANCE": last - month,
+        "CNT_INSTALMENT": _missing(rng, instalments.astype(np.int64), 0.0026),
+        "CNT_INSTALMENT_FUTURE": _missing(rng, np.maximum(instalments - month, 0).astype(np.int64), 0.0026),
+        "NAME_CONTRACT_STATUS": _choice(rng, n, ["Active", "Completed", "Signed", "Demand", "Returned to the store",
+                                                 "Approved", "Amortized debt", "Canceled", "XNA"],
+                                        [0.915, 0.074, 0.0087, 0.0007]),
+        "SK_DPD": np.where(rng.random(n) < 0.03, rng.integers(1, 4232, n), 0),
+        "SK_DPD_DEF": np.where(rng.random(n) < 0.01, rng.integers(1, 3596, n), 0),
+    })
+
+
+def _installments(rng, previous: pd.DataFrame) -> pd.DataFrame:
+    prev_ids, client_ids, number, last = _monthly_rows(rng, previous, "installments")
+    n = len(number)
+    days = (last - number) * 30 - rng.integers(0, 30, n)
+    instalment = _amounts(rng, n, 9e3, 1.1, 0.045)
+    late = rng.random(n) < 0.08
+    partial = rng.random(n) < 0.09
+    return pd.DataFrame({
+        "SK_ID_PREV": prev_ids,
+        "SK_ID_CURR": client_ids,
+        "NUM_INSTALMENT_VERSION": _choice(rng, n, [1.0, 0.0, 2.0, 3.0, 4.0], [0.64, 0.31, 0.03, 0.01]),
+        "NUM_INSTALMENT_NUMBER": number + 1,
+        "DAYS_INSTALMENT": days.astype(np.float64),
+        "DAYS_ENTRY_PAYMENT": _missing(rng, days - np.where(late, -rng.integers(1, 60, n), rng.integers(0, 20, n)),
+                                       0.0002),
+        "AMT_INSTALMENT": instalment,
+        "AMT_PAYMENT": _missing(rng, np.where(partial, np.round(instalment * rng.random(n), 3), instalment), 0.0002),
+    })
+
+
+def _credit(rng, previous: pd.DataFrame) -> pd.DataFrame:
+    prev_ids, client_ids, month, last = _monthly_rows(rng, previous, "credit")
+    n = len(month)
+    limit = _choice(rng, n, [0, 45000, 90000, 135000, 180000, 225000, 270000, 450000, 675000],
+                    [0.19, 0.2, 0.14, 0.12, 0.1, 0.08, 0.06, 0.05]).astype(np.float64)
+    balance = np.round(limit * rng.beta(0.6, 1.2, n), 3)
+    no_drawing_detail = rng.random(n) < 0.195
+    no_regularity = rng.random(n) < 0.079
+    df = pd.DataFrame({
+        "SK_ID_PREV": prev_ids,
+        "SK_ID_CURR": client_ids,
+        "MONTHS_BALANCE": last - month,
+        "AMT_BALANCE": balance,
+        "AMT_CREDIT_LIMIT_ACTUAL": limit.astype(np.int64),
+    })
+    drawings = np.where(rng.random(n) < 0.8, 0.0, _amounts(rng, n, 9e3, 1.0, 0.045))
+    df["AMT_DRAWINGS_ATM_CURRENT"] = _missing(rng, drawings, 0, mask=no_drawing_detail)
+    df["AMT_DRAWINGS_CURRENT"] = drawings
+    df["AMT_DRAWINGS_OTHER_CURRENT"] = _missing(rng, np.zeros(n), 0, mask=no_drawing_detail)
+    df["AMT_DRAWINGS_POS_CURRENT"] = _missing(rng, np.where(rng.random(n) < 0.85, 0.0, _amounts(rng, n, 5e3)), 0,
+                                              mask=no_drawing_detail)
+    df["AMT_INST_MIN_REGULARITY"] = _missing(rng, np.round(balance * 0.05, 3), 0, mask=no_regularity)
+    payment = np.where(rng.random(n) < 0.5, 0.0, _amounts(rng, n, 6e3, 1.0, 0.045))
+    df["AMT_PAYMENT_CURRENT"] = _missing(rng, payment, 0.2)
+    df["AMT_PAYMENT_TOTAL_CURRENT"] = payment
+    df["AMT_RECEIVABLE_PRINCIPAL"] = np.round(balance * 0.96, 3)
+    df["AMT_RECIVABLE"] = balance
+    df["AMT_TOTAL_RECEIVABLE"] = balance
+    df["CNT_DRAWINGS_ATM_CURRENT"] = _missing(rng, (drawings > 0) * rng.integers(1, 5, n), 0,
+                                              mask=no_drawing_detail)
+    df["CNT_DRAWINGS_CURRENT"] = (drawings > 0) * rng.integers(1, 8, n)
+    df["CNT_DRAWINGS_OTHER_CURRENT"] = _missing(rng, np.zeros(n, dtype=np.int64), 0, mask=no_drawing_detail)
+    df["CNT_DRAWINGS_POS_CURRENT"] = _missing(rng, rng.poisson(0.5, n), 0, mask=no_drawing_detail)
+    df["CNT_INSTALMENT_MATURE_CUM"] = _missing(rng, month, 0, mask=no_regularity)
+    df["NAME_CONTRACT_STATUS"] = _choice(rng, n, ["Active", "Completed", "Signed", "Demand", "Sent proposal",
+                                                  "Refused", "Approved"], [0.963, 0.033, 0.0031])
+    df["SK_DPD"] = np.where(rng.random(n) < 0.04, rng.integers(1, 3260, n), 0)
+    df["SK_DPD_DEF"] = np.where(rng.random(n) < 0.02, rng.integers(1, 30, n), 0)
+    return df
+
+
+# --- Génération ---
+
+def _shuffled(rng, df: pd.DataFrame) -> pd.DataFrame:
+    """Lignes mélangées : comme dans les fichiers d'origine, les tables ne sont pas triées par clé"""
+    return df.take(rng.permutation(len(df)))
+
+
+def generate_dataset(output_dir: str = DEFAULT_OUTPUT_DIR, scale: float = 0.01, seed: int = 0,
+                     chunk_clients: int = 50000) -> dict:
+    """
+    Écrit les huit CSV du jeu Home Credit (noms de data_loader.TABLES) dans output_dir,
+    pour round(scale x 356 255) clients, et un manifeste MANIFEST (paramètres et lignes
+    par table). Retourne le nombre de lignes de chaque table.
+    """
+    n_clients = max(int(round(scale * (PRODUCTION_ROWS["train"] + PRODUCTION_ROWS["test"]))), 2)
+    test_share = PRODUCTION_ROWS["test"] / (PRODUCTION_ROWS["train"] + PRODUCTION_ROWS["test"])
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {name: os.path.join(output_dir, filename) for name, filename in TABLES.items()}
+    # Manifeste retiré pendant l'écriture : un jeu avec manifeste est complet
+    manifest_path = os.path.join(output_dir, MANIFEST)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    rows = dict.fromkeys(TABLES, 0)
+    next_bureau, next_prev = 5000000, 1000000
+    for chunk, start in enumerate(range(0, n_clients, chunk_clients)):
+        rng = np.random.default_rng([seed, chunk])
+        ids = 100001 + np.arange(start, min(start + chunk_clients, n_clients))
+        applications = _applications(rng, ids)
+        is_test = rng.random(len(ids)) < test_share
+        train = applications[~is_test]
+        train.insert(1, config.TARGET, _target(rng, train))
+
+        bureau = _bureau(rng, ids, next_bureau)
+        next_bureau += len(bureau)
+        bureau_balance = _bureau_balance(rng, bureau["SK_ID_BUREAU"].to_numpy())
+        previous = _previous(rng, ids, next_prev)
+        next_prev += len(previous)
+
+        tables = {
+            "train": train,
+            "test": applications[is_test],
+            "bureau": _shuffled(rng, bureau),
+            "bureau_balance": _shuffled(rng, bureau_balance),
+            "previous": _shuffled(rng, previous),
+            "pos": _shuffled(rng, _pos(rng, previous)),
+            "installments": _shuffled(rng, _installments(rng, previous)),
+            "credit": _shuffled(rng, _credit(rng, previous)),
+        }
+        for name, df in tables.items():
+            df.to_csv(paths[name], mode="w" if chunk == 0 else "a", header=chunk == 0, index=False)
+            rows[name] += len(df)
+
+    with open(manifest_path, "w") as f:
+        json.dump({"scale": scale, "seed": seed, "chunk_clients": chunk_clients, "rows": rows}, f, indent=2)
+    return rows
+
+
+def ensure_dataset(output_dir: str, scale: float, seed: int = 0, chunk_clients: int = 50000) -> dict:
+    """Jeu de output_dir réutilisé s'il a été généré avec les mêmes paramètres, généré sinon"""
+    try:
+        with open(os.path.join(output_dir, MANIFEST)) as f:
+            manifest = json.load(f)
+        if (manifest["scale"], manifest["seed"], manifest["chunk_clients"]) == (scale, seed, chunk_clients):
+            return manifest["rows"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return generate_dataset(output_dir, scale, seed, chunk_clients)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=0.01, help="Taille relative au jeu Kaggle (1 = 356 255 clients)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help="Dossier des CSV générés")
+    parser.add_argument("--chunk-clients", type=int, default=50000, help="Clients générés par bloc")
+    args = parser.parse_args()
+
+    rows = generate_dataset(args.output, args.scale, args.seed, args.chunk_clients)
+    for name, count in rows.items():
+        print(f"{TABLES[name]:<28} {count:>12,} lignes")
+    print(f"Jeu synthétique écrit dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# src/training/datasets.py
+"""
+Données d'entraînement en colonnes, ouvertes en memory-map, et cache des Dataset LightGBM.
+
+Répertoire DATA_DIR/training/ :
+- X_train.npy, X_test.npy : matrices float64 en ordre colonne (Fortran), lues en
+  memory-map : pas de désérialisation, pages partagées entre les processus par le
+  cache du système, et passées sans copie à LightGBM (format colonne natif)
+- y_train.npy, y_test.npy : cibles
+- meta.json : noms des colonnes, dimensions et empreinte (blake2b) du contenu
+- lgb_cache/ : Dataset LightGBM binaires (save_binary), déjà discrétisés ; leur nom
+  contient l'empreinte des données et des paramètres, un changement de l'une ou
+  de l'autre les invalide
+
+Conversion des pickles produits par le préprocessing :
+    python -m src.training.datasets
+"""
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from src.config.config import config
+
+TRAINING_DIR = os.path.join(config.DATA_DIR, "training")
+SPLITS = ("train", "test")
+PICKLE_NAMES = ("X_train", "y_train", "X_test", "y_test")
+
+
+def content_hash(*arrays, extra=None) -> str:
+    """Empreinte du contenu de tableaux NumPy (et d'un objet JSON facultatif)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.asarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        # Lecture par blocs de colonnes : pas de copie complète de la matrice
+        flat = array.reshape(len(array), -1) if array.ndim > 1 else array.reshape(-1, 1)
+        for start in range(0, flat.shape[1], 64):
+            digest.update(np.ascontiguousarray(flat[:, start:start + 64]).data)
+    if extra is not None:
+        digest.update(json.dumps(extra, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def save_training_data(X_train: pd.DataFrame, y_train, X_test: pd.DataFrame, y_test,
+                       directory: str = TRAINING_DIR) -> dict:
+    """
+    Écrit les jeux d'entraînement et de test au format colonne ; le répertoire est
+    construit à côté puis échangé avec l'ancien par renommage.
+    """
+    if list(X_train.columns) != list(X_test.columns):
+        raise ValueError("X_train et X_test n'ont pas les mêmes colonnes")
+
+    arrays = {
+        "X_train": np.asfortranarray(X_train.to_numpy(dtype=np.float64)),
+        "y_train": np.asarray(y_train),
+        "X_test": np.asfortranarray(X_test.to_numpy(dtype=np.float64)),
+        "y_test": np.asarray(y_test),
+    }
+    columns = [str(col) for col in X_train.columns]
+    meta = {
+        "columns": columns,
+        "shapes": {name: list(array.shape) for name, array in arrays.items()},
+        "hash": content_hash(*arrays.values(), extra=columns),
+    }
+
+    directory = os.path.abspath(directory)
+    tmp_dir, old_dir = directory + ".tmp", directory + ".old"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    # Le cache LightGBM n'est conservé que si les données n'ont pas changé
+    old_meta_path = os.path.join(directory, "meta.json")
+    if os.path.isdir(os.path.join(directory, "lgb_cache")) and os.path.exists(old_meta_path):
+        with open(old_meta_path) as f:
+            if json.load(f)["hash"] == meta["hash"]:
+                os.rename(os.path.join(directory, "lgb_cache"), os.path.join(tmp_dir, "lgb_cache"))
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(directory):
+        os.rename(directory, old_dir)
+    os.rename(tmp_dir, directory)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return meta
+
+
+def load_training_data(directory: str = TRAINING_DIR, mmap: bool = True):
+    """
+    (X_train, y_train, X_test, y_test, meta) : DataFrame construits sans copie sur les
+    matrices en memory-map (lecture seule), index 0..n-1
+    """
+    with open(os.path.join(directory, "meta.json")) as f:
+        meta = json.load(f)
+    mmap_mode = "r" if mmap else None
+
+    data = []
+    for split in SPLITS:
+        X = np.load(os.path.join(directory, f"X_{split}.npy"), mmap_mode=mmap_mode)
+        # Cibles (une colonne) chargées en mémoire
+        y = np.load(os.path.join(directory, f"y_{split}.npy"))
+        data.extend([
+            pd.DataFrame(X, columns=meta["columns"], copy=False),
+            pd.Series(y, name=config.TARGET),
+        ])
+    return (*data, meta)
+
+
+def cached_lgb_dataset(name: str, X, y, data_hash: str, params: dict, weight=None,
+                       reference=None, cache_dir: str = None):
+    """
+    Dataset LightGBM construit (discrétisé), relu depuis lgb_cache/ s'il y a déjà été
+    enregistré pour les mêmes données (data_hash décrit X, y et weight) et les mêmes paramètres.
+    Un Dataset de validation est construit avec reference (mêmes bornes de discrétisation) ;
+    relu depuis le cache, il garde ces bornes.
+    """
+    import lightgbm as lgb
+
+    cache_dir = cache_dir or os.path.join(TRAINING_DIR, "lgb_cache")
+    key = content_hash(extra={"data": data_hash, "params": params, "lightgbm": lgb.__version__})
+    path = os.path.join(cache_dir, f"{name}-{key[:20]}.bin")
+    if os.path.exists(path):
+        return lgb.Dataset(path, params=params).construct()
+
+    dataset = lgb.Dataset(X, y, weight=weight, reference=reference, params=params, free_raw_data=True).construct()
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    dataset.save_binary(tmp_path)
+    os.replace(tmp_path, path)
+    return dataset
+
+
+def _read_pickles() -> list:
+    return [pd.read_pickle(os.path.join(config.DATA_DIR, f"{name}.pkl")) for name in PICKLE_NAMES]
+
+
+def ensure_training_data(directory: str = TRAINING_DIR):
+    """Convertit les pickles de DATA_DIR si le format colonne est absent ou plus ancien qu'eux"""
+    meta_path = os.path.join(directory, "meta.json")
+    pickles = [os.path.join(config.DATA_DIR, f"{name}.pkl") for name in PICKLE_NAMES]
+    if os.path.exists(meta_path) and all(
+        os.path.getmtime(path) <= os.path.getmtime(meta_path) for path in pickles if os.path.exists(path)
+    ):
+        return
+    save_training_data(*_read_pickles(), directory=directory)
+
+
+def main():
+    """Convertit les pickles X_train/y_train/X_test/y_test de DATA_DIR au format colonne"""
+    meta = save_training_data(*_read_pickles())
+    print(f"Données d'entraînement écrites dans {TRAINING_DIR} : {meta['shapes']} (empreinte {meta['hash'][:12]})")
+
+
+if __name__ == "__main__":
+    main()
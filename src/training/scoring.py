@@ -1,12 +1,21 @@
 import numpy as np
 import os
 import json
-from sklearn.metrics import confusion_matrix
-from sklearn.metrics import make_scorer
 from src.config.config import config
 
+# sklearn est importé à la demande : make_decision est utilisé par l'API,
+# qui ne doit pas payer l'import de sklearn.metrics au démarrage
+
 # 1. SCORE MÉTIER
 
+def business_score_from_counts(fn, fp, weight_FN: int = 5, weight_FP: int = 1):
+    """
+    Score métier à partir des nombres de faux négatifs et de faux positifs
+    (scalaires ou tableaux : un score par seuil).
+    """
+    return 1 / (1 + weight_FN * np.asarray(fn) + weight_FP * np.asarray(fp))
+
+
 def business_score(
     y_true,
     y_pred,
@@ -29,6 +38,9 @@ def business_score(
         Poids des faux négatifs
     weight_FP : int
         Poids des faux positifs
+    save : bool
+        Écrit le seuil dans data/best_threshold.json (seuil servi par l'API) ;
+        False pour un simple calcul (pipeline : le seuil est écrit à la publication)
 
     Returns
     -------
@@ -36,19 +48,87 @@ def business_score(
         Score métier
     """
 
-    tn, fp, fn, tp = confusion_matrix(y_true, y_pred).ravel()
+    y_true = np.asarray(y_true) == 1
+    y_pred = np.asarray(y_pred) == 1
+
+    # Comptages directs (équivalents à confusion_matrix(...).ravel())
+    fn = np.count_nonzero(y_true & ~y_pred)
+    fp = np.count_nonzero(~y_true & y_pred)
 
     # Score métier (plus grand = meilleur)
-    score = 1 / (1 + weight_FN * fn + weight_FP * fp)
+    return float(business_score_from_counts(fn, fp, weight_FN, weight_FP))
+
+
+def business_cost_curve(
+    y_true,
+    y_proba,
+    thresholds: np.ndarray = None,
+    weight_FN: int = 5,
+    weight_FP: int = 1
+):
+    """
+    FN, FP et score métier de la décision (y_proba >= seuil) pour chaque seuil,
+    par tri des probabilités et comptages cumulés : O(N log N) quel que soit le
+    nombre de seuils.
+
+    Sans thresholds, tous les seuils utiles sont évalués : chaque probabilité
+    distincte (ordre croissant), puis un seuil juste au-dessus de la plus grande
+    (aucun client refusé). Une probabilité manquante (NaN) n'est jamais refusée.
+    Sans thresholds, au moins une probabilité non manquante est requise (ValueError).
 
-    return score
+    Returns
+    -------
+    dict
+        {"thresholds", "fn", "fp", "scores"} : tableaux NumPy de même longueur
+    """
+    y_true = np.asarray(y_true) == 1
+    y_proba = np.asarray(y_proba, dtype=np.float64)
+
+    valid = ~np.isnan(y_proba)
+    missing_positives = np.count_nonzero(y_true[~valid])
+    order = np.argsort(y_proba[valid], kind="stable")
+    proba_sorted = y_proba[valid][order]
+    positives_sorted = y_true[valid][order]
+
+    # positives_below[k] : clients à risque parmi les k plus petites probabilités
+    positives_below = np.concatenate([[0], np.cumsum(positives_sorted)])
+    negatives = len(proba_sorted) - positives_below[-1]
+
+    if thresholds is None:
+        if len(proba_sorted) == 0:
+            raise ValueError("Aucune probabilité non manquante : pas de seuil à évaluer")
+        # Début de chaque série de probabilités égales, puis "au-dessus du maximum"
+        starts = np.flatnonzero(np.concatenate([[True], proba_sorted[1:] != proba_sorted[:-1]]))
+        below = np.append(starts, len(proba_sorted))
+        above_max = np.nextafter(proba_sorted[-1], np.inf)
+        thresholds = np.append(proba_sorted[starts], above_max)
+    else:
+        thresholds = np.asarray(thresholds, dtype=np.float64)
+        # Nombre de probabilités strictement inférieures au seuil (acceptées)
+        below = np.searchsorted(proba_sorted, thresholds, side="left")
+
+    fn = positives_below[below] + missing_positives
+    fp = negatives - (below - positives_below[below])
+    return {
+        "thresholds": thresholds,
+        "fn": fn,
+        "fp": fp,
+        "scores": business_score_from_counts(fn, fp, weight_FN, weight_FP),
+    }
 
 
-# Scorer business
-business_scorer = make_scorer(
-    business_score,
-    greater_is_better=True
-)
+# Scorer business (construit à la première utilisation)
+def __getattr__(name):
+    if name == "business_scorer":
+        from sklearn.metrics import make_scorer
+
+        scorer = make_scorer(
+            business_score,
+            greater_is_better=True
+        )
+        globals()["business_scorer"] = scorer
+        return scorer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # 2. OPTIMISATION DU SEUIL MÉTIER
 
@@ -57,7 +137,8 @@ def optimize_decision_threshold(
     y_proba,
     thresholds: np.ndarray = None,
     weight_FN: int = 5,
-    weight_FP: int = 1
+    weight_FP: int = 1,
+    save: bool = True
 ):
     """
     Recherche du seuil de décision optimal selon le score métier.
@@ -69,11 +150,14 @@ def optimize_decision_threshold(
     y_proba : array-like
         Probabilités prédites (classe 1)
     thresholds : np.ndarray
-        Liste des seuils testés
+        Liste des seuils testés (par défaut : tous les seuils, optimum exact)
     weight_FN : int
         Poids des faux négatifs
     weight_FP : int
         Poids des faux positifs
+    save : bool
+        Écrit le seuil dans data/best_threshold.json (seuil servi par l'API) ;
+        False pour un simple calcul (pipeline : le seuil est écrit à la publication)
 
     Returns
     -------
@@ -81,50 +165,43 @@ def optimize_decision_threshold(
         {
             "best_threshold": float,
             "best_score": float,
-            "scores": list,
-            "thresholds": list
+            "scores": np.ndarray,
+            "thresholds": np.ndarray
         }
     """
-    
-    # Seuils par défaut
-    if thresholds is None:
-        thresholds = np.linspace(0.05, 0.5, 50)
-
-    # Calcul des scores pour chaque seuil
-    scores = []
-
-    # Boucle sur les seuils
-    for threshold in thresholds:
-        y_pred = (y_proba >= threshold).astype(int)
-        score = business_score(
-            y_true,
-            y_pred,
-            weight_FN=weight_FN,
-            weight_FP=weight_FP
-        )
-        scores.append(score)
 
-    # Recherche du meilleur seuil
+    # Courbe de coût sur tous les seuils (ou ceux demandés) en une passe
+    curve = business_cost_curve(
+        y_true,
+        y_proba,
+        thresholds=thresholds,
+        weight_FN=weight_FN,
+        weight_FP=weight_FP
+    )
+    thresholds, scores = curve["thresholds"], curve["scores"]
+
+    # Recherche du meilleur seuil (le plus petit en cas d'égalité)
     best_idx = int(np.argmax(scores))
 
     best_threshold = thresholds[best_idx]
     best_score = scores[best_idx]
-    
+
     # Sauvegarde du meilleur seuil et score dans un fichier JSON
-    try:
-        with open(os.path.join(config.DATA_DIR, "best_threshold.json"), "w") as f:
-            json.dump({
-                "best_threshold": float(best_threshold),
-                "best_score": float(best_score)
-            }, f)
-    except Exception as e:
-        print(f"Attention: Impossible de sauvegarder le seuil optimal: {e}")
+    if save:
+        try:
+            with open(os.path.join(config.DATA_DIR, "best_threshold.json"), "w") as f:
+                json.dump({
+                    "best_threshold": float(best_threshold),
+                    "best_score": float(best_score)
+                }, f)
+        except Exception as e:
+            print(f"Attention: Impossible de sauvegarder le seuil optimal: {e}")
 
     return {
-        "best_threshold": float(thresholds[best_idx]),
-        "best_score": float(scores[best_idx]),
+        "best_threshold": float(best_threshold),
+        "best_score": float(best_score),
         "scores": scores,
-        "thresholds": thresholds.tolist()
+        "thresholds": thresholds
     }
 
 # 3. DÉCISION FINALE
@@ -0,0 +1,208 @@
+# src/training/search.py
+"""
+Recherche d'hyperparamètres LightGBM par successive halving, sur des Dataset natifs.
+
+- Chaque fold est discrétisé (binning) une seule fois : ses Dataset d'entraînement et
+  de validation sont partagés par tous les jeux de paramètres.
+- Les boosters de chaque candidat sont avancés par paliers de tours de boosting ;
+  à chaque palier, seul le meilleur tiers (eta = 3) des candidats continue.
+- Le score de validation est le score métier (business_score, décision à 0,5 comme
+  business_scorer), moyenné sur les folds à chaque tour ; un candidat s'arrête
+  quand ce score ne progresse plus pendant early_stopping_rounds tours.
+- Threads : les folds d'un candidat sont entraînés en parallèle (n_jobs) et chaque
+  booster reçoit cœurs // n_jobs threads, soit au total le nombre de cœurs.
+
+Le meilleur candidat est réentraîné sur tout le jeu (LGBMClassifier, nombre de tours
+= meilleure itération en validation croisée). Les attributs best_params_, best_score_,
+best_estimator_ et cv_results_ sont ceux de GridSearchCV.
+"""
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import lightgbm as lgb
+import numpy as np
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+
+from src.training.scoring import business_score_from_counts
+
+# Paramètres du wrapper sklearn sans équivalent natif direct
+SKLEARN_ONLY_PARAMS = ("n_estimators", "class_weight", "importance_type")
+
+
+def balanced_weights(y: np.ndarray) -> np.ndarray:
+    """Poids de class_weight="balanced" : n_samples / (n_classes * effectif de la classe)"""
+    classes, inverse, counts = np.unique(y, return_inverse=True, return_counts=True)
+    return (len(y) / (len(classes) * counts))[inverse]
+
+
+def business_feval(preds: np.ndarray, eval_data: lgb.Dataset):
+    """Score métier d'un Dataset de validation, décision à 0,5 (comme business_scorer)"""
+    y_true = eval_data.get_label() == 1
+    y_pred = preds >= 0.5
+    fn = np.count_nonzero(y_true & ~y_pred)
+    fp = np.count_nonzero(~y_true & y_pred)
+    return "business_score", float(business_score_from_counts(fn, fp)), True
+
+
+class _Candidate:
+    """Un jeu de paramètres : un booster par fold et la courbe du score moyen par tour"""
+
+    def __init__(self, params: dict, boosters: list):
+        self.params = params
+        self.boosters = boosters
+        self.fold_scores = [[] for _ in boosters]
+        self.stopped = False
+
+    @property
+    def rounds(self) -> int:
+        return len(self.fold_scores[0])
+
+    @property
+    def mean_scores(self) -> np.ndarray:
+        return np.mean(self.fold_scores, axis=0)
+
+    @property
+    def best_iteration(self) -> int:
+        return int(np.argmax(self.mean_scores)) + 1
+
+    @property
+    def best_score(self) -> float:
+        return float(np.max(self.mean_scores))
+
+
+class HalvingLGBMSearch:
+    """
+    Successive halving des paramètres de param_grid (format GridSearchCV)
+    pour un LGBMClassifier de paramètres de base estimator_params.
+    """
+
+    def __init__(self, estimator_params: dict, param_grid: dict, cv=None, eta: int = 3,
+                 early_stopping_rounds: int = 50, n_jobs: int = 1, max_bin: int = 255, verbose: int = 1,
+                 data_hash: str = None, cache_dir: str = None):
+        self.estimator_params = dict(estimator_params)
+        self.param_grid = param_grid
+        self.cv = cv if cv is not None else StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
+        self.eta = eta
+        self.early_stopping_rounds = early_stopping_rounds
+        self.n_jobs = n_jobs
+        self.max_bin = max_bin
+        self.verbose = verbose
+        # Empreinte de (X, y) : Dataset des folds relus depuis le cache binaire LightGBM
+        self.data_hash = data_hash
+        self.cache_dir = cache_dir
+
+    def _booster_params(self, params: dict, num_threads: int) -> dict:
+        """Paramètres natifs (les noms sklearn sont des alias reconnus par LightGBM)"""
+        params = {k: v for k, v in {**self.estimator_params, **params}.items() if k not in SKLEARN_ONLY_PARAMS}
+        params.pop("n_jobs", None)
+        params.update({"num_threads": num_threads, "metric": "None", "verbose": -1})
+        return params
+
+    def _dataset_params(self) -> dict:
+        # feature_pre_filter=False : min_child_samples peut varier d'un candidat à l'autre
+        # sans reconstruire le Dataset
+        return {
+            "max_bin": self.max_bin,
+            "feature_pre_filter": False,
+            "verbose": -1,
+            "seed": self.estimator_params.get("random_state", 0),
+        }
+
+    def _build_folds(self, X, y) -> list:
+        """
+        Dataset (train, validation) de chaque fold, discrétisés une seule fois
+        (et relus depuis le cache binaire si data_hash est fourni)
+        """
+        folds = []
+        balanced = self.estimator_params.get("class_weight") == "balanced"
+        params = self._dataset_params()
+        for fold, (train_idx, valid_idx) in enumerate(self.cv.split(X, y)):
+            X_train, y_train = X.iloc[train_idx], y[train_idx]
+            weight = balanced_weights(y_train) if balanced else None
+            if self.data_hash is None:
+                train_set = lgb.Dataset(X_train, y_train, weight=weight, params=params, free_raw_data=True).construct()
+                valid_set = lgb.Dataset(
+                    X.iloc[valid_idx], y[valid_idx], reference=train_set, params=params,
+                ).construct()
+            else:
+                from src.training.datasets import cached_lgb_dataset
+
+                fold_hash = f"{self.data_hash}-{self.cv!r}-{fold}-{balanced}"
+                train_set = cached_lgb_dataset(f"fold{fold}-train", X_train, y_train, fold_hash, params,
+                                               weight=weight, cache_dir=self.cache_dir)
+                valid_set = cached_lgb_dataset(f"fold{fold}-valid", X.iloc[valid_idx], y[valid_idx], fold_hash,
+                                               params, reference=train_set, cache_dir=self.cache_dir)
+            folds.append((train_set, valid_set))
+        return folds
+
+    def _advance(self, candidate: _Candidate, rounds: int, pool: ThreadPoolExecutor):
+        """Entraîne les boosters du candidat jusqu'à rounds tours (ou jusqu'à l'arrêt précoce)"""
+        while candidate.rounds < rounds and not candidate.stopped:
+            step = min(self.early_stopping_rounds, rounds - candidate.rounds)
+
+            def train_fold(fold):
+                booster, scores = candidate.boosters[fold], candidate.fold_scores[fold]
+                # Niveau de log de LightGBM propre à chaque thread : rappelé dans celui du pool
+                booster.reset_parameter({"verbosity": -1})
+                for _ in range(step):
+                    booster.update()
+                    scores.append(booster.eval_valid(feval=business_feval)[0][2])
+
+            list(pool.map(train_fold, range(len(candidate.boosters))))
+            if candidate.rounds - candidate.best_iteration >= self.early_stopping_rounds:
+                candidate.stopped = True
+
+    def fit(self, X, y):
+        y = np.asarray(y)
+        # n_estimators (de la grille ou des paramètres de base) : nombre maximal de tours
+        grid = dict(self.param_grid)
+        max_rounds = max(grid.pop("n_estimators", [self.estimator_params.get("n_estimators", 100)]))
+        cores = os.cpu_count() or 1
+        n_jobs = max(1, min(self.n_jobs if self.n_jobs > 0 else cores, cores))
+        num_threads = max(1, cores // n_jobs)
+
+        folds = self._build_folds(X, y)
+        candidates = []
+        for params in ParameterGrid(grid):
+            boosters = []
+            for train_set, valid_set in folds:
+                booster = lgb.Booster(self._booster_params(params, num_threads), train_set)
+                booster.add_valid(valid_set, "valid")
+                boosters.append(booster)
+            candidates.append(_Candidate(params, boosters))
+
+        # Paliers : max_rounds / eta^k, ..., max_rounds / eta, max_rounds
+        n_rungs = max(1, math.ceil(math.log(len(candidates), self.eta))) if len(candidates) > 1 else 1
+        budgets = [max(1, round(max_rounds / self.eta ** k)) for k in range(n_rungs - 1, -1, -1)]
+
+        alive = list(candidates)
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            for rung, budget in enumerate(budgets):
+                for candidate in alive:
+                    self._advance(candidate, budget, pool)
+                alive.sort(key=lambda c: c.best_score, reverse=True)
+                if self.verbose:
+                    print(f"Palier {rung + 1}/{len(budgets)} : {len(alive)} candidats, {budget} tours, "
+                          f"meilleur score {alive[0].best_score:.6f}")
+                if rung < len(budgets) - 1:
+                    kept = max(1, len(alive) // self.eta)
+                    for candidate in alive[kept:]:
+                        candidate.boosters = None  # libère les boosters éliminés
+                    alive = alive[:kept]
+
+        best = alive[0]
+        self.best_iteration_ = best.best_iteration
+        self.best_params_ = {**best.params, "n_estimators": self.best_iteration_}
+        self.best_score_ = best.best_score
+        self.cv_results_ = {
+            "params": [c.params for c in candidates],
+            "rounds": [c.rounds for c in candidates],
+            "best_iteration": [c.best_iteration for c in candidates],
+            "mean_test_score": [c.best_score for c in candidates],
+        }
+
+        # Réentraînement du meilleur candidat sur tout le jeu, avec tous les cœurs
+        params = {**self.estimator_params, **self.best_params_, "n_jobs": cores, "verbose": -1}
+        self.best_estimator_ = lgb.LGBMClassifier(**params).fit(X, y)
+        return self
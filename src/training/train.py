@@ -1,10 +1,7 @@
 import os
 import joblib
 import json
-import mlflow
-import mlflow.lightgbm
-import pandas as pd
-import datetime 
+import datetime
 import numpy as np
 
 from lightgbm import LGBMClassifier
@@ -17,51 +14,40 @@ from sklearn.pipeline import make_pipeline
 from src.training.scoring import optimize_decision_threshold
 from src.config.config import config
 from src.training.scoring import business_scorer
-
-def train_model():
-    """
-    Pipeline d'entraînement du modèle LightGBM
-    - Cross-validation stratifiée
-    - Optimisation des hyperparamètres (GridSearchCV)
-    - Score métier
-    - Tracking des expériences avec MLflow
-    - Enregistrement du modèle dans le Model Registry
-    """
-    print("Démarrage de l'entraînement du modèle...")
-
-    # 1. Chargement des données
-    X_train = pd.read_pickle(
-        os.path.join(config.DATA_DIR, "X_train.pkl")
-    )
-    y_train = pd.read_pickle(
-        os.path.join(config.DATA_DIR, "y_train.pkl")
-    )
-    X_test = pd.read_pickle(
-        os.path.join(config.DATA_DIR, "X_test.pkl")
-    )
-    y_test = pd.read_pickle(
-        os.path.join(config.DATA_DIR, "y_test.pkl")
-    )
-    
-    print(f"Dimensions après filtrage : X_train={X_train.shape}, X_test={X_test.shape}")
-
-    # 2. Initialisation MLflow (Le dossier 'mlruns' sera créé à la racine du projet s'il n'existe pas)
-    project_root = os.path.dirname(config.BASE_DIR)
-    tracking_uri = os.path.join(project_root, "mlruns")
-    mlflow.set_tracking_uri(f"file://{tracking_uri}")
-    print(f"Dossier MLflow créé : {tracking_uri}")
-
-    mlflow.set_experiment("credit_scoring_lgbm")
-    
-    # --- MODÈLES DE COMPARAISON (Baseline) ---
+from src.training.search import HalvingLGBMSearch
+from src.training.datasets import ensure_training_data, load_training_data
+
+# mlflow est importé à la publication : les étapes (baselines, recherche, seuil)
+# sont aussi utilisées par src.pipeline, sans tracking
+
+# Paramètres de base du modèle
+LGBM_PARAMS = {
+    "objective": "binary",
+    "class_weight": "balanced",
+    "random_state": 42
+}
+
+# Grille d’hyperparamètres
+PARAM_GRID = {
+    "num_leaves": [63],
+    "learning_rate": [0.1],
+    "n_estimators": [400],
+    "max_depth": [6, 8, 10],
+    "min_child_samples": [20, 50, 100],
+    "subsample": [0.8, 0.9, 1.0]
+}
+
+
+def evaluate_baselines(X_train, y_train, X_test, y_test) -> dict:
+    """Scores métier des modèles de comparaison (Dummy, régression logistique)"""
     print("Évaluation des modèles de référence...")
-    
+
     # A. Dummy Classifier
     dummy = DummyClassifier(strategy="stratified", random_state=42)
     dummy.fit(X_train, y_train)
     dummy_score = business_scorer(dummy, X_test, y_test)
     print(f"Dummy Business Score: {dummy_score:.4f}")
-    
+
     # B. Régression Logistique (Linéaire)
     # Mise à l'échelle (StandardScaler)
     logreg = make_pipeline(
@@ -72,36 +58,43 @@ def train_model():
     logreg_score = business_scorer(logreg, X_test, y_test)
     print(f"Logistic Regression Business Score: {logreg_score:.4f}")
 
-    # --- MODÈLE PRINCIPAL (LightGBM) ---
-    
-    # 3. Définition du modèle
-    lgbm_model = LGBMClassifier(
-        objective="binary",
-        class_weight="balanced",
-        n_jobs=-1,
-        random_state=42
-    )
-
-    # 4. Grille d’hyperparamètres
-    param_grid = {
-        "num_leaves": [63],
-        "learning_rate": [0.1],
-        "n_estimators": [400],
-        "max_depth": [6, 8, 10],
-        "min_child_samples": [20, 50, 100],
-        "subsample": [0.8, 0.9, 1.0]
+    return {
+        "dummy_business_score": float(dummy_score),
+        "logreg_business_score": float(logreg_score)
     }
 
-    # 5. Cross-validation
+
+def make_search(search: str = "halving", param_grid: dict = None, data_hash: str = None):
+    """
+    Recherche des hyperparamètres du LightGBM :
+    - "halving" : successive halving sur Dataset LightGBM partagés
+    - "grid" : GridSearchCV
+    """
+    param_grid = param_grid or PARAM_GRID
+
+    # Cross-validation
     cv = StratifiedKFold(
         n_splits=5,
         shuffle=True,
         random_state=42
     )
 
-    # 6. GridSearchCV
-    grid_search = GridSearchCV(
-        estimator=lgbm_model,
+    if search == "halving":
+        # Folds discrétisés une seule fois, candidats faibles éliminés par paliers,
+        # arrêt précoce sur le score métier ; LightGBM utilise tous les cœurs
+        return HalvingLGBMSearch(
+            estimator_params=LGBM_PARAMS,
+            param_grid=param_grid,
+            cv=cv,
+            eta=3,
+            early_stopping_rounds=50,
+            data_hash=data_hash
+        )
+
+    # Parallélisme porté par GridSearchCV seul (un thread par modèle) :
+    # pas de sursouscription des cœurs
+    return GridSearchCV(
+        estimator=LGBMClassifier(**LGBM_PARAMS, n_jobs=1),
         param_grid=param_grid,
         scoring=business_scorer,
         cv=cv,
@@ -110,25 +103,58 @@ def train_model():
         refit=True
     )
 
-    # 7. Entraînement + Tracking MLflow
-    run_name = f"LGBM_GridSearch_CV_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
-    with mlflow.start_run(run_name=run_name):
-        
-        # Log des scores baseline
-        mlflow.log_metric("dummy_business_score", dummy_score)
-        mlflow.log_metric("logreg_business_score", logreg_score)
 
-        grid_search.fit(X_train, y_train)
+def search_threshold(model, X_test, y_test) -> dict:
+    """
+    Meilleur seuil de décision sur le jeu de test (après entraînement), sans l'écrire :
+    le seuil servi par l'API n'est remplacé que par publish_model, avec son modèle
+    """
+    y_proba = model.predict_proba(X_test)[:, 1]
+    best_threshold_info = optimize_decision_threshold(
+        y_true=y_test,
+        y_proba=y_proba,
+        save=False
+    )
+    # La courbe complète n'est pas gardée : un point par probabilité distincte
+    return {
+        "best_threshold": best_threshold_info["best_threshold"],
+        "best_score": best_threshold_info["best_score"]
+    }
+
+
+def publish_model(best_model, best_params: dict, best_score: float, baselines: dict,
+                  threshold_info: dict, search: str = "halving", X_reference=None):
+    """
+    Tracking MLflow (scores baseline, hyperparamètres, score métier, modèle dans le
+    Model Registry), sauvegarde locale du modèle et du seuil ; avec X_reference,
+    profil de référence de la surveillance du drift de l'API
+    """
+    import mlflow
+    import mlflow.lightgbm
+
+    # Initialisation MLflow (Le dossier 'mlruns' sera créé à la racine du projet s'il n'existe pas)
+    project_root = os.path.dirname(config.BASE_DIR)
+    tracking_uri = os.path.join(project_root, "mlruns")
+    mlflow.set_tracking_uri(f"file://{tracking_uri}")
+    print(f"Dossier MLflow créé : {tracking_uri}")
 
-        best_model = grid_search.best_estimator_
+    mlflow.set_experiment("credit_scoring_lgbm")
+
+    search_name = "Halving" if search == "halving" else "GridSearch"
+    run_name = f"LGBM_{search_name}_CV_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    with mlflow.start_run(run_name=run_name):
+
+        # Log des scores baseline
+        for name, score in baselines.items():
+            mlflow.log_metric(name, score)
 
         # Log des hyperparamètres
-        mlflow.log_params(grid_search.best_params_)
+        mlflow.log_params(best_params)
 
         # Log métrique métier
         mlflow.log_metric(
             "business_score",
-            grid_search.best_score_
+            best_score
         )
 
         # Log modèle dans le registry
@@ -137,7 +163,6 @@ def train_model():
             artifact_path="model",
             registered_model_name="credit_scoring_lgbm"
         )
-        
 
         # Sauvegarde locale (backup)
         os.makedirs(config.MODELS_DIR, exist_ok=True)
@@ -146,17 +171,56 @@ def train_model():
             os.path.join(config.MODELS_DIR, "final_model_LightGBM.pkl")
         )
 
-        # 7. Recherche du meilleur seuil sur le jeu de test (après entraînement)
-        y_proba = best_model.predict_proba(X_test)[:, 1]
-        best_threshold_info = optimize_decision_threshold(
-            y_true=y_test,
-            y_proba=y_proba
-        )
         # Sauvegarde du seuil
         with open(os.path.join(config.DATA_DIR, "best_threshold.json"), "w") as f:
-            json.dump(best_threshold_info, f)
+            json.dump(threshold_info, f)
+
+        # Profil de référence (features d'entraînement, probabilités du modèle) pour /monitoring/drift
+        if X_reference is not None:
+            from src.api.drift import build_reference_profile
+
+            build_reference_profile(best_model, X_reference)
 
         print("Entraînement terminé – modèle enregistré dans MLflow")
 
+
+def train_model(search: str = "halving"):
+    """
+    Pipeline d'entraînement du modèle LightGBM
+    - Cross-validation stratifiée
+    - Optimisation des hyperparamètres (successive halving sur Dataset LightGBM partagés,
+      ou GridSearchCV avec search="grid")
+    - Score métier
+    - Tracking des expériences avec MLflow
+    - Enregistrement du modèle dans le Model Registry
+    Chaque étape est refaite ; src.pipeline ne refait que les étapes modifiées.
+    """
+    print("Démarrage de l'entraînement du modèle...")
+
+    # 1. Chargement des données (format colonne en memory-map, reconverti si les pickles ont changé)
+    ensure_training_data()
+    X_train, y_train, X_test, y_test, data_meta = load_training_data()
+
+    print(f"Dimensions après filtrage : X_train={X_train.shape}, X_test={X_test.shape}")
+
+    # 2. Modèles de comparaison (Baseline)
+    baselines = evaluate_baselines(X_train, y_train, X_test, y_test)
+
+    # 3. Recherche des hyperparamètres du modèle principal (LightGBM)
+    grid_search = make_search(search, data_hash=data_meta["hash"])
+    grid_search.fit(X_train, y_train)
+
+    # 4. Recherche du meilleur seuil, puis tracking et sauvegarde
+    threshold_info = search_threshold(grid_search.best_estimator_, X_test, y_test)
+    publish_model(
+        grid_search.best_estimator_,
+        grid_search.best_params_,
+        grid_search.best_score_,
+        baselines,
+        threshold_info,
+        search,
+        X_reference=X_train
+    )
+
 if __name__ == "__main__":
     train_model()
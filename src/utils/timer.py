@@ -7,14 +7,15 @@ from contextlib import contextmanager
 @contextmanager
 def timer(message: str):
     spinner_chars = ['|', '/', '-', '\\']
-    stop_spinner = False
+    # Event plutôt que sleep : le spinner s'arrête dès la fin du bloc (sinon jusqu'à 0,1 s d'attente)
+    stop_spinner = threading.Event()
 
     def spinner():
         i = 0
-        while not stop_spinner:
+        while not stop_spinner.is_set():
             sys.stdout.write(f'\r[{spinner_chars[i % len(spinner_chars)]}] {message}...')
             sys.stdout.flush()
-            time.sleep(0.1)
+            stop_spinner.wait(0.1)
             i += 1
 
     # Démarre le spinner dans un thread séparé
@@ -26,7 +27,7 @@ def timer(message: str):
         yield
     finally:
         end = time.time()
-        stop_spinner = True
+        stop_spinner.set()
         thread.join()  # Attend que le thread se termine
         sys.stdout.write('\r' + ' ' * (len(message) + 10) + '\r')  # Efface la ligne du spinner
         print(f"[--] {message} terminé en {end - start:.2f} sec [--]\n")
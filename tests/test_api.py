@@ -64,3 +64,321 @@ def test_predict_invalid_payload():
 
     # FastAPI doit refuser la requête
     assert response.status_code == 422  # Unprocessable Entity
+
+
+
+# Client valide réutilisé par les tests suivants
+VALID_PAYLOAD = {
+    "DAYS_BIRTH": -12000,
+    "DAYS_EMPLOYED": -2000,
+    "bureau_DAYS_CREDIT_UPDATE_mean": -30.0,
+    "REGION_RATING_CLIENT_W_CITY": 2,
+    "NAME_INCOME_TYPE_Working": 1,
+    "DAYS_LAST_PHONE_CHANGE": -1000,
+    "DAYS_ID_PUBLISH": -3000,
+    "EXT_SOURCE_1": 0.45,
+    "EXT_SOURCE_2": 0.62,
+    "EXT_SOURCE_3": 0.58
+}
+
+
+def test_predict_batch_matches_single():
+    """
+    Test du endpoint /predict/batch : mêmes résultats que /predict, client par client
+    """
+    other = dict(VALID_PAYLOAD, EXT_SOURCE_2=0.15, EXT_SOURCE_3=0.2)
+
+    response = client.post("/predict/batch", json=[VALID_PAYLOAD, other])
+    assert response.status_code == 200
+
+    json_response = response.json()
+    assert json_response["count"] == 2
+
+    # Chaque résultat doit être identique à l'appel unitaire
+    for item, result in zip([VALID_PAYLOAD, other], json_response["results"]):
+        single = client.post("/predict", json=item).json()
+        assert result["decision"] == single["decision"]
+        assert abs(result["probability_default"] - single["probability_default"]) < 1e-9
+        assert result["feature_names"] == single["feature_names"]
+
+
+def test_predict_batch_too_large(monkeypatch):
+    """
+    Un lot dépassant la taille maximale configurée doit être refusé
+    """
+    from src.config.config import config
+    monkeypatch.setattr(config, "API_MAX_BATCH_SIZE", 1)
+
+    response = client.post("/predict/batch", json=[VALID_PAYLOAD, VALID_PAYLOAD])
+
+    assert response.status_code == 413  # Payload Too Large
+
+
+def test_predict_fast_path_matches_dataframe_path():
+    """
+    La ligne NumPy préallouée doit donner exactement la même probabilité
+    et les mêmes valeurs SHAP que l'ancien chemin pd.DataFrame + predict_proba
+    """
+    import numpy as np
+    import pandas as pd
+    from src.api import app as api
+
+    bundle = api.registry.current
+    df = pd.DataFrame([VALID_PAYLOAD])
+    expected_proba = bundle.model.predict_proba(df)[0][1]
+    expected_shap, _ = api._shap_outputs(bundle, bundle.explainer.shap_values(df))
+
+    json_response = client.post("/predict", json=VALID_PAYLOAD).json()
+
+    assert json_response["probability_default"] == float(expected_proba)
+    assert json_response["feature_names"] == df.columns.tolist()
+    np.testing.assert_allclose(json_response["shap_values"], expected_shap[0])
+
+
+def test_predict_without_explanation():
+    """
+    explain=false : décision seule, sans champs SHAP
+    """
+    response = client.post("/predict?explain=false", json=VALID_PAYLOAD)
+    assert response.status_code == 200
+
+    json_response = response.json()
+    assert "probability_default" in json_response
+    assert "shap_values" not in json_response
+
+
+def test_explain_endpoint_uses_cache():
+    """
+    /explain réutilise l'explication calculée par /predict pour le même client
+    """
+    from src.api.app import explain_cache
+
+    explain_cache.clear()
+    payload = dict(VALID_PAYLOAD, DAYS_BIRTH=-15000)
+
+    predicted = client.post("/predict", json=payload).json()
+    response = client.post("/explain", json=payload)
+    assert response.status_code == 200
+
+    json_response = response.json()
+    assert json_response["cached"] is True
+    assert json_response["shap_values"] == predicted["shap_values"]
+
+
+def test_predict_resubmission_hits_cache():
+    """
+    Une même demande soumise deux fois est servie par le cache de prédictions
+    """
+    from src.api.app import prediction_cache
+
+    payload = dict(VALID_PAYLOAD, DAYS_ID_PUBLISH=-1234)
+    first = client.post("/predict?explain=false", json=payload).json()
+    hits = prediction_cache.hits
+    second = client.post("/predict?explain=false", json=payload).json()
+
+    assert prediction_cache.hits == hits + 1
+    assert second == first
+
+    stats = client.get("/cache/stats").json()
+    assert stats["predictions"]["hits"] >= 1
+
+
+def test_admin_reload_swaps_bundle_and_keeps_serving():
+    """
+    Un rechargement construit un nouveau bundle et l'échange ;
+    la version active est exposée sur / et dans les réponses
+    """
+    from src.api.app import registry
+
+    client.post("/predict?explain=false", json=VALID_PAYLOAD)
+    previous = registry.current
+
+    response = client.post("/admin/reload")
+    assert response.status_code == 200
+    assert registry.current is not previous
+
+    version = client.get("/").json()["model_version"]
+    assert response.json()["model_version"] == version
+    assert client.post("/predict", json=VALID_PAYLOAD).json()["model_version"] == version
+
+
+def test_ready_probe_reports_startup_and_memory():
+    """
+    /ready répond 200 une fois le modèle échauffé, avec le démarrage à froid
+    et la mémoire du worker
+    """
+    from src.api.app import registry
+
+    registry.ensure_ready()
+    response = client.get("/ready")
+    assert response.status_code == 200
+
+    json_response = response.json()
+    assert json_response["ready"] is True
+    assert json_response["rss_mb"] > 0
+    assert "startup_seconds" in json_response
+
+
+def test_predict_microbatching_keeps_contract(monkeypatch):
+    """
+    Avec le micro-batching activé, /predict renvoie la même réponse
+    """
+    from src.api.app import config
+
+    expected = client.post("/predict", json=VALID_PAYLOAD).json()
+
+    monkeypatch.setattr(config, "MICROBATCH_ENABLED", True)
+    response = client.post("/predict", json=VALID_PAYLOAD)
+
+    assert response.status_code == 200
+    assert response.json() == expected
+
+
+def test_metrics_endpoint_exposes_stage_histograms():
+    """
+    /metrics expose, au format Prometheus, les durées par étape et les compteurs de requêtes
+    """
+    client.post("/predict", json=dict(VALID_PAYLOAD, DAYS_EMPLOYED=-2500))
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    body = response.text
+    for stage in ("validation", "features", "inference", "shap"):
+        assert f'scoring_stage_duration_seconds_count{{stage="{stage}"}}' in body
+    assert 'scoring_requests_total{endpoint="/predict",status="200"}' in body
+    assert "scoring_requests_in_flight" in body
+
+
+def test_predict_by_id_reads_feature_store(tmp_path, monkeypatch):
+    """
+    /predict/by_id score les features du feature store comme /predict
+    les features envoyées ; client inconnu -> 404
+    """
+    import pandas as pd
+
+    from src.api import app as api
+    from src.api.feature_store import OnlineFeatureStore, build_feature_store
+
+    features = pd.DataFrame([{"SK_ID_CURR": 100002, **VALID_PAYLOAD}])
+    build_feature_store(features, str(tmp_path / "store"))
+    monkeypatch.setattr(api, "feature_store", OnlineFeatureStore(str(tmp_path / "store")))
+
+    response = client.post("/predict/by_id?explain=false", json={"SK_ID_CURR": 100002})
+    assert response.status_code == 200
+    expected = client.post("/predict?explain=false", json=VALID_PAYLOAD).json()
+    assert response.json() == {"SK_ID_CURR": 100002, **expected}
+
+    assert client.post("/predict/by_id", json={"SK_ID_CURR": 1}).status_code == 404
+
+
+def test_predict_by_id_without_store_is_unavailable(tmp_path, monkeypatch):
+    """
+    Feature store non construit : 503
+    """
+    from src.api import app as api
+    from src.api.feature_store import OnlineFeatureStore
+
+    monkeypatch.setattr(api, "feature_store", OnlineFeatureStore(str(tmp_path / "absent")))
+    assert client.post("/predict/by_id", json={"SK_ID_CURR": 100002}).status_code == 503
+
+
+def test_monitoring_drift_compares_recent_requests(tmp_path, monkeypatch):
+    """
+    Les requêtes /predict et /predict/batch sont gardées par le moniteur et comparées
+    au profil de référence ; sans profil : 503
+    """
+    import numpy as np
+    import pandas as pd
+
+    from src.api import app as api
+    from src.api.drift import LiveDriftMonitor, PROBABILITY_COLUMN
+    from src.monitoring.drift import ReferenceProfile
+
+    rng = np.random.default_rng(0)
+    reference = pd.DataFrame({name: rng.normal(VALID_PAYLOAD[name], 1, 500) for name in api.FEATURE_NAMES})
+    reference[PROBABILITY_COLUMN] = rng.random(500)
+    ReferenceProfile.from_frame(reference).save(str(tmp_path / "reference.json"))
+
+    monitor = LiveDriftMonitor(api.FEATURE_NAMES, str(tmp_path / "reference.json"), capacity=100, interval=0)
+    monkeypatch.setattr(api, "drift_monitor", monitor)
+    client.post("/predict?explain=false", json=VALID_PAYLOAD)
+    client.post("/predict/batch?explain=false", json=[VALID_PAYLOAD, dict(VALID_PAYLOAD, EXT_SOURCE_2=0.1)])
+
+    response = client.get("/monitoring/drift")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["window"] == 3 and body["recorded"] == 3
+    assert {f["column"] for f in body["features"]} == {*api.FEATURE_NAMES, PROBABILITY_COLUMN}
+
+    monkeypatch.setattr(api, "drift_monitor", LiveDriftMonitor(api.FEATURE_NAMES, str(tmp_path / "absent.json")))
+    assert client.get("/monitoring/drift").status_code == 503
+
+
+def test_prediction_log_records_decisions(tmp_path, monkeypatch):
+    """
+    Chaque décision de /predict et /predict/batch est journalisée avec ses features,
+    sa probabilité, le seuil et la version du modèle
+    """
+    from src.api import app as api
+    from src.api.prediction_log import PredictionLogger, read_prediction_log
+
+    logger = PredictionLogger(str(tmp_path), api.FEATURE_NAMES)
+    monkeypatch.setattr(api, "prediction_log", logger)
+    single = client.post("/predict?explain=false", json=VALID_PAYLOAD).json()
+    batch = client.post("/predict/batch?explain=false", json=[VALID_PAYLOAD, VALID_PAYLOAD]).json()
+    logger.stop()
+
+    log = read_prediction_log(str(tmp_path))
+    assert log["endpoint"].tolist() == ["/predict", "/predict/batch", "/predict/batch"]
+    assert log["probability_default"].tolist() == [single["probability_default"]] + [
+        r["probability_default"] for r in batch["results"]
+    ]
+    assert (log["model_version"] == single["model_version"]).all()
+    assert (log["threshold_used"] == single["threshold_used"]).all()
+    assert log.loc[0, api.FEATURE_NAMES].tolist() == [float(VALID_PAYLOAD[name]) for name in api.FEATURE_NAMES]
+    assert (log["latency_ms"] > 0).all()
+
+
+def test_blocking_prediction_log_runs_off_event_loop(tmp_path, monkeypatch):
+    """
+    Micro-batching et politique "block" : la décision est journalisée dans un thread,
+    la boucle d'événements n'attend pas qu'une place se libère dans la file
+    """
+    import asyncio
+
+    from src.api import app as api
+    from src.api.prediction_log import PredictionLogger
+
+    logger = PredictionLogger(str(tmp_path), api.FEATURE_NAMES, policy="block")
+    on_loop = []
+    log = logger.log
+
+    def tracked_log(*args):
+        on_loop.append(asyncio._get_running_loop() is not None)
+        log(*args)
+
+    monkeypatch.setattr(logger, "log", tracked_log)
+    monkeypatch.setattr(api, "prediction_log", logger)
+    monkeypatch.setattr(api.config, "MICROBATCH_ENABLED", True)
+
+    assert client.post("/predict?explain=false", json=VALID_PAYLOAD).status_code == 200
+    logger.stop()
+    assert on_loop == [False]
+
+
+def test_api_import_does_not_load_pandas():
+    """
+    Démarrage à froid sans préchargement : ni pandas ni le moteur de drift ne sont importés
+    """
+    import os
+    import subprocess
+    import sys
+
+    code = "import sys, src.api.app; print(sorted(m for m in ('pandas', 'src.monitoring') if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+        env={**os.environ, "API_PRELOAD": "0"}
+    )
+    assert result.stdout.strip() == "[]"
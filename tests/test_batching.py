@@ -0,0 +1,47 @@
+import asyncio
+
+from src.api.batching import MicroBatcher
+
+
+def test_microbatcher_coalesces_concurrent_requests():
+    """
+    Des requêtes concurrentes sont regroupées en lots, et chaque appelant
+    reçoit le résultat de son propre élément
+    """
+    batch_sizes = []
+
+    def score(items):
+        batch_sizes.append(len(items))
+        return [item * 10 for item in items]
+
+    async def main():
+        batcher = MicroBatcher(score, max_batch_size=8, max_wait_ms=5)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(20)))
+        batcher.stop()
+        return results
+
+    results = asyncio.run(main())
+
+    assert results == [i * 10 for i in range(20)]
+    assert sum(batch_sizes) == 20
+    assert max(batch_sizes) <= 8
+    assert len(batch_sizes) < 20
+
+
+def test_microbatcher_propagates_errors():
+    """
+    Une erreur de scoring est renvoyée à tous les appelants du lot
+    """
+    def score(items):
+        raise ValueError("boom")
+
+    async def main():
+        batcher = MicroBatcher(score)
+        try:
+            await batcher.submit(1)
+        except ValueError as e:
+            return str(e)
+        finally:
+            batcher.stop()
+
+    assert asyncio.run(main()) == "boom"
@@ -0,0 +1,31 @@
+import copy
+
+from benchmarks.bench_load import compare, make_clients, make_plan, run_benchmark
+
+
+def test_load_plan_is_reproducible():
+    """Même graine : mêmes dossiers et même séquence de requêtes ; le mélange respecte ses parts"""
+    plan = make_plan("mixed", 500, make_clients(50, seed=3), seed=3)
+    assert plan == make_plan("mixed", 500, make_clients(50, seed=3), seed=3)
+    assert plan != make_plan("mixed", 500, make_clients(50, seed=4), seed=4)
+    urls = [url for url, _ in plan]
+    assert 0.6 < urls.count("/predict?explain=false") / len(plan) < 0.8
+    assert all(len(body) == 20 for url, body in plan if url.startswith("/predict/batch"))
+
+
+def test_load_benchmark_flags_regressions():
+    """Run in-process réel, puis comparaison à un run deux fois plus lent"""
+    run = run_benchmark(transport=["inprocess"], mix=["mixed"], concurrency=[2], requests=40, warmup=5, clients=20)
+    result = run["results"]["inprocess/mixed/c2"]
+    assert result["requests"] == 40 and result["errors"] == 0
+    assert 0 < result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"] <= result["max_ms"]
+
+    assert not any(row["regression"] for row in compare(run, run))
+
+    slower = copy.deepcopy(run)
+    degraded = slower["results"]["inprocess/mixed/c2"]
+    for metric in ("p50_ms", "p95_ms", "p99_ms"):
+        degraded[metric] = result[metric] * 2 + 1
+    degraded["throughput_rps"] = result["throughput_rps"] / 2
+    flagged = {row["metric"] for row in compare(run, slower) if row["regression"]}
+    assert flagged == {"p50_ms", "p95_ms", "p99_ms", "throughput_rps"}
@@ -0,0 +1,86 @@
+import numpy as np
+
+from src.api.cache import LRUCache, client_key
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """
+    Le cache borné évince l'entrée la moins récemment utilisée
+    """
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" devient la plus récente
+    cache.set("c", 3)           # "b" est évincée
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_client_key_is_canonical():
+    """
+    Deux lignes de mêmes valeurs (int ou float) ont la même clé
+    """
+    assert client_key(np.array([[2, -1000]])) == client_key(np.array([[2.0, -1000.0]]))
+    assert client_key(np.array([[2.0, -1000.0]])) != client_key(np.array([[2.0, -1001.0]]))
+
+
+def test_lru_cache_ttl_and_generation(monkeypatch):
+    """
+    Les entrées expirent après le TTL, et le cache se vide quand la génération change
+    """
+    import src.api.cache as cache_module
+
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+
+    cache = LRUCache(maxsize=10, ttl=60)
+    cache.set_generation(("v1", 0.5))
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    now[0] += 61
+    assert cache.get("a") is None  # expirée
+
+    cache.set("b", 2)
+    cache.set_generation(("v1", 0.4))  # nouveau seuil
+    assert cache.get("b") is None
+
+
+def test_registry_swaps_on_threshold_change(tmp_path):
+    """
+    Le registre recharge le bundle quand le fichier de seuil change,
+    et prévient les abonnés (invalidation des caches)
+    """
+    import json
+    import shutil
+    from src.api.app import MODEL_PATH
+    from src.api.registry import ModelRegistry
+
+    model_path = tmp_path / "model.pkl"
+    threshold_path = tmp_path / "best_threshold.json"
+    shutil.copy(MODEL_PATH, model_path)
+    threshold_path.write_text(json.dumps({"best_threshold": 0.5}))
+
+    registry = ModelRegistry(str(model_path), str(threshold_path), poll_interval=0)
+    swapped = []
+    registry.on_swap(swapped.append)
+    registry.load()
+    assert registry.reload() is False  # rien n'a changé
+
+    threshold_path.write_text(json.dumps({"best_threshold": 0.35}))
+    assert registry.reload() is True
+    assert registry.current.threshold == 0.35
+    assert len(swapped) == 2
+
+
+def test_warmup_bundle_without_explainer():
+    """Échauffement d'un bundle chargé sans explainer SHAP : inférence seule, sans erreur"""
+    from src.api.registry import DEFAULT_MODEL_PATH, DEFAULT_THRESHOLD_PATH, load_bundle, warmup_bundle
+
+    bundle = load_bundle(DEFAULT_MODEL_PATH, DEFAULT_THRESHOLD_PATH, with_explainer=False)
+    assert bundle.explainer is None
+    warmup_bundle(bundle)
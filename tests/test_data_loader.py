@@ -0,0 +1,107 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.data_loader import load_table
+from src.preprocessing.preprocess import Preprocessor
+
+
+def _write_table(path, n=100):
+    df = pd.DataFrame({
+        "SK_ID_CURR": np.arange(n),
+        "AMT_CREDIT": np.linspace(1000.0, 2000.0, n),
+        "DAYS_EMPLOYED": np.where(np.arange(n) % 10 == 0, 365243, -np.arange(n)),
+        "NAME_CONTRACT_TYPE": np.where(np.arange(n) % 2 == 0, "Cash loans", "Revolving loans"),
+    })
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_load_table_builds_downcast_cache_and_projects_columns(tmp_path):
+    """
+    Le premier chargement crée un cache Parquet aux types réduits ;
+    la projection ne lit que les colonnes demandées
+    """
+    source = _write_table(tmp_path / "application_test.csv")
+
+    df = load_table("application_test.csv", data_dir=str(tmp_path))
+    assert os.path.exists(tmp_path / "cache" / "application_test.parquet")
+    assert df["SK_ID_CURR"].dtype == np.int32
+    assert df["AMT_CREDIT"].dtype == np.float32
+    assert df["NAME_CONTRACT_TYPE"].dtype == "category"
+    np.testing.assert_allclose(df["AMT_CREDIT"], source["AMT_CREDIT"], rtol=1e-6)
+
+    projected = load_table("application_test.csv", columns=["SK_ID_CURR"], data_dir=str(tmp_path))
+    assert list(projected.columns) == ["SK_ID_CURR"]
+
+
+def test_load_table_rebuilds_cache_when_source_changes(tmp_path):
+    """
+    Le cache est invalidé dès que le CSV source est modifié
+    """
+    _write_table(tmp_path / "bureau.csv", n=100)
+    assert len(load_table("bureau.csv", data_dir=str(tmp_path))) == 100
+
+    _write_table(tmp_path / "bureau.csv", n=50)
+    assert len(load_table("bureau.csv", data_dir=str(tmp_path))) == 50
+
+
+def test_preprocessor_same_output_from_cache_and_csv(tmp_path):
+    """
+    Les colonnes category du cache donnent le même préprocessing que le CSV brut
+    """
+    _write_table(tmp_path / "application_train.csv")
+    raw = pd.read_csv(tmp_path / "application_train.csv")
+    cached = load_table("application_train.csv", data_dir=str(tmp_path))
+
+    expected = Preprocessor()
+    expected.fit(raw)
+    result = Preprocessor()
+    result.fit(cached)
+
+    assert result.final_columns == expected.final_columns
+    pd.testing.assert_frame_equal(
+        result.transform(cached).astype(np.float64),
+        expected.transform(raw).astype(np.float64),
+        rtol=1e-6,
+    )
+
+
+def test_cold_cache_builds_are_bounded(tmp_path, monkeypatch):
+    """
+    Caches construits en parallèle : au plus CACHE_BUILD_WORKERS CSV lus à la fois,
+    sans fichier temporaire laissé dans le cache
+    """
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    import src.data_loader as data_loader
+
+    for i in range(6):
+        _write_table(tmp_path / f"table_{i}.csv")
+
+    read_csv = pd.read_csv
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def tracked_read_csv(*args, **kwargs):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        try:
+            return read_csv(*args, **kwargs)
+        finally:
+            with lock:
+                running[0] -= 1
+
+    monkeypatch.setattr(data_loader.pd, "read_csv", tracked_read_csv)
+    with ThreadPoolExecutor(6) as pool:
+        tables = list(pool.map(lambda i: load_table(f"table_{i}.csv", data_dir=str(tmp_path)), range(6)))
+
+    assert peak[0] <= data_loader.CACHE_BUILD_WORKERS
+    assert all(len(df) == 100 for df in tables)
+    assert sorted(os.listdir(tmp_path / "cache")) == sorted(
+        f"table_{i}.{ext}" for i in range(6) for ext in ("json", "parquet")
+    )
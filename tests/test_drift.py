@@ -0,0 +1,117 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config.config import config
+from src.monitoring.drift import DriftStatistics, ReferenceProfile, drift_summary
+
+
+def _frame(n, seed, shift=0.0, income=("Working", "Pensioner", "Commercial associate")):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "EXT_SOURCE_2": rng.beta(5, 3, n) + shift,
+        "DAYS_EMPLOYED": rng.integers(-15000, 0, n),
+        "AMT_CREDIT": rng.lognormal(13, 0.5, n),
+        "NAME_INCOME_TYPE": rng.choice(income, n),
+    })
+    df.loc[rng.random(n) < 0.1, "AMT_CREDIT"] = np.nan
+    return df
+
+
+def test_drift_metrics_detect_shift_and_broken_feed():
+    """
+    Pas de dérive sur un échantillon de la même loi ; dérive d'une colonne décalée,
+    d'une source devenue vide et d'une nouvelle répartition des modalités
+    """
+    profile = ReferenceProfile.from_frame(_frame(20000, 0))
+    same = DriftStatistics(profile).update(_frame(5000, 1)).metrics()
+    assert not same["drift"].any()
+    assert same["psi"].max() < 0.01
+
+    current = _frame(5000, 2, shift=0.15, income=("Working", "Unemployed"))
+    current["DAYS_EMPLOYED"] = np.nan
+    metrics = DriftStatistics(profile).update(current).metrics().set_index("column")
+    assert metrics.loc[["EXT_SOURCE_2", "DAYS_EMPLOYED", "NAME_INCOME_TYPE"], "drift"].all()
+    assert not metrics.loc["AMT_CREDIT", "drift"]
+    assert metrics.loc["DAYS_EMPLOYED", "null_rate_current"] == 1.0
+    assert metrics.loc["AMT_CREDIT", "null_rate_reference"] == pytest.approx(0.1, abs=0.01)
+    assert drift_summary(metrics.reset_index())["dataset_drift"]
+
+
+def test_drift_ks_matches_exact_statistic():
+    """KS approché sur la grille des centiles : à 1 % près du KS exact"""
+    from scipy.stats import ks_2samp
+
+    reference, current = _frame(20000, 0), _frame(5000, 3, shift=0.05)
+    profile = ReferenceProfile.from_frame(reference)
+    metrics = DriftStatistics(profile).update(current).metrics().set_index("column")
+    for col in ("EXT_SOURCE_2", "AMT_CREDIT"):
+        exact = ks_2samp(reference[col].dropna(), current[col].dropna()).statistic
+        assert metrics.loc[col, "ks"] == pytest.approx(exact, abs=0.011)
+
+
+def test_drift_chunks_merge_and_saved_profile(tmp_path):
+    """Blocs traités séparément puis fusionnés, profil relu depuis le JSON : mêmes métriques"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    profile = ReferenceProfile.from_frame(_frame(20000, 0))
+    current = _frame(6000, 4, shift=0.05)
+    expected = DriftStatistics(profile).update(current).metrics()
+
+    profile.save(str(tmp_path / "profile.json"))
+    reloaded = ReferenceProfile.load(str(tmp_path / "profile.json"))
+    with ThreadPoolExecutor(2) as pool:
+        parts = [DriftStatistics(reloaded).update(current.iloc[i:i + 1000], pool) for i in range(0, 6000, 1000)]
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    pd.testing.assert_frame_equal(merged.metrics(), expected)
+
+
+def test_run_data_drift_streams_against_stored_profile(tmp_path, monkeypatch):
+    """Profil calculé au premier appel puis réutilisé ; TARGET (absente du test) ignorée"""
+    from src.monitoring.data_drift import run_data_drift
+
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "REPORTING_DIR", str(tmp_path / "report"))
+    train = _frame(3000, 0).assign(TARGET=0)
+    train.to_csv(tmp_path / "application_train.csv", index=False)
+    _frame(2500, 5, shift=0.2).to_csv(tmp_path / "application_test.csv", index=False)
+    profile_path = str(tmp_path / "reference_profile.json")
+
+    summary = run_data_drift(profile_path=profile_path, chunksize=1000)
+    assert summary["n_columns"] == 4 and summary["n_rows_current"] == 2500
+    assert summary["drifted_columns"] == ["EXT_SOURCE_2"]
+    assert set(ReferenceProfile.load(profile_path).columns) == {"EXT_SOURCE_2", "DAYS_EMPLOYED", "AMT_CREDIT",
+                                                                "NAME_INCOME_TYPE"}
+
+    modified = os.path.getmtime(profile_path)
+    assert run_data_drift(profile_path=profile_path, chunksize=700) == summary
+    assert os.path.getmtime(profile_path) == modified
+    with open(tmp_path / "report" / "data_drift.json") as f:
+        assert json.load(f) == summary
+
+
+def test_run_data_drift_same_file_as_reference(tmp_path, monkeypatch):
+    """
+    Fichier courant identique à la référence : PSI et KS nuls, y compris pour des
+    décimales répétées (profil calculé sur le cache float32, courant lu en float64)
+    """
+    from src.monitoring.data_drift import run_data_drift
+
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "REPORTING_DIR", str(tmp_path / "report"))
+    rng = np.random.default_rng(0)
+    current = _frame(3000, 0).assign(
+        REGION_POPULATION_RELATIVE=rng.choice([0.0188, 0.035792, 0.00702, 0.010032, 0.072508], 3000)
+    )
+    current.assign(TARGET=0).to_csv(tmp_path / "application_train.csv", index=False)
+    current.to_csv(tmp_path / "application_test.csv", index=False)
+
+    run_data_drift(profile_path=str(tmp_path / "reference_profile.json"), chunksize=1000)
+    metrics = pd.read_csv(tmp_path / "report" / "data_drift.csv")
+    assert np.allclose(metrics["psi"], 0)
+    assert np.allclose(metrics["ks"].dropna(), 0)
@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+
+from src.preprocessing.feature_engineering import FeatureEngineer
+
+
+def _make_table(n=5000, seed=0):
+    """Table secondaire factice : clés non triées et manquantes, NaN, types mélangés"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "SK_ID_CURR": rng.integers(0, 500, n).astype(np.float64),
+        "SK_ID_PREV": rng.integers(0, 10**6, n),
+        "CNT_INSTALMENT": rng.integers(0, 60, n).astype(np.int32),
+        "AMT_PAYMENT": rng.uniform(0, 1e5, n),
+        "DAYS_ENTRY_PAYMENT": -rng.integers(0, 3000, n).astype(np.float32),
+        "NAME_CONTRACT_STATUS": rng.choice(["Active", "Completed"], n),
+    })
+    df.loc[rng.random(n) < 0.05, "SK_ID_CURR"] = np.nan
+    df.loc[rng.random(n) < 0.2, "AMT_PAYMENT"] = np.nan
+    df.loc[df["SK_ID_CURR"] == 7, "AMT_PAYMENT"] = np.nan  # groupe sans aucune valeur
+    return df
+
+
+def test_numpy_engine_matches_pandas_engine():
+    """
+    Le moteur NumPy donne les mêmes colonnes, clés, types et valeurs que groupby/agg
+    """
+    fe = FeatureEngineer()
+    df = _make_table()
+
+    expected = fe.aggregate_numeric(df, "SK_ID_CURR", "ins", engine="pandas")
+    result = fe.aggregate_numeric(df, "SK_ID_CURR", "ins", engine="numpy")
+
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
+    assert (result.dtypes == expected.dtypes).all()
+
+
+def test_numpy_engine_exact_on_float32():
+    """
+    Colonnes float32 du cache : sommes et moyennes identiques bit à bit à pandas
+    """
+    fe = FeatureEngineer()
+    df = _make_table(n=20000)
+    df["AMT_PAYMENT"] = (df["AMT_PAYMENT"] * 1.37).astype(np.float32)
+    df["SK_ID_CURR"] = df["SK_ID_CURR"].fillna(0).astype(np.int64) % 40  # groupes de ~500 lignes
+
+    expected = fe.aggregate_numeric(df, "SK_ID_CURR", "ins", engine="pandas")
+    result = fe.aggregate_numeric(df, "SK_ID_CURR", "ins")
+
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
+    assert result["ins_AMT_PAYMENT_sum"].dtype == np.float32
+
+
+def test_numpy_engine_on_sorted_integer_keys():
+    """
+    Table déjà triée par une clé entière : même résultat, sans réordonner les lignes
+    """
+    fe = FeatureEngineer()
+    df = _make_table().dropna(subset=["SK_ID_CURR"]).sort_values("SK_ID_CURR")
+    df["SK_ID_CURR"] = df["SK_ID_CURR"].astype(np.int64)
+
+    pd.testing.assert_frame_equal(
+        fe.aggregate_numeric(df, "SK_ID_CURR", "prev", engine="numpy"),
+        fe.aggregate_numeric(df, "SK_ID_CURR", "prev", engine="pandas"),
+        check_exact=True,
+    )
+
+
+def test_numpy_engine_integer_sum_overflow():
+    """
+    Somme int32 au-delà de 2**31 : int64 comme pandas, sans débordement
+    """
+    fe = FeatureEngineer()
+    df = pd.DataFrame({
+        "SK_ID_CURR": [1, 1, 2],
+        "AMT": np.array([2_000_000_000, 2_000_000_000, 1], dtype=np.int32),
+        "CNT": np.array([1, 2, 3], dtype=np.int32),
+    })
+
+    expected = fe.aggregate_numeric(df, "SK_ID_CURR", "prev", engine="pandas")
+    result = fe.aggregate_numeric(df, "SK_ID_CURR", "prev", engine="numpy")
+
+    pd.testing.assert_frame_equal(result, expected)
+    assert result["prev_AMT_sum"].tolist() == [4_000_000_000, 1]
+    assert result["prev_AMT_sum"].dtype == np.int64
+    assert result["prev_CNT_sum"].dtype == np.int32
+
+
+def _make_data_dict(seed=0):
+    """Jeu Home Credit factice : applications et tables secondaires liées par SK_ID_CURR"""
+    rng = np.random.default_rng(seed)
+
+    def application(ids):
+        return pd.DataFrame({
+            "SK_ID_CURR": ids,
+            "AMT_CREDIT": rng.uniform(1e4, 1e6, len(ids)),
+            "NAME_CONTRACT_TYPE": rng.choice(["Cash loans", "Revolving loans"], len(ids)),
+        })
+
+    def secondary(n, **extra):
+        df = pd.DataFrame({
+            "SK_ID_CURR": rng.integers(0, 400, n),
+            "AMT": rng.uniform(0, 1e5, n),
+            "DAYS": -rng.integers(0, 3000, n),
+        })
+        for name, values in extra.items():
+            df[name] = values
+        return df
+
+    bureau = secondary(800, SK_ID_BUREAU=np.arange(800))
+    # Carte de crédit : tous les clients de train et test (colonnes entières non converties) ;
+    # POS : un client absent des applications, donc de la carte de crédit
+    credit = secondary(950)
+    credit.loc[:449, "SK_ID_CURR"] = np.arange(450)
+    pos = secondary(900)
+    pos.loc[0, "SK_ID_CURR"] = 999
+    bureau_balance = pd.DataFrame({
+        "SK_ID_BUREAU": rng.integers(0, 800, 3000),
+        "MONTHS_BALANCE": -rng.integers(0, 96, 3000),
+    })
+    return {
+        "train": application(np.arange(0, 300)),
+        "test": application(np.arange(300, 450)),
+        "bureau": bureau,
+        "bureau_balance": bureau_balance,
+        "previous": secondary(600),
+        "pos": pos,
+        "installments": secondary(1200),
+        "credit": credit,
+    }
+
+
+def test_merge_all_matches_sequential_merges():
+    """
+    Agrégations en parallèle + jointure unique : mêmes lignes, colonnes et valeurs
+    que les cinq merges successifs sur train et test
+    """
+    fe = FeatureEngineer()
+    data = _make_data_dict()
+
+    aggregates = [
+        fe.process_bureau(data["bureau"], data["bureau_balance"]),
+        fe.process_previous(data["previous"]),
+        fe.process_installments(data["installments"]),
+        fe.process_pos(data["pos"]),
+        fe.process_credit(data["credit"]),
+    ]
+    expected_train, expected_test = data["train"], data["test"]
+    for agg in aggregates:
+        expected_train = expected_train.merge(agg, on="SK_ID_CURR", how="left")
+        expected_test = expected_test.merge(agg, on="SK_ID_CURR", how="left")
+
+    for n_jobs in (1, 2):
+        train, test = fe.merge_all(data, n_jobs=n_jobs)
+        pd.testing.assert_frame_equal(train, expected_train)
+        pd.testing.assert_frame_equal(test, expected_test)
+    assert train["cc_DAYS_min"].dtype == np.int64
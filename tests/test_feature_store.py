@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from src.api.feature_store import FEATURE_NAMES, OnlineFeatureStore, build_feature_store
+
+
+def _features(ids):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.uniform(-1000, 0, (len(ids), len(FEATURE_NAMES))), columns=FEATURE_NAMES)
+    df.insert(0, "SK_ID_CURR", ids)
+    return df
+
+
+def test_store_lookup_by_id(tmp_path):
+    """
+    Lignes triées par identifiant et lues en memory-map : un client connu
+    retrouve ses features, un client inconnu renvoie None
+    """
+    df = _features([300, 100, 200])
+    build_feature_store(df, str(tmp_path / "store"))
+
+    store = OnlineFeatureStore(str(tmp_path / "store"))
+    row = store.lookup(200)
+    assert isinstance(store.features, np.memmap)
+    np.testing.assert_array_equal(row[0], df.loc[df["SK_ID_CURR"] == 200, FEATURE_NAMES].to_numpy()[0])
+    assert store.lookup(150) is None
+    assert store.lookup(400) is None
+    assert store.info()["count"] == 3
+
+
+def test_store_rebuild_is_visible_after_reopen(tmp_path):
+    """
+    Une reconstruction remplace le répertoire ; les lecteurs déjà ouverts
+    gardent l'ancienne version jusqu'à leur réouverture
+    """
+    path = str(tmp_path / "store")
+    build_feature_store(_features([1, 2]), path)
+    store = OnlineFeatureStore(path)
+    assert store.lookup(3) is None
+
+    build_feature_store(_features([1, 2, 3]), path)
+    assert store.lookup(3) is None
+    store.open()
+    assert store.lookup(3) is not None
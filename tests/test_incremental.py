@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+from src.preprocessing.feature_engineering import FeatureEngineer
+from src.preprocessing.incremental import IncrementalFeatureStore, PartialAggregate
+from tests.test_feature_engineering import _make_data_dict
+
+SECONDARY_TABLES = ["bureau", "bureau_balance", "previous", "pos", "installments", "credit"]
+
+
+def _split(data, *fractions):
+    """Découpe chaque table secondaire en lots de lignes successifs (historique puis deltas)"""
+    bounds = (0,) + fractions + (1,)
+    parts = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        parts.append({
+            name: data[name].iloc[int(len(data[name]) * start):int(len(data[name]) * end)].reset_index(drop=True)
+            for name in SECONDARY_TABLES
+        })
+    return parts
+
+
+def test_incremental_store_matches_full_recompute(tmp_path):
+    """
+    Historique puis delta : mêmes features qu'un merge_all sur la table complète,
+    y compris après sauvegarde et rechargement du store
+    """
+    data = _make_data_dict()
+    # Montants entiers : les sommes partielles sont exactes quel que soit le découpage
+    for name in ["previous", "pos", "installments", "credit", "bureau"]:
+        data[name]["AMT"] = np.round(data[name]["AMT"])
+    expected_train, expected_test = FeatureEngineer().merge_all(data, n_jobs=1)
+
+    history, delta = _split(data, 0.7)
+    store = IncrementalFeatureStore()
+    store.update(history)
+    store.save(tmp_path / "store.pkl")
+
+    store = IncrementalFeatureStore.load(tmp_path / "store.pkl")
+    affected = store.update(delta)
+    train, test = store.merge(data["train"], data["test"])
+
+    pd.testing.assert_frame_equal(train, expected_train, check_exact=True)
+    pd.testing.assert_frame_equal(test, expected_test, check_exact=True)
+
+    # Seuls les clients présents dans le delta (ou liés à un crédit mis à jour) sont touchés
+    touched = set(delta["previous"]["SK_ID_CURR"]) | set(delta["bureau"]["SK_ID_CURR"])
+    assert touched <= set(affected)
+    assert len(affected) < len(expected_train) + len(expected_test)
+
+
+def test_incremental_store_float_sums_match_to_rounding():
+    """
+    Montants décimaux : count/min/max exacts, sommes et moyennes à l'arrondi flottant près
+    """
+    data = _make_data_dict(seed=1)
+    expected_train, _ = FeatureEngineer().merge_all(data, n_jobs=1)
+
+    store = IncrementalFeatureStore()
+    for part in _split(data, 0.3, 0.6):
+        store.update(part)
+    train, _ = store.merge(data["train"], data["test"])
+
+    pd.testing.assert_frame_equal(train, expected_train, check_exact=False, rtol=1e-12)
+
+
+def test_partial_aggregate_promotes_state_for_nan_delta():
+    """
+    Colonne entière dans l'historique, flottante avec NaN dans le delta :
+    l'état passe en float64 comme la table complète, sans NaN converti en entier
+    """
+    history = pd.DataFrame({
+        "SK_ID_CURR": [1, 1, 2],
+        "CNT": np.array([3, 5, 7], dtype=np.int32),
+    })
+    delta = pd.DataFrame({
+        "SK_ID_CURR": [1, 2, 3],
+        "CNT": [np.nan, 2.0, np.nan],
+    })
+    expected = FeatureEngineer().aggregate_numeric(
+        pd.concat([history, delta], ignore_index=True), "SK_ID_CURR", "prev"
+    )
+
+    state = PartialAggregate("SK_ID_CURR", "prev")
+    state.update(history)
+    state.update(delta)
+
+    pd.testing.assert_frame_equal(state.frame(), expected)
+
+
+def test_partial_aggregate_many_small_deltas():
+    """
+    Deltas successifs (nouvelles clés et clés connues, clés entières puis flottantes) :
+    même résultat qu'une agrégation de la table complète
+    """
+    rng = np.random.default_rng(0)
+    table = pd.DataFrame({
+        "SK_ID_CURR": rng.integers(0, 300, 2000),
+        "CNT": rng.integers(0, 50, 2000),
+        "AMT": np.round(rng.uniform(0, 1e4, 2000)),
+    })
+    state = PartialAggregate("SK_ID_CURR", "pos")
+    for start in range(0, len(table), 150):
+        delta = table.iloc[start:start + 150]
+        if start >= 1500:
+            delta = delta.astype({"SK_ID_CURR": np.float64})
+        state.update(delta)
+
+    expected = FeatureEngineer().aggregate_numeric(table, "SK_ID_CURR", "pos")
+    pd.testing.assert_frame_equal(state.frame(), expected, check_index_type=False)
+    pd.testing.assert_frame_equal(state.frame([5, 7, 1000]), expected.loc[[5, 7]], check_index_type=False)
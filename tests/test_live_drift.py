@@ -0,0 +1,67 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.api.drift import LiveDriftMonitor, PROBABILITY_COLUMN
+from src.monitoring.drift import ReferenceProfile
+
+FEATURES = ["EXT_SOURCE_2", "DAYS_EMPLOYED"]
+
+
+def _monitor(tmp_path, capacity=1000):
+    rng = np.random.default_rng(0)
+    reference = pd.DataFrame({
+        "EXT_SOURCE_2": rng.beta(5, 3, 5000),
+        "DAYS_EMPLOYED": rng.integers(-15000, 0, 5000),
+        PROBABILITY_COLUMN: rng.beta(2, 8, 5000),
+    })
+    ReferenceProfile.from_frame(reference).save(str(tmp_path / "reference.json"))
+    return LiveDriftMonitor(FEATURES, str(tmp_path / "reference.json"), capacity=capacity, interval=0)
+
+
+def test_ring_buffer_keeps_last_requests(tmp_path):
+    """Le tampon garde les capacity dernières requêtes, enregistrées une à une ou par lot"""
+    monitor = _monitor(tmp_path, capacity=5)
+    for i in range(3):
+        monitor.record(np.array([i, -i]), i / 10)
+    monitor.record_many(np.array([[i, -i] for i in range(3, 10)], dtype=float), [i / 10 for i in range(3, 10)])
+
+    order = np.argsort(monitor.sequence)
+    np.testing.assert_array_equal(monitor.sequence[order], [5, 6, 7, 8, 9])
+    np.testing.assert_array_equal(monitor.buffer[order, 0], [5, 6, 7, 8, 9])
+    np.testing.assert_allclose(monitor.buffer[order, 2], [0.5, 0.6, 0.7, 0.8, 0.9])
+
+    result = monitor.refresh()
+    assert result["window"] == 5 and result["recorded"] == 10
+
+
+def test_live_drift_detects_broken_feed(tmp_path):
+    """
+    Trafic conforme à l'entraînement : pas de dérive ; source EXT_SOURCE_2 cassée
+    (valeurs manquantes) : dérive de la feature, exposée dans les métriques Prometheus
+    """
+    monitor = _monitor(tmp_path)
+    rng = np.random.default_rng(1)
+
+    def traffic(ext_source):
+        threads = [
+            threading.Thread(target=lambda: [
+                monitor.record(np.array([ext_source(), rng.integers(-15000, 0)]), rng.beta(2, 8))
+                for _ in range(250)
+            ])
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    traffic(lambda: rng.beta(5, 3))
+    result = monitor.refresh()
+    assert result["window"] == 1000 and not result["summary"]["drifted_columns"]
+
+    traffic(lambda: np.nan)
+    result = monitor.refresh()
+    assert result["summary"]["drifted_columns"] == ["EXT_SOURCE_2"]
+    assert any(line.startswith('scoring_feature_psi{feature="EXT_SOURCE_2"}') for line in monitor.prometheus_lines())
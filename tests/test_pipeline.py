@@ -0,0 +1,118 @@
+import threading
+
+import pytest
+
+from src.pipeline import Pipeline, Stage, build_pipeline
+
+CALLS = []
+BARRIER = {"barrier": None, "fail": False}
+
+
+def _source(scale):
+    CALLS.append("source")
+    return list(range(5 * scale))
+
+
+def _left(values, offset):
+    CALLS.append("left")
+    if BARRIER["barrier"] is not None:
+        BARRIER["barrier"].wait()
+    return [v + offset for v in values]
+
+
+def _right(values):
+    CALLS.append("right")
+    if BARRIER["barrier"] is not None:
+        BARRIER["barrier"].wait()
+    return sum(values)
+
+
+def _combine(left, right):
+    CALLS.append("combine")
+    if BARRIER["fail"]:
+        raise RuntimeError("crash simulé")
+    return sum(left) + right
+
+
+def _toy_pipeline(cache_dir, offset=1, scale=1):
+    return Pipeline([
+        Stage("source", _source, params={"scale": scale}),
+        Stage("left", _left, inputs=("source",), params={"offset": offset}),
+        Stage("right", _right, inputs=("source",)),
+        Stage("combine", _combine, inputs=("left", "right")),
+    ], cache_dir=str(cache_dir), verbose=0)
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    CALLS.clear()
+    BARRIER.update(barrier=None, fail=False)
+
+
+def test_pipeline_skips_cached_stages(tmp_path):
+    """Une relance identique ne refait rien ; un paramètre modifié ne refait que l'étape et ses descendantes"""
+    first = _toy_pipeline(tmp_path).run()
+    assert first["combine"] == 15 + 10
+    assert sorted(CALLS) == ["combine", "left", "right", "source"]
+
+    CALLS.clear()
+    pipeline = _toy_pipeline(tmp_path)
+    assert pipeline.run(targets=["combine"]) == {"combine": 25}
+    assert CALLS == [] and pipeline.executed == []
+    assert set(pipeline.status().values()) == {"cached"}
+
+    changed = _toy_pipeline(tmp_path, offset=2)
+    assert changed.status() == {"source": "cached", "left": "pending", "right": "cached", "combine": "pending"}
+    assert changed.run()["combine"] == 30
+    assert sorted(CALLS) == ["combine", "left"]
+
+    CALLS.clear()
+    forced = _toy_pipeline(tmp_path, offset=2)
+    forced.run(force=["right"])
+    assert forced.executed == ["right"]
+
+
+def test_pipeline_resumes_after_crash(tmp_path):
+    """Après l'échec d'une étape, la relance reprend à cette étape"""
+    BARRIER["fail"] = True
+    with pytest.raises(RuntimeError, match="crash simulé"):
+        _toy_pipeline(tmp_path).run()
+    assert _toy_pipeline(tmp_path).status()["combine"] == "pending"
+
+    BARRIER["fail"] = False
+    CALLS.clear()
+    pipeline = _toy_pipeline(tmp_path)
+    assert pipeline.run()["combine"] == 25
+    assert CALLS == ["combine"]
+
+
+def test_pipeline_runs_independent_stages_concurrently(tmp_path):
+    """left et right (indépendantes) ne passent la barrière que si elles s'exécutent en même temps"""
+    BARRIER["barrier"] = threading.Barrier(2, timeout=10)
+    pipeline = _toy_pipeline(tmp_path)
+    pipeline.run()
+    assert set(pipeline.executed) == {"source", "left", "right", "combine"}
+
+
+def test_pipeline_records_actions_by_stage_keys(tmp_path):
+    """
+    Une action (publication) enregistrée vaut pour les clés courantes des étapes :
+    à refaire si la publication n'a pas abouti ou si une de ces étapes change
+    """
+    pipeline = _toy_pipeline(tmp_path)
+    pipeline.run()
+    assert not pipeline.action_done("publish", ("combine",))
+
+    pipeline.record_action("publish", ("combine",))
+    assert _toy_pipeline(tmp_path).action_done("publish", ("combine",))
+    assert not _toy_pipeline(tmp_path, offset=2).action_done("publish", ("combine",))
+
+
+def test_project_pipeline_keys(tmp_path):
+    """La grille d'hyperparamètres n'invalide que la recherche et le seuil"""
+    keys = build_pipeline(cache_dir=str(tmp_path)).keys()
+    grid = {"num_leaves": [31], "n_estimators": [100]}
+    other = build_pipeline(param_grid=grid, cache_dir=str(tmp_path)).keys()
+
+    assert list(keys) == ["features", "preprocess", "baselines", "search", "threshold"]
+    assert [name for name in keys if keys[name] != other[name]] == ["search", "threshold"]
@@ -0,0 +1,63 @@
+import os
+import threading
+
+import pytest
+
+from src.api.prediction_log import PredictionLogger, read_prediction_log
+
+FEATURES = ["EXT_SOURCE_2", "DAYS_EMPLOYED"]
+
+
+def _response(i):
+    return {"model_version": "v1", "threshold_used": 0.5, "probability_default": i / 1000, "prediction": i % 2}
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "jsonl"])
+def test_prediction_log_writes_rotating_segments(tmp_path, fmt):
+    """
+    Décisions déposées par plusieurs threads, écrites par lots en segments tournants :
+    toutes présentes une fois l'écrivain arrêté, aucun segment .inprogress restant
+    """
+    logger = PredictionLogger(str(tmp_path), FEATURES, fmt=fmt, batch_size=100, flush_interval=0.01,
+                              segment_rows=250)
+    logger.start()
+
+    def requests(offset):
+        for i in range(offset, offset + 200):
+            logger.log("/predict", [i / 1000, -i], _response(i), 1.5)
+
+    threads = [threading.Thread(target=requests, args=(offset,)) for offset in range(0, 800, 200)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    logger.stop()
+
+    log = read_prediction_log(str(tmp_path)).sort_values("DAYS_EMPLOYED", ascending=False, ignore_index=True)
+    assert len(log) == 800 and logger.written == 800 and logger.dropped == 0
+    assert list(log.columns) == ["timestamp", "endpoint", "model_version", "threshold_used", "probability_default",
+                                 "prediction", "latency_ms", *FEATURES]
+    assert log["DAYS_EMPLOYED"].tolist() == [-i for i in range(800)]
+    assert (log["probability_default"] == log["EXT_SOURCE_2"]).all()
+    assert str(log["timestamp"].dt.tz) == "UTC"
+    files = os.listdir(tmp_path)
+    assert len(files) >= 800 // 250 and not any(name.endswith(".inprogress") for name in files)
+
+
+def test_prediction_log_backpressure(tmp_path):
+    """
+    File pleine : "drop" abandonne sans attendre ; "block" attend que l'écrivain,
+    réveillé par la file pleine, libère de la place
+    """
+    dropping = PredictionLogger(str(tmp_path / "drop"), FEATURES, max_queue=10, policy="drop")
+    for i in range(15):
+        dropping.log("/predict", [0.5, -i], _response(i), 1.0)
+    assert dropping.stats()["queued"] == 10 and dropping.dropped == 5
+
+    blocking = PredictionLogger(str(tmp_path / "block"), FEATURES, max_queue=10, batch_size=1000,
+                                flush_interval=60, policy="block", block_timeout=5)
+    blocking.start()
+    for i in range(100):
+        blocking.log("/predict", [0.5, -i], _response(i), 1.0)
+    blocking.stop()
+    assert blocking.dropped == 0 and len(read_prediction_log(str(tmp_path / "block"))) == 100
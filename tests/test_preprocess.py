@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+from src.preprocessing.preprocess import FitStatistics, Preprocessor, TransformPlan
+
+
+def _application(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "SK_ID_CURR": np.arange(100000, 100000 + n),
+        "AMT_CREDIT": rng.uniform(1e4, 1e6, n),
+        "DAYS_EMPLOYED": rng.integers(-10000, 0, n),
+        "CNT_CHILDREN": rng.integers(0, 4, n),
+        "NAME_CONTRACT_TYPE": rng.choice(["Cash loans", "Revolving loans"], n),
+        "OCCUPATION_TYPE": rng.choice(["Laborers", "Core staff", "Drivers", None], n),
+        "EMPTY": np.nan,
+    })
+    df.loc[rng.random(n) < 0.1, "DAYS_EMPLOYED"] = 365243
+    df.loc[rng.random(n) < 0.1, "AMT_CREDIT"] = np.nan
+    return df
+
+
+def _legacy_transform(preprocessor, df):
+    """Transformation d'origine : nettoyage, imputation, get_dummies et réalignement"""
+    df_imputed = preprocessor._impute(preprocessor.basic_cleaning(df))
+    df_ohe = pd.get_dummies(df_imputed, drop_first=True)
+    return df_ohe.reindex(columns=preprocessor.final_columns, fill_value=0).astype(np.float64)
+
+
+def test_plan_matches_legacy_transform():
+    """
+    Sur un lot qui contient toutes les modalités, le plan compilé donne
+    exactement la sortie de get_dummies réalignée (colonnes, ordre, valeurs)
+    """
+    train, test = _application(seed=0), _application(seed=1)
+    preprocessor = Preprocessor()
+    preprocessor.fit(train)
+
+    # Cache Parquet (colonnes category) et colonne absente de l'entrée (mise à 0)
+    for df in (train, test, train.astype({"OCCUPATION_TYPE": "category"}), test.drop(columns="CNT_CHILDREN")):
+        result = preprocessor.transform(df)
+        assert list(result.columns) == preprocessor.final_columns
+        pd.testing.assert_frame_equal(result, _legacy_transform(preprocessor, df))
+
+
+def test_transform_record_matches_plan(tmp_path):
+    """
+    Un enregistrement seul est transformé comme une ligne du lot, dans une ligne
+    préallouée ; ses valeurs manquantes prennent l'imputation de l'entraînement
+    (et non 0) et sa modalité garde sa colonne one-hot
+    """
+    preprocessor = Preprocessor()
+    preprocessor.fit(_application())
+    plan_path = str(tmp_path / "plan.pkl")
+    preprocessor.plan.save(plan_path)
+    plan = TransformPlan.load(plan_path)
+
+    records = _application(n=20, seed=2)
+    records.loc[0, "OCCUPATION_TYPE"] = "Pilots"  # modalité inconnue : aucune colonne
+    expected = plan.transform(records).to_numpy()
+    out = np.empty(len(plan.columns))
+    for i, record in enumerate(records.to_dict(orient="records")):
+        assert plan.transform_record(record, out) is out
+        np.testing.assert_array_equal(out, expected[i])
+
+    row = plan.transform_record({"AMT_CREDIT": None, "DAYS_EMPLOYED": 365243, "OCCUPATION_TYPE": "Drivers"})
+    columns = plan.columns
+    assert row[columns.index("AMT_CREDIT")] == preprocessor.imputation_values["AMT_CREDIT"]
+    assert row[columns.index("DAYS_EMPLOYED")] == preprocessor.imputation_values["DAYS_EMPLOYED"]
+    assert row[columns.index("OCCUPATION_TYPE_Drivers")] == 1.0
+    assert row[columns.index("CNT_CHILDREN")] == 0.0
+
+
+def test_fit_chunks_matches_in_memory_fit(tmp_path):
+    """
+    Apprentissage et transformation par morceaux (read_csv chunksize) : mêmes colonnes,
+    mêmes imputations et mêmes sorties que sur la table entière, y compris quand
+    une colonne texte est vide dans le premier morceau (lue en float)
+    """
+    df = _application(n=500)
+    df.loc[:99, "OCCUPATION_TYPE"] = None
+    path = tmp_path / "application_train.csv"
+    df.to_csv(path, index=False)
+
+    expected = Preprocessor()
+    expected.fit(pd.read_csv(path))
+    result = Preprocessor()
+    result.fit_chunks(pd.read_csv(path, chunksize=100))
+
+    assert result.final_columns == expected.final_columns
+    assert result.numeric_features == expected.numeric_features
+    assert result.categorical_features == expected.categorical_features
+    assert result.imputation_values["CNT_CHILDREN"] == expected.imputation_values["CNT_CHILDREN"]
+    for col in expected.numeric_features:
+        assert np.isclose(result.imputation_values[col], expected.imputation_values[col], rtol=1e-12)
+
+    chunks = list(result.transform_chunks(pd.read_csv(path, chunksize=100)))
+    assert len(chunks) == 5
+    pd.testing.assert_frame_equal(pd.concat(chunks), expected.transform(pd.read_csv(path)), rtol=1e-12)
+
+
+def test_fit_statistics_merge():
+    """Deux états calculés séparément puis fusionnés valent l'état des morceaux enchaînés"""
+    df = _application(n=200)
+    preprocessor = Preprocessor()
+    left, right = FitStatistics(), FitStatistics()
+    left.update(preprocessor.basic_cleaning(df.iloc[:80], drop_empty=False))
+    right.update(preprocessor.basic_cleaning(df.iloc[80:], drop_empty=False))
+    preprocessor.fit_statistics(left.merge(right))
+
+    expected = Preprocessor()
+    expected.fit_chunks([df.iloc[:80], df.iloc[80:]])
+    assert preprocessor.final_columns == expected.final_columns
+    assert preprocessor.imputation_values == expected.imputation_values
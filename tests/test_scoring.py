@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from sklearn.metrics import confusion_matrix
+
+from src.config.config import config
+from src.training.scoring import business_cost_curve, business_score, optimize_decision_threshold
+
+
+def _reference_score(y_true, y_pred, weight_FN=5, weight_FP=1):
+    """Score métier d'origine, via confusion_matrix"""
+    tn, fp, fn, tp = confusion_matrix(y_true, y_pred, labels=[0, 1]).ravel()
+    return 1 / (1 + weight_FN * fn + weight_FP * fp)
+
+
+def _validation(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    y_true = (rng.random(n) < 0.1).astype(int)
+    # Probabilités arrondies : nombreuses égalités entre clients
+    y_proba = np.round(np.clip(0.3 * y_true + rng.normal(0.2, 0.15, n), 0, 1), 3)
+    return y_true, y_proba
+
+
+def test_business_score_matches_confusion_matrix():
+    y_true, y_proba = _validation()
+    for threshold in (0.0, 0.2, 0.35, 1.1):
+        y_pred = (y_proba >= threshold).astype(int)
+        assert business_score(y_true, y_pred) == _reference_score(y_true, y_pred)
+
+
+def test_threshold_sweep_is_exact(tmp_path, monkeypatch):
+    """
+    Sur une grille, la courbe de coût donne les scores de la boucle confusion_matrix ;
+    sans grille, l'optimum est celui de la recherche exhaustive sur toutes les probabilités
+    """
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    y_true, y_proba = _validation()
+
+    grid = np.linspace(0.05, 0.5, 50)
+    curve = business_cost_curve(y_true, y_proba, thresholds=grid)
+    expected = [_reference_score(y_true, (y_proba >= t).astype(int)) for t in grid]
+    np.testing.assert_allclose(curve["scores"], expected, rtol=0, atol=0)
+
+    candidates = np.append(np.unique(y_proba), 2.0)
+    brute = [_reference_score(y_true, (y_proba >= t).astype(int)) for t in candidates]
+    result = optimize_decision_threshold(y_true, y_proba)
+    assert result["best_score"] == max(brute)
+    assert result["best_threshold"] == candidates[int(np.argmax(brute))]
+    assert result["best_score"] >= max(expected)
+    assert (tmp_path / "best_threshold.json").exists()
+
+
+@pytest.mark.parametrize("y_proba", [[], [np.nan, np.nan, np.nan]])
+def test_threshold_sweep_without_probabilities(y_proba):
+    """
+    Aucune probabilité valide : erreur explicite pour la recherche exhaustive ;
+    sur une grille, personne n'est refusé
+    """
+    y_true = [1, 0, 0][:len(y_proba)]
+    with pytest.raises(ValueError, match="probabilité"):
+        business_cost_curve(y_true, y_proba)
+    with pytest.raises(ValueError, match="probabilité"):
+        optimize_decision_threshold(y_true, y_proba, save=False)
+
+    curve = business_cost_curve(y_true, y_proba, thresholds=[0.2, 0.5])
+    assert curve["fn"].tolist() == [sum(y_true)] * 2
+    assert curve["fp"].tolist() == [0, 0]
+
+
+def test_search_threshold_does_not_replace_served_threshold(tmp_path, monkeypatch):
+    """Le seuil calculé par le pipeline n'écrit pas data/best_threshold.json (servi par l'API)"""
+    from src.training.train import search_threshold
+
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    y_true, y_proba = _validation()
+
+    class _Model:
+        def predict_proba(self, X):
+            return np.column_stack([1 - y_proba, y_proba])
+
+    result = search_threshold(_Model(), None, y_true)
+    assert result == {k: v for k, v in optimize_decision_threshold(y_true, y_proba, save=False).items()
+                      if k in ("best_threshold", "best_score")}
+    assert not (tmp_path / "best_threshold.json").exists()
@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.scoring_batch import FEATURE_NAMES, run_batch_scoring
+
+
+def _make_input(path, n=250):
+    """Fichier d'entrée factice au format de application_test.csv (colonnes utiles)"""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "SK_ID_CURR": np.arange(100000, 100000 + n),
+        "DAYS_BIRTH": rng.integers(-25000, -7000, n),
+        "DAYS_EMPLOYED": rng.integers(-15000, 0, n),
+        "bureau_DAYS_CREDIT_UPDATE_mean": rng.uniform(-1000, 0, n),
+        "REGION_RATING_CLIENT_W_CITY": rng.integers(1, 4, n),
+        "NAME_INCOME_TYPE_Working": rng.integers(0, 2, n),
+        "DAYS_LAST_PHONE_CHANGE": rng.integers(-3000, 0, n),
+        "DAYS_ID_PUBLISH": rng.integers(-6000, 0, n),
+        "EXT_SOURCE_1": rng.uniform(0, 1, n),
+        "EXT_SOURCE_2": rng.uniform(0, 1, n),
+        "EXT_SOURCE_3": rng.uniform(0, 1, n),
+        "UNUSED": "x",
+    })
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_batch_scoring_matches_model_and_resumes(tmp_path):
+    """
+    Le scoring par blocs donne les probabilités du modèle, et une relance
+    ne re-score que les blocs manquants
+    """
+    from src.api.registry import load_bundle, DEFAULT_MODEL_PATH, DEFAULT_THRESHOLD_PATH
+
+    input_path = str(tmp_path / "input.csv")
+    output_dir = str(tmp_path / "scores")
+    df = _make_input(input_path)
+
+    summary = run_batch_scoring(input_path, output_dir, chunksize=100, workers=2)
+    assert summary["chunks"] == 3
+    assert summary["scored_rows"] == len(df)
+
+    result = pd.read_parquet(output_dir).sort_values("SK_ID_CURR")
+    bundle = load_bundle(DEFAULT_MODEL_PATH, DEFAULT_THRESHOLD_PATH, with_explainer=False)
+    expected = bundle.booster.predict(df[FEATURE_NAMES].to_numpy(dtype=np.float64))
+    np.testing.assert_allclose(result["probability_default"].to_numpy(), expected)
+
+    # Simulation d'un crash : un bloc manquant est rescoré, les autres sont ignorés
+    os.remove(os.path.join(output_dir, "part-000001.parquet"))
+    summary = run_batch_scoring(input_path, output_dir, chunksize=100, workers=2)
+    assert summary["skipped_chunks"] == 2
+    assert summary["scored_rows"] == 100
+
+
+def test_batch_scoring_rejects_raw_application_file(tmp_path):
+    """
+    Un fichier brut (sans les features calculées) est refusé avant tout scoring
+    """
+    input_path = str(tmp_path / "application_test.csv")
+    output_dir = str(tmp_path / "scores")
+    _make_input(input_path).drop(columns=["bureau_DAYS_CREDIT_UPDATE_mean"]).to_csv(input_path, index=False)
+
+    with pytest.raises(ValueError, match="bureau_DAYS_CREDIT_UPDATE_mean"):
+        run_batch_scoring(input_path, output_dir, chunksize=100, workers=1)
+    assert not os.path.exists(output_dir)
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from lightgbm import LGBMClassifier
+from sklearn.datasets import make_classification
+from sklearn.model_selection import StratifiedKFold
+
+from src.training.scoring import business_score
+from src.training.search import HalvingLGBMSearch
+
+BASE_PARAMS = {"objective": "binary", "class_weight": "balanced", "random_state": 42, "n_estimators": 20}
+
+
+def _data(n=1500):
+    X, y = make_classification(n_samples=n, n_features=12, weights=[0.9], random_state=0)
+    return pd.DataFrame(X, columns=[f"f{i}" for i in range(12)]), y
+
+
+def test_shared_binning_matches_lgbm_classifier():
+    """
+    Les boosters entraînés sur les Dataset partagés donnent, à chaque tour,
+    le score métier d'un LGBMClassifier entraîné sur le même fold
+    """
+    X, y = _data()
+    cv = StratifiedKFold(n_splits=3, shuffle=True, random_state=42)
+    params = {"num_leaves": 15, "min_child_samples": 30}
+    search = HalvingLGBMSearch(BASE_PARAMS, {k: [v] for k, v in params.items()}, cv=cv,
+                               early_stopping_rounds=100, verbose=0).fit(X, y)
+
+    curve = []
+    for rounds in range(1, BASE_PARAMS["n_estimators"] + 1):
+        fold_scores = []
+        for train_idx, valid_idx in cv.split(X, y):
+            model = LGBMClassifier(**{**BASE_PARAMS, **params, "n_estimators": rounds, "verbose": -1})
+            model.fit(X.iloc[train_idx], y[train_idx])
+            fold_scores.append(business_score(y[valid_idx], model.predict(X.iloc[valid_idx])))
+        curve.append(np.mean(fold_scores))
+
+    assert search.best_score_ == max(curve)
+    assert search.best_iteration_ == int(np.argmax(curve)) + 1
+    assert search.best_estimator_.n_estimators == search.best_iteration_
+
+
+def test_halving_prunes_weak_candidates():
+    """27 candidats, eta = 3 : 9 puis 3 candidats seulement vont au-delà du premier palier"""
+    X, y = _data()
+    grid = {"max_depth": [2, 4, 6], "min_child_samples": [10, 50, 200], "num_leaves": [4, 15, 31]}
+    search = HalvingLGBMSearch({**BASE_PARAMS, "n_estimators": 27}, grid, early_stopping_rounds=100,
+                               verbose=0).fit(X, y)
+
+    rounds = search.cv_results_["rounds"]
+    assert sorted(rounds) == [3] * 18 + [9] * 6 + [27] * 3
+    best = int(np.argmax(search.cv_results_["mean_test_score"]))
+    assert rounds[best] == 27
+    assert search.best_params_ == {**search.cv_results_["params"][best], "n_estimators": search.best_iteration_}
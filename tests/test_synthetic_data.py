@@ -0,0 +1,58 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.api.schemas import ClientData
+from src.config.config import config
+from src.data_loader import TABLES, load_all_data
+from src.preprocessing.feature_engineering import FeatureEngineer
+from src.preprocessing.preprocess import Preprocessor
+from src.synthetic_data import MANIFEST, ensure_dataset, generate_dataset
+
+
+def _digests(directory):
+    return {name: hashlib.sha256(open(os.path.join(directory, name), "rb").read()).hexdigest()
+            for name in TABLES.values()}
+
+
+def test_generator_is_deterministic_and_consistent(tmp_path):
+    """
+    Mêmes paramètres : fichiers identiques (générés par blocs de clients) ; clés des
+    tables secondaires toutes rattachées à un parent, fan-out proche du jeu d'origine
+    """
+    rows = generate_dataset(str(tmp_path / "a"), scale=0.003, seed=1, chunk_clients=400)
+    generate_dataset(str(tmp_path / "b"), scale=0.003, seed=1, chunk_clients=400)
+    assert _digests(tmp_path / "a") == _digests(tmp_path / "b")
+    assert os.path.exists(tmp_path / "a" / MANIFEST)
+
+    tables = {name: pd.read_csv(tmp_path / "a" / filename) for name, filename in TABLES.items()}
+    assert {name: len(df) for name, df in tables.items()} == rows
+    assert tables["train"].shape[1] == 122 and tables["test"].shape[1] == 121
+    clients = np.concatenate([tables["train"]["SK_ID_CURR"], tables["test"]["SK_ID_CURR"]])
+    assert len(clients) == round(0.003 * 356255) and len(np.unique(clients)) == len(clients)
+    for name in ("bureau", "previous", "pos", "installments", "credit"):
+        assert tables[name]["SK_ID_CURR"].isin(clients).all()
+    assert tables["bureau_balance"]["SK_ID_BUREAU"].isin(tables["bureau"]["SK_ID_BUREAU"]).all()
+    assert tables["pos"]["SK_ID_PREV"].isin(tables["previous"]["SK_ID_PREV"]).all()
+    assert 4 < len(tables["bureau"]) / len(clients) < 6
+    assert 0.45 < tables["train"]["EXT_SOURCE_1"].isna().mean() < 0.65
+    assert 0.05 < tables["train"][config.TARGET].mean() < 0.12
+
+
+def test_synthetic_dataset_runs_offline_pipeline(tmp_path, monkeypatch):
+    """Jeu lu par load_all_data, enrichi et préprocessé : les features du modèle sont produites"""
+    rows = ensure_dataset(str(tmp_path), scale=0.002)
+    # Réutilisé tel quel avec les mêmes paramètres
+    mtime = os.stat(tmp_path / TABLES["train"]).st_mtime_ns
+    assert ensure_dataset(str(tmp_path), scale=0.002) == rows
+    assert os.stat(tmp_path / TABLES["train"]).st_mtime_ns == mtime
+
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    train, test = FeatureEngineer().merge_all(load_all_data(), n_jobs=1)
+    preprocessor = Preprocessor()
+    preprocessor.fit(train)
+    X = preprocessor.transform(test)
+    assert len(X) == rows["test"]
+    assert set(ClientData.model_fields) <= set(X.columns)
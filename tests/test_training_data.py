@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.training.datasets import cached_lgb_dataset, load_training_data, save_training_data
+
+
+def _split(n, seed):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n, 6)), columns=[f"f{i}" for i in range(6)])
+    X.iloc[::7, 2] = np.nan
+    y = pd.Series((rng.random(n) < 0.2).astype(int), name="TARGET")
+    return X, y
+
+
+def _is_memory_mapped(array):
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+def test_training_data_roundtrip_memory_mapped(tmp_path):
+    """
+    Relu en memory-map, sans copie : mêmes valeurs, colonnes et cibles que les
+    DataFrame d'origine ; l'empreinte ne change qu'avec le contenu
+    """
+    X_train, y_train = _split(300, 0)
+    X_test, y_test = _split(100, 1)
+    meta = save_training_data(X_train, y_train, X_test, y_test, directory=str(tmp_path / "training"))
+
+    X, y, X2, y2, loaded_meta = load_training_data(str(tmp_path / "training"))
+    assert loaded_meta == meta
+    assert _is_memory_mapped(X.values) and X.values.flags.f_contiguous
+    pd.testing.assert_frame_equal(X, X_train)
+    pd.testing.assert_series_equal(y, y_train, check_dtype=False)
+    pd.testing.assert_frame_equal(X2, X_test)
+
+    same = save_training_data(X_train, y_train, X_test, y_test, directory=str(tmp_path / "training"))
+    X_train.iloc[0, 0] += 1
+    changed = save_training_data(X_train, y_train, X_test, y_test, directory=str(tmp_path / "training"))
+    assert same["hash"] == meta["hash"]
+    assert changed["hash"] != meta["hash"]
+
+
+def test_lgb_binary_cache(tmp_path):
+    """
+    Le Dataset discrétisé est enregistré au premier appel puis relu tel quel ;
+    une autre empreinte de données ou d'autres paramètres donnent un autre fichier
+    """
+    import lightgbm as lgb
+
+    X, y = _split(500, 0)
+    params = {"max_bin": 63, "verbose": -1}
+    cache_dir = str(tmp_path / "lgb_cache")
+    built = cached_lgb_dataset("train", X, y, "hash-a", params, cache_dir=cache_dir)
+    files = os.listdir(cache_dir)
+    reloaded = cached_lgb_dataset("train", None, None, "hash-a", params, cache_dir=cache_dir)
+    assert os.listdir(cache_dir) == files
+
+    train_params = {"objective": "binary", "num_leaves": 7, "verbose": -1, "seed": 0}
+    expected = lgb.train(train_params, built, num_boost_round=10).predict(X)
+    result = lgb.train(train_params, reloaded, num_boost_round=10).predict(X)
+    np.testing.assert_array_equal(result, expected)
+
+    cached_lgb_dataset("train", X, y, "hash-b", params, cache_dir=cache_dir)
+    cached_lgb_dataset("train", X, y, "hash-a", {**params, "max_bin": 31}, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 3